@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Rebuild stale src/data artifacts (npm run build-data).
+
+Every artifact has a rule below: the builder command, the scripts whose
+content is its "version", its input files and its outputs. After a build the
+SHA-256 of each is recorded in scripts/data_manifest.json. A rule is stale when
+an input or script hash differs from the manifest, an output is missing or was
+edited since the build, or the rule was never recorded. A rule whose inputs are
+not in the tree (several raw downloads are not committed) cannot be rebuilt or
+fully checked: it is reported as unverifiable, and only its scripts and outputs
+are compared with the manifest. Rules whose inputs are
+another rule's outputs run after it, so downstream files are never forgotten;
+independent rules run in parallel.
+
+Rules marked network fetch their inputs (through scripts/http_cache.py where
+supported) and only run with --network or when named.
+
+Usage:
+    python3 scripts/build_data.py                # rebuild whatever is stale
+    python3 scripts/build_data.py --check        # list stale artifacts, exit 1 if any
+    python3 scripts/build_data.py norwegian_compact --force
+    python3 scripts/build_data.py --adopt        # record the current files without building
+"""
+from __future__ import annotations
+
+import argparse
+import concurrent.futures as futures
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+MANIFEST = ROOT / "scripts" / "data_manifest.json"
+PY = sys.executable
+
+
+class Rule:
+    def __init__(self, name: str, command: list[str], scripts: list[str], inputs: list[str], outputs: list[str],
+                 *, network: bool = False, after: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.command = command
+        self.scripts = scripts
+        self.inputs = inputs
+        self.outputs = outputs
+        self.network = network
+        # Explicit ordering for rules that touch a shared file (quality_sources.json).
+        self.after = after
+
+
+RULES = [
+    Rule("norwegian_compact", ["node", "scripts/build_norwegian_compact.js"],
+         ["scripts/build_norwegian_compact.js"],
+         ["src/data/norwegian_register.csv"], ["src/data/norwegian_compact.json"]),
+    Rule("scimago_index", [PY, "scripts/build_scimago_quartiles.py", "src/data/scimago_[0-9][0-9][0-9][0-9].csv"],
+         ["scripts/build_scimago_quartiles.py", "scripts/venue_names.py"],
+         ["src/data/scimago_[0-9][0-9][0-9][0-9].csv"], ["src/data/scimago_index.json"]),
+    Rule("era2023", [PY, "scripts/convert_era_xlsx_to_txt.py"],
+         ["scripts/convert_era_xlsx_to_txt.py", "scripts/xlsx_stream.py"],
+         ["src/data/era2023.xlsx"], ["src/data/era2023.txt"]),
+    Rule("core_portal_ranks", [PY, "scripts/core_csv_to_ranks.py"],
+         ["scripts/core_csv_to_ranks.py"],
+         ["src/data/core.csv"], ["src/data/core_portal_ranks.csv"]),
+    Rule("ccf_ranks", [PY, "scripts/parse_ccf_mhtml.py"],
+         ["scripts/parse_ccf_mhtml.py"],
+         ["CCF*.mhtml"], ["src/data/ccf_ranks.csv"]),
+    Rule("predatory_venues", [PY, "scripts/parse_predatory_lists.py"],
+         ["scripts/parse_predatory_lists.py"],
+         ["pred_list.mhtml", "pred_list2.mhtml", "pred_list2.csv", "pred_list3.csv"],
+         ["src/data/predatory_venues_bealls.txt", "src/data/predatory_venues_predatoryjournals.txt",
+          "src/data/predatory_venues.txt"]),
+    Rule("quality_lists", [PY, "scripts/update_quality_lists.py"],
+         ["scripts/update_quality_lists.py", "scripts/http_cache.py", "scripts/pdf_tables.py",
+          "scripts/xlsx_stream.py", "scripts/html_tables.py"], [],
+         ["src/data/ft50.txt", "src/data/utd24.txt", "src/data/abdc2022.csv", "src/data/abs2024.csv",
+          "src/data/fnege2025.csv", "src/data/core_icore2026.csv"], network=True),
+    Rule("vhb2024", [PY, "scripts/build_vhb2024_from_pdf.py"],
+         ["scripts/build_vhb2024_from_pdf.py", "scripts/http_cache.py", "scripts/pdf_tables.py",
+          "scripts/venue_names.py"], [],
+         ["src/data/vhb2024.csv"], network=True, after=("quality_lists",)),
+    Rule("retraction_bloom", ["node", "scripts/build_retraction_bloom.js"],
+         ["scripts/build_retraction_bloom.js"], [], ["src/data/retraction_bloom.json"], network=True),
+]
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def expand(patterns: list[str]) -> list[Path]:
+    out = []
+    for pattern in patterns:
+        if any(ch in pattern for ch in "*?["):
+            out.extend(sorted(ROOT.glob(pattern)))
+        else:
+            out.append(ROOT / pattern)
+    return out
+
+
+def hashes(patterns: list[str]) -> dict[str, str | None]:
+    return {str(p.relative_to(ROOT)): sha256_file(p) if p.exists() else None for p in expand(patterns)}
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def missing_inputs(rule: Rule) -> list[str]:
+    """Input files (or patterns matching nothing) absent from the tree."""
+    inputs = hashes(rule.inputs)
+    missing = [p for p, h in inputs.items() if h is None]
+    if rule.inputs and not inputs:
+        missing = list(rule.inputs)
+    return missing
+
+
+def staleness(rule: Rule, recorded: dict | None) -> str | None:
+    """Why the rule must be rebuilt, or None when it is up to date (as far as its present inputs show)."""
+    inputs = hashes(rule.inputs)
+    outputs = hashes(rule.outputs)
+    if any(h is None for h in outputs.values()):
+        return "output missing"
+    if not recorded:
+        return "not in manifest"
+    if hashes(rule.scripts) != recorded.get("scripts"):
+        return "script changed"
+    if not missing_inputs(rule) and inputs != recorded.get("inputs"):
+        return "input changed"
+    if outputs != recorded.get("outputs"):
+        return "output edited since last build"
+    return None
+
+
+def record(rule: Rule, seconds: float | None) -> dict:
+    entry = {
+        "command": [c if c != PY else "python3" for c in rule.command],
+        "scripts": hashes(rule.scripts),
+        # Absent inputs are left out rather than recorded as null.
+        "inputs": {p: h for p, h in hashes(rule.inputs).items() if h is not None},
+        "outputs": hashes(rule.outputs),
+        "builtAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    if seconds is not None:
+        entry["seconds"] = round(seconds, 1)
+    return entry
+
+
+def upstream(rule: Rule, rules: list[Rule]) -> set[str]:
+    """Rules producing one of this rule's inputs, plus explicit orderings."""
+    wanted = {str(p.relative_to(ROOT)) for p in expand(rule.inputs)}
+    deps = {r.name for r in rules if r is not rule and wanted & set(r.outputs)}
+    return deps | {a for a in rule.after if any(r.name == a for r in rules)}
+
+
+def run_rule(rule: Rule) -> float:
+    t0 = time.monotonic()
+    proc = subprocess.run(rule.command, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        tail = "\n".join((proc.stderr or proc.stdout).strip().splitlines()[-5:])
+        raise RuntimeError(f"exit {proc.returncode}: {tail}")
+    return time.monotonic() - t0
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("targets", nargs="*", help="Rules to consider (default: all local rules)")
+    ap.add_argument("--check", action="store_true", help="Only report stale artifacts")
+    ap.add_argument("--force", action="store_true", help="Rebuild the selected rules even if up to date")
+    ap.add_argument("--network", action="store_true", help="Include rules that download their inputs")
+    ap.add_argument("--adopt", action="store_true", help="Record current files in the manifest without building")
+    ap.add_argument("--jobs", type=int, default=4)
+    ap.add_argument("--manifest", type=Path, default=MANIFEST)
+    args = ap.parse_args(argv)
+
+    by_name = {r.name: r for r in RULES}
+    unknown = [t for t in args.targets if t not in by_name]
+    if unknown:
+        ap.error(f"unknown rule(s): {', '.join(unknown)}; known: {', '.join(by_name)}")
+    selected = [by_name[t] for t in args.targets] if args.targets else [r for r in RULES if args.network or not r.network]
+    manifest = load_manifest(args.manifest)
+
+    if args.adopt:
+        for rule in selected:
+            if all(h is not None for h in hashes(rule.outputs).values()):
+                manifest[rule.name] = record(rule, None)
+                missing = missing_inputs(rule)
+                print(f"[build-data] {rule.name} adopted"
+                      + (f" (inputs not in tree: {', '.join(missing)})" if missing else ""))
+        save_manifest(args.manifest, manifest)
+        return 0
+
+    todo: dict[str, str] = {}
+    unverifiable: list[str] = []
+    for rule in selected:
+        reason = "forced" if args.force else staleness(rule, manifest.get(rule.name))
+        if rule.network and reason is None and not args.check and (args.network or rule.name in args.targets):
+            reason = "network refresh"
+        missing = missing_inputs(rule)
+        if reason is None and missing:
+            unverifiable.append(rule.name)
+            print(f"[build-data] {rule.name} unverifiable (inputs not in tree: {', '.join(missing)})")
+        elif reason is None:
+            print(f"[build-data] {rule.name} up to date")
+        elif missing and not args.check:
+            print(f"[build-data] {rule.name} skipped ({reason}; missing input: {', '.join(missing)})")
+        else:
+            todo[rule.name] = reason
+            print(f"[build-data] {rule.name} stale ({reason})")
+    if args.check:
+        # Unverifiable rules had their scripts and outputs checked; only their inputs could not be.
+        print(f"[build-data] stale={len(todo)} unverifiable={len(unverifiable)}")
+        return 1 if todo else 0
+
+    # Rebuilding an artifact makes every downstream artifact stale too.
+    changed = True
+    while changed:
+        changed = False
+        for rule in selected:
+            if rule.name not in todo and upstream(rule, RULES) & set(todo):
+                todo[rule.name] = "upstream rebuilt"
+                changed = True
+
+    deps = {name: upstream(by_name[name], RULES) & set(todo) for name in todo}
+    failed: dict[str, str] = {}
+    done: set[str] = set()
+    running: dict = {}
+    t0 = time.monotonic()
+    with futures.ThreadPoolExecutor(max_workers=max(1, args.jobs)) as ex:
+        while len(done) + len(failed) < len(todo):
+            for name in todo:
+                if name in done or name in failed or name in running.values():
+                    continue
+                if deps[name] & set(failed):
+                    failed[name] = "upstream failed"
+                    print(f"[build-data] {name} skipped (upstream failed)", file=sys.stderr)
+                elif deps[name] <= done:
+                    print(f"[build-data] {name} building ({todo[name]})", flush=True)
+                    running[ex.submit(run_rule, by_name[name])] = name
+            if not running:
+                continue
+            finished, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                try:
+                    seconds = fut.result()
+                except Exception as e:
+                    failed[name] = str(e)
+                    print(f"[build-data] {name} FAILED {e}", file=sys.stderr, flush=True)
+                    continue
+                missing = [p for p, h in hashes(by_name[name].outputs).items() if h is None]
+                if missing:
+                    failed[name] = "did not write " + ", ".join(missing)
+                    print(f"[build-data] {name} FAILED {failed[name]}", file=sys.stderr, flush=True)
+                    continue
+                manifest[name] = record(by_name[name], seconds)
+                save_manifest(args.manifest, manifest)
+                done.add(name)
+                print(f"[build-data] {name} built in {seconds:.1f}s", flush=True)
+
+    print(f"[build-data] built={len(done)} failed={len(failed)} wall={time.monotonic() - t0:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,10 +5,11 @@ Build OAI-PMH source list from ROAR rawlist.xml.
 import argparse
 import json
 import re
-import urllib.request
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+import http_cache
+
 
 ROAR_RAWLIST_URL = "http://roar.eprints.org/rawlist.xml"
 NS = {"ep": "http://eprints.org/ep2/data/2.0"}
@@ -23,11 +24,11 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--url", default=ROAR_RAWLIST_URL)
     ap.add_argument("--out", default="output/roar_oai_sources.json")
+    http_cache.add_cache_args(ap)
     args = ap.parse_args()
+    cache = http_cache.install_from_args(args)
 
-    req = urllib.request.Request(args.url, headers={"User-Agent": "ScholarUtilityBelt/1.0"})
-    with urllib.request.urlopen(req, timeout=120) as resp:
-        data = resp.read()
+    data = http_cache.fetch(args.url, headers={"User-Agent": "ScholarUtilityBelt/1.0"}, timeout=120)
 
     root = ET.fromstring(data)
     sources = []
@@ -56,7 +57,7 @@ def main():
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(json.dumps({"sources": sources}, indent=2))
-    print(f"[roar] sources={len(sources)} out={out_path}")
+    print(f"[roar] sources={len(sources)} out={out_path}" + (f" cache: {cache.summary()}" if cache else ""))
 
 
 if __name__ == "__main__":
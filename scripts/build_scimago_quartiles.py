@@ -1,30 +1,53 @@
 #!/usr/bin/env python3
 """
-Build a compact quartile index from a SCImago CSV export.
+Build the columnar SCImago index from one or more SCImago CSV exports.
 
-Input: SCImago Journal Rank export CSV (often semicolon-delimited) with columns:
+Input: SCImago Journal Rank export CSVs (often semicolon-delimited, decimal
+commas), one per year. The year comes from --year (single input) or from the
+file name ("scimagojr 2024.csv"). Columns used:
 - Title
 - SJR Best Quartile (Q1-Q4 or '-')
+- SJR, H index, Categories ("Oncology (Q1); Hematology (Q2)") when present
 
-Output: src/data/scimago_<year>_quartiles.json containing:
-{ meta: {...}, index: { normalized_title: "Q1"|"Q2"|"Q3"|"Q4" } }
+Each file is read once: the delimiter is sniffed from the first line and rows
+are streamed through csv.reader.
+
+Titles are keyed by venue_names.normalize_venue_name (quality.js normalizeVenueName),
+so titles the extension would treat as one journal are merged here, keeping the
+best quartile and the highest metrics.
+
+Output: src/data/scimago_index.json, compact JSON with one column per metric:
+{
+  format: "scimago-columns/1",
+  meta: {...},
+  keys: [normalized_title, ...],              sorted; row i of every column
+  strings: [category name, ...],              string table
+  years: { "2024": {
+    quartile: "1204...",                      best quartile digit per key, "0" = none
+    sjr: [int, ...],                          SJR x 1000, 0 = none
+    hIndex: [int, ...],                       0 = none
+    categories: [[string_id * 5 + quartile digit, ...], ...]
+  } }
+}
+Columns missing from an input are omitted for that year. --legacy-json converts
+an old {meta, index} quartile snapshot into a year's quartile column.
 """
 
 from __future__ import annotations
 
 import argparse
 import csv
+import glob
 import json
 import re
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from venue_names import normalize_venue_name
 
-def normalize_venue_name(s: str) -> str:
-    s = str(s or "").lower().replace("&", " and ")
-    s = re.sub(r"[^a-z0-9]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+FORMAT = "scimago-columns/1"
+CATEGORY_RE = re.compile(r"^(.*?)\s*\((Q[1-4])\)\s*$")
 
 
 def normalize_quartile(s: str) -> str:
@@ -55,65 +78,194 @@ def sniff_delimiter(sample: str) -> str:
     return best
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("input_csv", help="Path to SCImago export CSV")
-    ap.add_argument("--year", type=int, required=True, help="Year for the snapshot name/meta")
-    ap.add_argument(
-        "--out",
-        default="src/data",
-        help="Output directory (default: src/data)",
-    )
-    args = ap.parse_args()
+def parse_number(s: str) -> float:
+    """SCImago writes decimals with a comma ("1,234"); '-' or empty means none."""
+    try:
+        return float(str(s or "").strip().replace(",", "."))
+    except ValueError:
+        return 0.0
 
-    in_path = Path(args.input_csv).expanduser().resolve()
-    if not in_path.exists():
-        raise SystemExit(f"Missing input: {in_path}")
 
-    out_dir = Path(args.out).expanduser().resolve()
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"scimago_{args.year}_quartiles.json"
+class YearData:
+    """Per-journal metrics of one export, merged when several titles normalize to the same key."""
+
+    def __init__(self) -> None:
+        self.quartile: dict[str, int] = {}
+        self.sjr: dict[str, int] = {}
+        self.h_index: dict[str, int] = {}
+        self.categories: dict[str, dict[str, int]] = {}
+        self.columns: set[str] = set()
+        self.rows = 0
+        self.files: list[str] = []
+
+    def add(self, key: str, quartile: str, sjr: float | None, h_index: float | None, categories: str | None) -> None:
+        self.rows += 1
+        if quartile:
+            q = int(quartile[1])
+            cur = self.quartile.get(key)
+            if cur is None or q < cur:
+                self.quartile[key] = q
+        if sjr:
+            self.sjr[key] = max(self.sjr.get(key, 0), round(sjr * 1000))
+        if h_index:
+            self.h_index[key] = max(self.h_index.get(key, 0), int(h_index))
+        if categories:
+            cats = self.categories.setdefault(key, {})
+            for part in categories.split(";"):
+                part = part.strip()
+                if not part:
+                    continue
+                m = CATEGORY_RE.match(part)
+                name, q = (m.group(1), int(m.group(2)[1])) if m else (part, 0)
+                cur = cats.get(name)
+                if cur is None or (q and (not cur or q < cur)):
+                    cats[name] = q
 
-    text0 = in_path.read_text(encoding="utf-8", errors="ignore")
-    first_line = (text0.splitlines() or [""])[0]
-    delim = sniff_delimiter(first_line)
+    def keys(self) -> set[str]:
+        return set(self.quartile) | set(self.sjr) | set(self.h_index) | set(self.categories)
 
-    idx: dict[str, str] = {}
-    row_count = 0
 
-    with in_path.open(newline="", encoding="utf-8", errors="ignore") as f:
-        r = csv.DictReader(f, delimiter=delim)
-        if not r.fieldnames:
-            raise SystemExit("No headers found.")
-        if "Title" not in r.fieldnames or "SJR Best Quartile" not in r.fieldnames:
-            raise SystemExit(f"Missing expected columns. Have: {r.fieldnames}")
+def read_export(path: Path, year_data: YearData) -> None:
+    """Stream one SCImago CSV into year_data (single pass)."""
+    with path.open(newline="", encoding="utf-8-sig", errors="ignore") as f:
+        delim = sniff_delimiter(f.readline())
+        f.seek(0)
+        r = csv.reader(f, delimiter=delim)
+        header = next(r, None)
+        if not header:
+            raise SystemExit(f"No headers found in {path}.")
+        col = {h.strip(): i for i, h in enumerate(header)}
+        if "Title" not in col or "SJR Best Quartile" not in col:
+            raise SystemExit(f"Missing expected columns in {path}. Have: {header}")
+        i_title, i_q = col["Title"], col["SJR Best Quartile"]
+        i_sjr, i_h, i_cat = col.get("SJR"), col.get("H index"), col.get("Categories")
+        year_data.columns.add("quartile")
+        year_data.columns.update(name for name, i in (("sjr", i_sjr), ("hIndex", i_h), ("categories", i_cat))
+                                 if i is not None)
+        year_data.files.append(path.name)
+        width = max(i for i in (i_title, i_q, i_sjr, i_h, i_cat) if i is not None) + 1
 
         for row in r:
-            title = (row.get("Title") or "").strip()
-            q = best_quartile("", row.get("SJR Best Quartile") or "")
-            if not title or not q:
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            title = row[i_title].strip()
+            if not title:
                 continue
             k = normalize_venue_name(title)
             if not k:
                 continue
-            idx[k] = best_quartile(idx.get(k, ""), q)
-            row_count += 1
+            year_data.add(
+                k,
+                normalize_quartile(row[i_q]),
+                parse_number(row[i_sjr]) if i_sjr is not None else None,
+                parse_number(row[i_h]) if i_h is not None else None,
+                row[i_cat] if i_cat is not None else None,
+            )
+
+
+def read_legacy(path: Path, year_data: YearData) -> None:
+    """Quartiles from an old {meta, index: {key: "Q1"}} snapshot."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    year_data.columns.add("quartile")
+    year_data.files.append((data.get("meta") or {}).get("inputFilename") or path.name)
+    for k, q in (data.get("index") or {}).items():
+        k, q = normalize_venue_name(k), normalize_quartile(q)
+        if k and q:
+            year_data.add(k, q, None, None, None)
+    # The snapshot's own count covers rows dropped when titles collided.
+    year_data.rows = max(year_data.rows, int((data.get("meta") or {}).get("rowCount") or 0))
+
+
+def year_of(path: Path) -> int | None:
+    m = re.search(r"(?<!\d)((?:19|20)\d{2})(?!\d)", path.name)
+    return int(m.group(1)) if m else None
+
+
+def build(years: dict[int, YearData]) -> dict:
+    keys = sorted(set().union(*(y.keys() for y in years.values())))
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
 
+    def sid(s: str) -> int:
+        if s not in string_ids:
+            string_ids[s] = len(strings)
+            strings.append(s)
+        return string_ids[s]
+
+    out_years = {}
+    for year, y in sorted(years.items()):
+        cols: dict = {}
+        if "quartile" in y.columns:
+            cols["quartile"] = "".join(str(y.quartile.get(k, 0)) for k in keys)
+        if "sjr" in y.columns:
+            cols["sjr"] = [y.sjr.get(k, 0) for k in keys]
+        if "hIndex" in y.columns:
+            cols["hIndex"] = [y.h_index.get(k, 0) for k in keys]
+        if "categories" in y.columns:
+            cols["categories"] = [[sid(name) * 5 + q for name, q in sorted(y.categories.get(k, {}).items())]
+                                  for k in keys]
+        out_years[str(year)] = cols
+    return {"keys": keys, "strings": strings, "years": out_years}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input_csv", nargs="*", help="SCImago export CSVs (globs allowed), one per year")
+    ap.add_argument("--year", type=int, default=None, help="Year of a single input (default: from the file name)")
+    ap.add_argument("--legacy-json", action="append", default=[], metavar="PATH",
+                    help="Also import an old scimago_<year>_quartiles.json snapshot")
+    ap.add_argument(
+        "--out",
+        default="src/data",
+        help="Output directory (default: src/data)",
+    )
+    args = ap.parse_args()
+
+    paths: list[Path] = []
+    for pattern in args.input_csv:
+        matches = sorted(glob.glob(str(Path(pattern).expanduser()))) or [pattern]
+        paths.extend(Path(m).resolve() for m in matches)
+    legacy = [Path(p).expanduser().resolve() for p in args.legacy_json]
+    if not paths and not legacy:
+        raise SystemExit("No inputs: pass SCImago CSV exports and/or --legacy-json")
+    for p in paths + legacy:
+        if not p.exists():
+            raise SystemExit(f"Missing input: {p}")
+    if args.year is not None and len(paths) + len(legacy) > 1:
+        raise SystemExit("--year only applies to a single input; name files by year instead")
+
+    t0 = time.monotonic()
+    years: dict[int, YearData] = {}
+    for p, reader in [(p, read_export) for p in paths] + [(p, read_legacy) for p in legacy]:
+        year = args.year or year_of(p)
+        if year is None and reader is read_legacy:
+            year = json.loads(p.read_text(encoding="utf-8")).get("meta", {}).get("year")
+        if year is None:
+            raise SystemExit(f"Cannot tell the year of {p.name}; pass --year or put it in the file name")
+        reader(p, years.setdefault(int(year), YearData()))
+
+    out_dir = Path(args.out).expanduser().resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / "scimago_index.json"
+
+    out = build(years)
+    latest = max(years)
     meta = {
         "source": "SCImago Journal Rank (CSV export)",
-        "year": args.year,
+        "year": latest,
+        "years": sorted(years),
         "importedAt": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "rowCount": row_count,
-        "journalCount": len(idx),
-        "inputFilename": in_path.name,
+        "rowCount": years[latest].rows,
+        "journalCount": len(out["keys"]),
+        "inputFilenames": [name for y in sorted(years) for name in years[y].files],
     }
-
-    out = {"meta": meta, "index": idx}
-    out_path.write_text(json.dumps(out, indent=2, sort_keys=True), encoding="utf-8")
-    print(f"Wrote {out_path} (journals={len(idx)})")
+    doc = {"format": FORMAT, "meta": meta, **out}
+    out_path.write_text(json.dumps(doc, separators=(",", ":"), ensure_ascii=False) + "\n", encoding="utf-8")
+    cols = ", ".join(f"{y}:{'+'.join(sorted(out['years'][str(y)]))}" for y in sorted(years))
+    print(f"Wrote {out_path} (journals={len(out['keys'])} years={cols} "
+          f"bytes={out_path.stat().st_size} in {time.monotonic() - t0:.1f}s)")
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -5,7 +5,8 @@ Outputs src/data/vhb2024.csv and updates src/data/quality_sources.json.
 """
 from __future__ import annotations
 
-import io
+import argparse
+import concurrent.futures as futures
 import json
 import re
 from collections import OrderedDict
@@ -13,9 +14,12 @@ from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urljoin
 
-import pdfplumber
 import requests
 
+import http_cache
+import pdf_tables
+from venue_names import normalize_venue_name
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "src" / "data"
 OUT_CSV = DATA_DIR / "vhb2024.csv"
@@ -30,7 +34,7 @@ RANK_ORDER = {"A+": 5, "A": 4, "B": 3, "C": 2, "D": 1, "E": 0}
 
 
 def fetch_pdf_urls() -> list[str]:
-    html = requests.get(RATING_STRUCTURE_URL, timeout=30).text
+    html = http_cache.fetch_text(RATING_STRUCTURE_URL, timeout=30, session=requests)
     pdfs = re.findall(r'href=["\"]([^"\"]+\.pdf)["\"]', html, flags=re.I)
     pdfs = [urljoin(RATING_STRUCTURE_URL, p) for p in pdfs]
     # Only VHB 2024 area rating PDFs.
@@ -48,107 +52,78 @@ def fetch_pdf_urls() -> list[str]:
     return out
 
 
-def normalize_name(s: str) -> str:
-    t = str(s or "").lower().replace("&", " and ")
-    t = re.sub(r"[^a-z0-9]+", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    t = re.sub(r"^proceedings of the\s+", "", t)
-    t = re.sub(r"^proceedings of\s+", "", t)
-    t = re.sub(r"^the\s+", "", t)
-    t = re.sub(r"^\d+(st|nd|rd|th)\s+", "", t)
-    t = re.sub(r"^(19|20)\d{2}\s+", "", t)
-    t = re.sub(r"\s+\d+\s*-\s*\d+$", "", t)
-    while re.match(r"^\S.*\s+\d+\s+\d+$", t):
-        t = re.sub(r"\s+\d+\s+\d+$", "", t).strip()
-    t = re.sub(r"\s+\d+$", "", t).strip()
-    t = re.sub(r"\s+(?:tois|isr|isj|jmis|misq|ejis|jais|jsis|dss|kais|tkdd|tocs|tods|tis)$", "", t, flags=re.I).strip()
-    return t
-
-
-def group_lines(words, y_tol=2):
-    words_sorted = sorted(words, key=lambda w: (w["top"], w["x0"]))
-    lines = []
-    for w in words_sorted:
-        if not lines or abs(w["top"] - lines[-1]["top"]) > y_tol:
-            lines.append({"top": w["top"], "words": [w]})
-        else:
-            lines[-1]["words"].append(w)
-    return lines
-
-
-def parse_pdf(url: str) -> list[tuple[str, str]]:
-    resp = requests.get(url, timeout=60)
-    resp.raise_for_status()
-    content = resp.content
+def fetch_pdfs(urls: list[str], workers: int = 6) -> list[bytes]:
+    with futures.ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(lambda url: http_cache.fetch(url, timeout=60, session=requests), urls))
+
 
+def parse_area_pages(pages: list[list[list[dict]]]) -> list[tuple[str, str]]:
+    """(title, rank) rows from one area-rating PDF, given its pages as lines of words."""
     rows: list[tuple[str, str]] = []
-    with pdfplumber.open(io.BytesIO(content)) as pdf:
-        title_x0 = None
-        issn_x0 = None
-        rating_x0 = None
-        votes_x0 = None
-        in_scientific = False
-        title_buf: list[str] = []
-
-        for page in pdf.pages:
-            words = page.extract_words(x_tolerance=1, y_tolerance=2, keep_blank_chars=False)
-            lines = group_lines(words, y_tol=2)
-            for line in lines:
-                texts = [w["text"] for w in line["words"]]
-                line_text = " ".join(texts)
-
-                if "Type" in texts and "publication" in texts:
-                    in_scientific = "Scientific" in texts and "journals" in texts
-                    title_buf = []
-                    continue
-                if not in_scientific:
-                    continue
-
-                if "Title" in texts and "ISSN" in texts and "Rating" in texts:
-                    for w in line["words"]:
-                        if w["text"] == "Title":
-                            title_x0 = w["x0"]
-                        elif w["text"] == "ISSN":
-                            issn_x0 = w["x0"]
-                        elif w["text"] == "Rating":
-                            rating_x0 = w["x0"]
-                        elif w["text"] == "Votes":
-                            votes_x0 = w["x0"]
-                    title_buf = []
-                    continue
-
-                if line_text.startswith("©") or line_text.lower().startswith("letzte redaktionelle"):
-                    continue
-
-                if title_x0 is None or rating_x0 is None:
-                    continue
-
-                issn_words = [w for w in line["words"] if ISSN_RE.match(w["text"])]
-                rating_words = [
-                    w
-                    for w in line["words"]
-                    if w["x0"] >= rating_x0 - 1
-                    and (votes_x0 is None or w["x0"] < votes_x0 - 1)
-                    and RANK_RE.match(w["text"])
-                ]
-                title_words = [
-                    w
-                    for w in line["words"]
-                    if w["x0"] >= title_x0 - 1
-                    and (issn_x0 is None or w["x0"] < issn_x0 - 1)
-                    and not ISSN_RE.match(w["text"])
-                ]
-
-                if issn_words and rating_words:
-                    title_parts = title_buf + [w["text"] for w in title_words]
-                    title = " ".join(title_parts).strip()
-                    rank = rating_words[0]["text"].strip().replace("*", "+")
-                    if title and rank:
-                        rows.append((title, rank))
-                    title_buf = []
-                else:
-                    if title_words:
-                        title_buf.extend([w["text"] for w in title_words])
+    title_x0 = None
+    issn_x0 = None
+    rating_x0 = None
+    votes_x0 = None
+    in_scientific = False
+    title_buf: list[str] = []
+
+    for lines in pages:
+        for line in lines:
+            texts = [w["text"] for w in line]
+            line_text = " ".join(texts)
+
+            if "Type" in texts and "publication" in texts:
+                in_scientific = "Scientific" in texts and "journals" in texts
+                title_buf = []
+                continue
+            if not in_scientific:
+                continue
+
+            if "Title" in texts and "ISSN" in texts and "Rating" in texts:
+                for w in line:
+                    if w["text"] == "Title":
+                        title_x0 = w["x0"]
+                    elif w["text"] == "ISSN":
+                        issn_x0 = w["x0"]
+                    elif w["text"] == "Rating":
+                        rating_x0 = w["x0"]
+                    elif w["text"] == "Votes":
+                        votes_x0 = w["x0"]
+                title_buf = []
+                continue
+
+            if line_text.startswith("©") or line_text.lower().startswith("letzte redaktionelle"):
+                continue
+
+            if title_x0 is None or rating_x0 is None:
+                continue
+
+            issn_words = [w for w in line if ISSN_RE.match(w["text"])]
+            rating_words = [
+                w
+                for w in line
+                if w["x0"] >= rating_x0 - 1
+                and (votes_x0 is None or w["x0"] < votes_x0 - 1)
+                and RANK_RE.match(w["text"])
+            ]
+            title_words = [
+                w
+                for w in line
+                if w["x0"] >= title_x0 - 1
+                and (issn_x0 is None or w["x0"] < issn_x0 - 1)
+                and not ISSN_RE.match(w["text"])
+            ]
+
+            if issn_words and rating_words:
+                title_parts = title_buf + [w["text"] for w in title_words]
+                title = " ".join(title_parts).strip()
+                rank = rating_words[0]["text"].strip().replace("*", "+")
+                if title and rank:
+                    rows.append((title, rank))
+                title_buf = []
+            else:
+                if title_words:
+                    title_buf.extend([w["text"] for w in title_words])
 
     return rows
 
@@ -166,7 +141,7 @@ def load_aliases(path: Path) -> dict[str, str]:
             continue
         parts = [p.strip() for p in name.split("|") if p.strip()]
         for p in parts:
-            n = normalize_name(p)
+            n = normalize_venue_name(p)
             if not n:
                 continue
             cur = alias_map.get(n)
@@ -180,9 +155,11 @@ def build():
     if not pdf_urls:
         raise SystemExit("No PDF URLs found on rating structure page.")
 
+    # Pages of all area PDFs are extracted in parallel; unchanged PDFs come from the page cache.
+    # Cropped below the tables: footers are dropped, the headings above them are kept.
     entries: list[tuple[str, str]] = []
-    for url in pdf_urls:
-        entries.extend(parse_pdf(url))
+    for pages in pdf_tables.extract(fetch_pdfs(pdf_urls), "words", crop=True):
+        entries.extend(parse_area_pages(pages))
 
     # Merge by normalized title, keeping best rank and a stable display name.
     merged: dict[str, dict] = {}
@@ -190,7 +167,7 @@ def build():
         rank = rank.replace("*", "+")
         if rank not in RANK_ORDER:
             continue
-        n = normalize_name(title)
+        n = normalize_venue_name(title)
         if not n:
             continue
         cur = merged.get(n)
@@ -231,5 +208,17 @@ def build():
     print(f"Wrote {OUT_CSV} with {len(rows)} rows.")
 
 
-if __name__ == "__main__":
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    http_cache.add_cache_args(ap)
+    pdf_tables.add_pdf_args(ap)
+    args = ap.parse_args(argv)
+    cache = http_cache.install_from_args(args)
+    pdf_tables.install_from_args(args)
     build()
+    if cache:
+        print(f"HTTP cache: {cache.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,31 @@
 Collect advisor/advisee relationships from public committee/student lists.
 Input: text file with one URL per line (public pages only, respect ToS/robots).
 Output: JSONL edges {"advisor","student","source","url"}.
+
+Pages are fetched concurrently with a per-host delay, robots.txt is honoured and
+cached, and a conditional-GET cache (ETag/Last-Modified) under --cache-dir lets
+unchanged pages be answered from the previous run's pairs. Cache entries are
+appended to a journal as they are made, so an interrupted crawl resumes from
+what it had fetched; the end of a run compacts the journal into the JSON files.
 """
 import argparse
+import concurrent.futures as futures
 import json
 import re
+import threading
+import time
+import urllib.error
+import urllib.parse
 import urllib.request
+import urllib.robotparser
 from pathlib import Path
 from html.parser import HTMLParser
 
 
+USER_AGENT = "ScholarUtilityBelt/1.0"
+ROBOTS_TTL_S = 7 * 24 * 3600
+
+
 class TextExtractor(HTMLParser):
     def __init__(self):
         super().__init__()
@@ -22,18 +38,16 @@ class TextExtractor(HTMLParser):
 
 
 PAIR_PATTERNS = [
-    re.compile(r"(?P<student>[A-Z][A-Za-z\\-'. ]+)\\s*—\\s*(?P<advisor>[A-Z][A-Za-z\\-'. ]+)", re.UNICODE),
-    re.compile(r"(?P<student>[A-Z][A-Za-z\\-'. ]+)\\s*\\((?:Advisor|Supervisor)[:\\s]+(?P<advisor>[A-Z][A-Za-z\\-'. ]+)\\)", re.IGNORECASE),
+    re.compile(r"(?P<student>[A-Z][A-Za-z\-'. ]+)\s*—\s*(?P<advisor>[A-Z][A-Za-z\-'. ]+)", re.UNICODE),
+    re.compile(r"(?P<student>[A-Z][A-Za-z\-'. ]+)\s*\((?:Advisor|Supervisor)[:\s]+(?P<advisor>[A-Z][A-Za-z\-'. ]+)\)", re.IGNORECASE),
 ]
 
 
-def fetch_text(url, timeout=20):
-    req = urllib.request.Request(url, headers={"User-Agent": "ScholarUtilityBelt/1.0"})
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        html = resp.read().decode("utf-8", errors="ignore")
+def html_to_text(html):
     parser = TextExtractor()
     parser.feed(html)
-    return " ".join(parser.parts)
+    # Newlines keep names from running across block elements.
+    return "\n".join(parser.parts)
 
 
 def extract_pairs(text):
@@ -47,10 +61,170 @@ def extract_pairs(text):
     return pairs
 
 
+def load_json(path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def write_json_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+class PoliteFetcher:
+    """Thread-safe fetcher with per-host spacing, cached robots.txt and conditional GETs."""
+
+    def __init__(self, cache_dir, timeout=20, host_delay=1.0):
+        self.timeout = timeout
+        self.host_delay = host_delay
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.pages_path = self.cache_dir / "pages.json"
+        self.robots_path = self.cache_dir / "robots.json"
+        self.journal_path = self.cache_dir / "journal.jsonl"
+        self.pages = load_json(self.pages_path, {})
+        self.robots = load_json(self.robots_path, {})
+        self._replay_journal()
+        self._journal = self.journal_path.open("a", encoding="utf-8")
+        self._parsers = {}
+        self._host_locks = {}
+        self._host_next = {}
+        self._lock = threading.Lock()
+
+    def _replay_journal(self):
+        """Apply entries written since the last save(); a torn last line from a crash is ignored."""
+        try:
+            f = self.journal_path.open("r", encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            torn = False
+            for line in f:
+                torn = not line.endswith("\n")
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                table = self.pages if rec.get("kind") == "page" else self.robots
+                table[rec["key"]] = rec["entry"]
+        if torn:
+            with self.journal_path.open("a", encoding="utf-8") as f:
+                f.write("\n")
+
+    def _record(self, kind, key, entry):
+        # Caller holds self._lock.
+        (self.pages if kind == "page" else self.robots)[key] = entry
+        self._journal.write(json.dumps({"kind": kind, "key": key, "entry": entry}, ensure_ascii=False) + "\n")
+        self._journal.flush()
+
+    def _host_lock(self, host):
+        with self._lock:
+            return self._host_locks.setdefault(host, threading.Lock())
+
+    def _wait_turn(self, host):
+        # Reserve the host's next slot, then sleep outside the lock.
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._host_next.get(host, now))
+            self._host_next[host] = start + self.host_delay
+        if start > now:
+            time.sleep(start - now)
+
+    def _open(self, url, headers=None):
+        h = {"User-Agent": USER_AGENT}
+        h.update(headers or {})
+        req = urllib.request.Request(url, headers=h)
+        return urllib.request.urlopen(req, timeout=self.timeout)
+
+    def allowed(self, url):
+        parts = urllib.parse.urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._host_lock(host):
+            parser = self._parsers.get(host)
+            if parser is None:
+                entry = self.robots.get(host)
+                if not entry or time.time() - entry.get("fetchedAt", 0) > ROBOTS_TTL_S:
+                    entry = self._fetch_robots(host, parts.netloc)
+                parser = urllib.robotparser.RobotFileParser()
+                parser.parse(entry["lines"])
+                self._parsers[host] = parser
+        return parser.can_fetch(USER_AGENT, url)
+
+    def _fetch_robots(self, host, netloc):
+        """robots.txt lines for host; only definite answers are cached for ROBOTS_TTL_S.
+
+        As in RFC 9309, a missing file (4xx) allows everything and an unreachable
+        one (5xx, network error) disallows everything; the latter is kept for this
+        run only so a transient failure is retried next time.
+        """
+        lines = []
+        try:
+            # Spaced against page requests to the same host (fetch() uses the netloc too).
+            self._wait_turn(netloc)
+            with self._open(host + "/robots.txt") as resp:
+                lines = resp.read().decode("utf-8", errors="ignore").splitlines()
+        except urllib.error.HTTPError as e:
+            # 401/403 means "keep out"; other 4xx means no robots.txt.
+            if e.code in (401, 403):
+                lines = ["User-agent: *", "Disallow: /"]
+            elif e.code >= 500:
+                return {"fetchedAt": time.time(), "lines": ["User-agent: *", "Disallow: /"]}
+        except Exception:
+            return {"fetchedAt": time.time(), "lines": ["User-agent: *", "Disallow: /"]}
+        entry = {"fetchedAt": time.time(), "lines": lines}
+        with self._lock:
+            self._record("robots", host, entry)
+        return entry
+
+    def fetch(self, url):
+        """Return (html or None, cached entry). html is None when the page is unchanged."""
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            cached = self.pages.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("lastModified"):
+                headers["If-Modified-Since"] = cached["lastModified"]
+        self._wait_turn(host)
+        try:
+            with self._open(url, headers) as resp:
+                html = resp.read().decode("utf-8", errors="ignore")
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                return None, cached
+            raise
+        entry = {"etag": etag, "lastModified": last_modified, "fetchedAt": time.time()}
+        return html, entry
+
+    def remember(self, url, entry, pairs):
+        entry = dict(entry, pairs=[list(p) for p in pairs])
+        with self._lock:
+            self._record("page", url, entry)
+
+    def save(self):
+        """Compact the journal into pages.json/robots.json."""
+        with self._lock:
+            write_json_atomic(self.pages_path, self.pages)
+            write_json_atomic(self.robots_path, self.robots)
+            self._journal.close()
+            self._journal = self.journal_path.open("w", encoding="utf-8")
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--input", required=True)
     ap.add_argument("--output", required=True)
+    ap.add_argument("--cache-dir", default="output/committee_cache")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--timeout", type=int, default=20)
+    ap.add_argument("--host-delay", type=float, default=1.0, help="Minimum seconds between requests to one host")
     args = ap.parse_args()
 
     in_path = Path(args.input)
@@ -58,14 +232,32 @@ def main():
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     urls = [u.strip() for u in in_path.read_text().splitlines() if u.strip() and not u.strip().startswith("#")]
+    urls = list(dict.fromkeys(urls))
+    fetcher = PoliteFetcher(args.cache_dir, timeout=args.timeout, host_delay=args.host_delay)
+
+    def work(url):
+        if not fetcher.allowed(url):
+            return url, None, "robots"
+        html, entry = fetcher.fetch(url)
+        if html is None:
+            return url, [tuple(p) for p in entry.get("pairs") or []], "cached"
+        pairs = extract_pairs(html_to_text(html))
+        fetcher.remember(url, entry, pairs)
+        return url, pairs, "fetched"
+
     count = 0
-    with out_path.open("w", encoding="utf-8") as out:
-        for url in urls:
+    stats = {"fetched": 0, "cached": 0, "robots": 0, "failed": 0}
+    with out_path.open("w", encoding="utf-8") as out, \
+            futures.ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        pending = {ex.submit(work, url): url for url in urls}
+        for fut in futures.as_completed(pending):
             try:
-                text = fetch_text(url)
+                url, pairs, status = fut.result()
             except Exception:
+                stats["failed"] += 1
                 continue
-            for advisor, student in extract_pairs(text):
+            stats[status] += 1
+            for advisor, student in pairs or []:
                 out.write(json.dumps({
                     "advisor": advisor,
                     "student": student,
@@ -73,7 +265,9 @@ def main():
                     "url": url
                 }, ensure_ascii=False) + "\n")
                 count += 1
-    print(f"[committee] pairs={count} out={out_path}")
+            out.flush()
+    fetcher.save()
+    print(f"[committee] pairs={count} out={out_path} " + " ".join(f"{k}={v}" for k, v in stats.items()))
 
 
 if __name__ == "__main__":
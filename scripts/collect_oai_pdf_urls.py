@@ -2,22 +2,33 @@
 """
 Collect OA PDF URLs (and minimal metadata) from OAI-PMH sources.
 Writes JSONL rows: {title, author, pdf_url, source, identifier}
+
+Sources are collected concurrently. A SQLite state file next to the output
+keeps the normalized PDF URLs and identifiers already written (so a thesis
+exposed by both a repository and an aggregator is written once) and a
+per-source resumption marker used by --resume.
 """
 import argparse
+import concurrent.futures as futures
 import json
 import re
+import sqlite3
+import sys
+import threading
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+from oai_breaker import add_breaker_args, guard, install_from_args
+
 
 def fetch_xml(url, timeout=60):
     req = urllib.request.Request(
         url,
         headers={"User-Agent": "ScholarUtilityBelt/1.0 (OAI PDF collector)"},
     )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
+    with guard(url), urllib.request.urlopen(req, timeout=timeout) as resp:
         data = resp.read()
     return ET.fromstring(data)
 
@@ -26,11 +37,12 @@ def build_url(base, params):
     return base + "?" + urllib.parse.urlencode(params)
 
 
-def iter_records(base, metadata_prefix, set_specs=None, from_date=None, until_date=None, sleep_s=1.0, max_records=None, timeout=60):
+def iter_records(base, metadata_prefix, set_specs=None, from_date=None, until_date=None, sleep_s=1.0, max_records=None, timeout=60, token=None, on_page=None):
+    """Yield OAI records. on_page(token) is called after each page with the next
+    resumptionToken ("" once the list is exhausted); token resumes a previous walk."""
     total = 0
     set_specs = set_specs or [None]
     for set_spec in set_specs:
-        token = None
         while True:
             params = {"verb": "ListRecords"}
             if token:
@@ -58,6 +70,8 @@ def iter_records(base, metadata_prefix, set_specs=None, from_date=None, until_da
                     return
             token_el = root.find(".//{http://www.openarchives.org/OAI/2.0/}resumptionToken")
             token = (token_el.text or "").strip() if token_el is not None else ""
+            if on_page:
+                on_page(token)
             if not token:
                 break
 
@@ -97,6 +111,92 @@ def find_pdf_urls(identifiers, formats):
     return out
 
 
+TRACKING_PARAM_RE = re.compile(r"^(utm_\w+|fbclid|gclid)$", re.I)
+DOI_RE = re.compile(r"\b(10\.\d{4,9}/\S+)", re.I)
+HANDLE_RE = re.compile(r"(?:hdl\.handle\.net/|^hdl:|/handle/)(\d+(?:\.\d+)*/[^/?#\s]+)", re.I)
+
+
+def normalize_pdf_url(url):
+    """Key for a PDF URL: scheme-less, lowercase host, no default port, fragment or tracking params."""
+    parts = urllib.parse.urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urllib.parse.urlencode(sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(k)
+    ))
+    path = urllib.parse.unquote(parts.path).rstrip("/")
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+def identifier_keys(identifiers):
+    """DOIs and handles shared by repositories and aggregators that expose the same thesis."""
+    keys = []
+    for ident in identifiers or []:
+        m = DOI_RE.search(ident)
+        if m:
+            keys.append("doi:" + m.group(1).rstrip(".,;").lower())
+            continue
+        m = HANDLE_RE.search(ident)
+        if m:
+            keys.append("hdl:" + m.group(1).lower())
+    return keys
+
+
+class CollectorState:
+    """On-disk dedup set and per-source resume markers, shared by all workers."""
+
+    def __init__(self, path, reset=False):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        if reset:
+            self.db.executescript("DROP TABLE IF EXISTS seen; DROP TABLE IF EXISTS sources;")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS sources (
+                key TEXT PRIMARY KEY, token TEXT, records INTEGER, rows INTEGER, done INTEGER
+            );
+        """)
+        self.db.commit()
+
+    def claim(self, keys):
+        """Record keys; False if any of them was already seen."""
+        with self.lock:
+            cur = self.db.execute(
+                f"SELECT 1 FROM seen WHERE key IN ({','.join('?' * len(keys))}) LIMIT 1", keys
+            )
+            if cur.fetchone():
+                return False
+            self.db.executemany("INSERT OR IGNORE INTO seen (key) VALUES (?)", [(k,) for k in keys])
+            return True
+
+    def marker(self, key):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT token, records, rows, done FROM sources WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return {"token": "", "records": 0, "rows": 0, "done": False}
+        return {"token": row[0] or "", "records": row[1] or 0, "rows": row[2] or 0, "done": bool(row[3])}
+
+    def save_marker(self, key, token, records, rows, done):
+        # Committing here also makes the seen keys of the finished page durable.
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO sources (key, token, records, rows, done) VALUES (?, ?, ?, ?, ?)",
+                (key, token, records, rows, int(done)),
+            )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", required=True)
@@ -107,7 +207,12 @@ def main():
     ap.add_argument("--max-records", type=int, default=500)
     ap.add_argument("--max-sources", type=int, default=None)
     ap.add_argument("--timeout", type=int, default=30)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--state", default=None, help="SQLite state file (default: <out>.state.sqlite)")
+    ap.add_argument("--resume", action="store_true", help="Append to --out and continue unfinished sources")
+    add_breaker_args(ap)
     args = ap.parse_args()
+    install_from_args(args)
 
     cfg = json.loads(Path(args.config).read_text())
     sources = [s for s in cfg.get("sources", []) if s.get("enabled") is not False]
@@ -116,39 +221,93 @@ def main():
 
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    count = 0
-    with out_path.open("w", encoding="utf-8") as out:
-        for src in sources:
-            base = src["base"]
-            label = src.get("key") or src.get("label") or "source"
-            try:
-                for rec in iter_records(
-                    base,
-                    args.metadata_prefix,
-                    from_date=args.from_date,
-                    until_date=args.until_date,
-                    max_records=args.max_records,
-                    timeout=args.timeout,
-                ):
-                    meta = rec.find("{http://www.openarchives.org/OAI/2.0/}metadata")
-                    if meta is None:
-                        continue
-                    title, creator, identifier, fmt = extract_oai_dc(meta)
-                    pdfs = find_pdf_urls(identifier, fmt)
-                    if not pdfs:
+    state = CollectorState(args.state or str(out_path) + ".state.sqlite", reset=not args.resume)
+    out_lock = threading.Lock()
+    out = out_path.open("a" if args.resume else "w", encoding="utf-8")
+    totals = {"rows": 0, "dupes": 0, "failed": 0, "skipped": 0}
+
+    def collect(src):
+        base = src["base"]
+        label = src.get("key") or src.get("label") or "source"
+        marker = state.marker(label)
+        if marker["done"]:
+            with out_lock:
+                totals["skipped"] += 1
+            return
+        records, rows, dupes = marker["records"], marker["rows"], 0
+
+        def on_page(token):
+            with out_lock:
+                out.flush()
+            state.save_marker(label, token, records, rows, not token)
+
+        def walk(token):
+            nonlocal records, rows, dupes
+            for rec in iter_records(
+                base,
+                args.metadata_prefix,
+                from_date=args.from_date,
+                until_date=args.until_date,
+                max_records=(args.max_records - records) if args.max_records else None,
+                timeout=args.timeout,
+                token=token,
+                on_page=on_page,
+            ):
+                records += 1
+                meta = rec.find("{http://www.openarchives.org/OAI/2.0/}metadata")
+                if meta is None:
+                    continue
+                title, creator, identifier, fmt = extract_oai_dc(meta)
+                pdfs = find_pdf_urls(identifier, fmt)
+                if not pdfs:
+                    continue
+                id_keys = identifier_keys(identifier)
+                for i, pdf_url in enumerate(pdfs):
+                    # Identifier keys ride along with the first PDF of the record only.
+                    keys = ["url:" + normalize_pdf_url(pdf_url)] + (id_keys if i == 0 else [])
+                    if not state.claim(keys):
+                        dupes += 1
                         continue
-                    for pdf_url in pdfs:
-                        out.write(json.dumps({
-                            "title": title[0] if title else "",
-                            "author": creator[0] if creator else "",
-                            "pdf_url": pdf_url,
-                            "identifier": identifier[0] if identifier else "",
-                            "source": label
-                        }, ensure_ascii=False) + "\n")
-                        count += 1
-            except Exception:
-                continue
-    print(f"[pdf-collector] rows={count} out={out_path}")
+                    row = json.dumps({
+                        "title": title[0] if title else "",
+                        "author": creator[0] if creator else "",
+                        "pdf_url": pdf_url,
+                        "identifier": identifier[0] if identifier else "",
+                        "source": label
+                    }, ensure_ascii=False)
+                    with out_lock:
+                        out.write(row + "\n")
+                    rows += 1
+
+        try:
+            try:
+                walk(marker["token"] or None)
+            except RuntimeError as e:
+                # Resumption tokens expire; restart the list, dedup skips what was written.
+                if not marker["token"] or "badResumptionToken" not in str(e):
+                    raise
+                walk(None)
+            # End of the list or max_records reached: the source is finished.
+            on_page("")
+        except Exception as e:
+            with out_lock:
+                totals["failed"] += 1
+            print(f"[pdf-collector] source failed: {label} - {e}", file=sys.stderr, flush=True)
+            return
+        finally:
+            with out_lock:
+                totals["rows"] += rows - marker["rows"]
+                totals["dupes"] += dupes
+        print(f"[pdf-collector] {label} rows={rows} records={records} dupes={dupes}", flush=True)
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+            list(ex.map(collect, sources))
+    finally:
+        out.close()
+        state.close()
+    print(f"[pdf-collector] rows={totals['rows']} dupes={totals['dupes']} failed={totals['failed']} "
+          f"skipped={totals['skipped']} out={out_path}")
 
 
 if __name__ == "__main__":
@@ -2,11 +2,24 @@
 """
 Discover OAI-PMH base URLs from the COAR IRD directory (CC0) and
 generate a harvester config with likely ETD-capable metadata prefixes.
+
+The crawl is resumable: browser pages, the system frontier and parsed
+sources live in a SQLite state file (--state). An interrupted crawl picks up
+where it stopped; a finished crawl starts a new pass on the next run, where
+detail pages are fetched with If-None-Match / If-Modified-Since so only new
+or changed systems are downloaded and parsed again. Each system remembers the
+last pass whose browser listing included it; once a pass has scanned every
+browser page, systems that have left the directory are neither revisited nor
+written out. --out is rewritten from the state as sources are found.
 """
 import argparse
+import concurrent.futures as futures
 import json
 import re
+import sqlite3
+import threading
 import time
+import urllib.error
 import urllib.request
 from pathlib import Path
 from html.parser import HTMLParser
@@ -32,16 +45,25 @@ class LinkCollector(HTMLParser):
             self.links.append(href)
 
 
-def fetch(url, timeout=60):
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "Mozilla/5.0 (ScholarUtilityBelt IRD harvester)",
-            "Accept": "text/html,application/xhtml+xml",
-        },
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return resp.read().decode("utf-8", errors="ignore")
+def fetch(url, timeout=60, etag=None, last_modified=None):
+    """Return (status, html, etag, last_modified); status 304 means unchanged and html is None."""
+    headers = {
+        "User-Agent": "Mozilla/5.0 (ScholarUtilityBelt IRD harvester)",
+        "Accept": "text/html,application/xhtml+xml",
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            html = resp.read().decode("utf-8", errors="ignore")
+            return resp.status, html, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, None, etag, last_modified
+        raise
 
 
 def parse_detail(html):
@@ -54,7 +76,7 @@ def parse_detail(html):
         base_url = m.group(1).strip()
     # Metadata formats list
     for fmt in re.findall(r"<li>\s*([^<]+)\s*</li>", html):
-        f = re.sub(r"\\s+", " ", fmt).strip()
+        f = re.sub(r"\s+", " ", fmt).strip()
         if f in ("ETDMS 1.0", "ETDMS 1.1", "UKETD_DC", "MODS 3", "MODS"):
             formats.append(f)
     return base_url, formats, oai_online
@@ -72,57 +94,191 @@ def prefixes_for_formats(formats):
     return list(dict.fromkeys(prefixes))
 
 
+def source_for_system(link, html):
+    base_url, formats, online = parse_detail(html)
+    if not base_url or not online:
+        return None
+    key = "ird_" + link.rsplit("/", 1)[-1]
+    return {
+        "key": key,
+        "label": f"IRD {key}",
+        "base": base_url,
+        "metadataPrefixes": prefixes_for_formats(formats)
+    }
+
+
+class CrawlState:
+    """Frontier, visited set and parsed sources shared by the crawl workers."""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, started REAL, finished REAL);
+            CREATE TABLE IF NOT EXISTS pages (run INTEGER, page INTEGER, PRIMARY KEY (run, page));
+            CREATE TABLE IF NOT EXISTS systems (
+                url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,
+                run INTEGER, fetched_at REAL, source TEXT, listed INTEGER
+            );
+        """)
+        columns = {r[1] for r in self.db.execute("PRAGMA table_info(systems)")}
+        if "listed" not in columns:
+            self.db.execute("ALTER TABLE systems ADD COLUMN listed INTEGER")
+        self.db.commit()
+
+    def start_run(self, fresh=False):
+        """Resume the last unfinished run, or start a new one."""
+        with self.lock:
+            row = self.db.execute("SELECT id, finished FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+            if row and row[1] is None and not fresh:
+                return row[0], True
+            run = (row[0] + 1) if row else 1
+            self.db.execute("INSERT INTO runs (id, started) VALUES (?, ?)", (run, time.time()))
+            self.db.commit()
+            return run, False
+
+    def finish_run(self, run):
+        with self.lock:
+            self.db.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), run))
+            self.db.commit()
+
+    def pages_done(self, run):
+        with self.lock:
+            return {r[0] for r in self.db.execute("SELECT page FROM pages WHERE run = ?", (run,))}
+
+    def add_page(self, run, page, links):
+        with self.lock:
+            self.db.executemany("INSERT OR IGNORE INTO systems (url) VALUES (?)", [(u,) for u in links])
+            self.db.executemany("UPDATE systems SET listed = ? WHERE url = ?", [(run, u) for u in links])
+            self.db.execute("INSERT OR IGNORE INTO pages (run, page) VALUES (?, ?)", (run, page))
+            self.db.commit()
+
+    def frontier(self, run, listed_only):
+        """Systems not yet visited in this run, with their cached validators.
+
+        With listed_only, only systems on this run's browser pages are included.
+        """
+        with self.lock:
+            return self.db.execute(
+                "SELECT url, etag, last_modified FROM systems WHERE (run IS NULL OR run < ?) "
+                "AND (? = 0 OR listed = ?) ORDER BY url", (run, listed_only, run)
+            ).fetchall()
+
+    def visit(self, run, url, etag, last_modified, source, changed):
+        with self.lock:
+            if changed:
+                self.db.execute(
+                    "UPDATE systems SET etag = ?, last_modified = ?, run = ?, fetched_at = ?, source = ? WHERE url = ?",
+                    (etag, last_modified, run, time.time(), json.dumps(source) if source else None, url),
+                )
+            else:
+                self.db.execute("UPDATE systems SET run = ? WHERE url = ?", (run, url))
+            self.db.commit()
+
+    def sources(self, listed_in=None):
+        """Parsed sources, limited to systems listed in run listed_in when given."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT source FROM systems WHERE source IS NOT NULL AND (? IS NULL OR listed = ?) ORDER BY url",
+                (listed_in, listed_in),
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def delisted(self, run):
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM systems WHERE listed IS NULL OR listed < ?", (run,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def write_sources(out_path, sources):
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"sources": sources}, indent=2))
+    tmp.replace(out_path)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--out", default="output/ird_oai_sources.json")
+    ap.add_argument("--state", default=None, help="SQLite crawl state (default: <out>.state.sqlite)")
+    ap.add_argument("--fresh", action="store_true", help="Start a new pass even if the last one was interrupted")
     ap.add_argument("--max-pages", type=int, default=377)
     ap.add_argument("--max-records", type=int, default=None)
-    ap.add_argument("--sleep", type=float, default=0.5)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--sleep", type=float, default=0.5, help="Pause after each request, per worker")
     ap.add_argument("--timeout", type=int, default=20)
     args = ap.parse_args()
 
-    system_links = []
-    for page in range(1, args.max_pages + 1):
-        url = f"{IRD_BASE}/browser?lang=en&page={page}"
-        html = fetch(url, timeout=args.timeout)
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    state = CrawlState(args.state or str(out_path) + ".state.sqlite")
+    run, resumed = state.start_run(fresh=args.fresh)
+    print(f"[ird] run={run}{' (resumed)' if resumed else ''}")
+
+    def scan_page(page):
+        html = fetch(f"{IRD_BASE}/browser?lang=en&page={page}", timeout=args.timeout)[1]
         parser = LinkCollector()
         parser.feed(html)
-        for href in parser.links:
-            if href.startswith("/systems/"):
-                system_links.append(IRD_BASE + href)
-        if page % 25 == 0:
-            print(f"[ird] scanned pages={page} systems={len(system_links)}")
+        links = list(dict.fromkeys(IRD_BASE + h for h in parser.links if h.startswith("/systems/")))
+        state.add_page(run, page, links)
         time.sleep(args.sleep)
-    system_links = list(dict.fromkeys(system_links))
+        return len(links)
+
+    done_pages = state.pages_done(run)
+    todo_pages = [p for p in range(1, args.max_pages + 1) if p not in done_pages]
+    failed_pages = 0
+    with futures.ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        pending = {ex.submit(scan_page, p): p for p in todo_pages}
+        for i, fut in enumerate(futures.as_completed(pending), 1):
+            try:
+                fut.result()
+            except Exception as e:
+                failed_pages += 1
+                print(f"[ird] browser page {pending[fut]} failed: {e}")
+            if i % 25 == 0:
+                print(f"[ird] scanned pages={len(done_pages) + i}/{args.max_pages}")
+
+    # Until every browser page of this pass is in, the listing is partial and cannot retire anything.
+    complete = not failed_pages
+    listed_in = run if complete else None
+    frontier = state.frontier(run, complete)
     if args.max_records:
-        system_links = system_links[: args.max_records]
-
-    sources = []
-    for idx, link in enumerate(system_links, 1):
-        try:
-            html = fetch(link, timeout=args.timeout)
-            base_url, formats, online = parse_detail(html)
-            if not base_url:
-                continue
-            if not online:
-                continue
-            prefixes = prefixes_for_formats(formats)
-            key = "ird_" + link.rsplit("/", 1)[-1]
-            sources.append({
-                "key": key,
-                "label": f"IRD {key}",
-                "base": base_url,
-                "metadataPrefixes": prefixes
-            })
-        except Exception:
-            continue
-        if idx % 50 == 0:
-            time.sleep(args.sleep)
+        frontier = frontier[: args.max_records]
+    stats = {"changed": 0, "unchanged": 0, "failed": 0}
 
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps({"sources": sources}, indent=2))
-    print(f"[ird] sources={len(sources)} out={out_path}")
+    def visit(item):
+        url, etag, last_modified = item
+        status, html, new_etag, new_lm = fetch(url, timeout=args.timeout, etag=etag, last_modified=last_modified)
+        time.sleep(args.sleep)
+        if status == 304:
+            state.visit(run, url, etag, last_modified, None, changed=False)
+            return "unchanged"
+        state.visit(run, url, new_etag, new_lm, source_for_system(url, html), changed=True)
+        return "changed"
+
+    with futures.ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        for idx, fut in enumerate(futures.as_completed([ex.submit(visit, item) for item in frontier]), 1):
+            try:
+                stats[fut.result()] += 1
+            except Exception:
+                stats["failed"] += 1
+            if idx % 100 == 0:
+                write_sources(out_path, state.sources(listed_in))
+                print(f"[ird] systems={idx}/{len(frontier)} " + " ".join(f"{k}={v}" for k, v in stats.items()))
+
+    sources = state.sources(listed_in)
+    write_sources(out_path, sources)
+    if complete:
+        stats["delisted"] = state.delisted(run)
+    # A pass with failures stays open so the next run retries just those.
+    if not failed_pages and not stats["failed"]:
+        state.finish_run(run)
+    state.close()
+    print(f"[ird] sources={len(sources)} out={out_path} " + " ".join(f"{k}={v}" for k, v in stats.items()))
 
 
 if __name__ == "__main__":
@@ -2,27 +2,176 @@
 """
 Extract advisor/advisee pairs from OA thesis PDFs.
 Input: JSONL with fields {"title","author","pdf_url"} or CSV with pdf_url column.
-Output: JSONL edges {"advisor","student","source","pdf_url","title"}.
+Output: JSONL edges {"advisor","student","role","source","pdf_url","title"}.
+
+Benchmark the matcher on front-matter text (a directory of .txt files or JSONL
+with a "text" field and optionally the expected "advisors"); without a path it
+runs on scripts/advisor_frontmatter_sample.jsonl and reports precision/recall:
+    python3 scripts/extract_advisors_from_pdfs.py --bench [path/to/corpus]
 """
 import argparse
 import csv
+import functools
 import json
 import re
 import tempfile
+import time
 import urllib.request
+from collections import namedtuple
 from pathlib import Path
 
-import pdfplumber
+try:
+    import pdfplumber
+except ImportError:  # --bench only needs the matcher
+    pdfplumber = None
+
 
+# Role labels that introduce a name ("Advisor: Jane Doe", or the label alone on
+# a line with the name on the next one). Longer alternatives come first so
+# "Thesis Advisor" wins over "Advisor" and "Co-advisor" over "advisor".
+LABEL_ROLES = [
+    ("co_advisor", [
+        r"co[- ]?advis[oe]r", r"co[- ]?supervisor", r"co[- ]?betreuer(?:in)?",
+        r"co[- ]?direct(?:eur|rice) de th[eè]se", r"co[- ]?orientador(?:a)?",
+    ]),
+    ("chair", [
+        r"chair(?:person)? of (?:the )?(?:supervisory |examining |advisory |thesis |dissertation )?committee",
+        r"(?:supervisory |examining |advisory |thesis |dissertation )?committee chair(?:person)?",
+        # Not "Department Chair: ..." on an approval page.
+        r"(?<!department )(?<!dept\. )chair(?:person)?",
+    ]),
+    ("advisor", [
+        r"(?:thesis|dissertation|research|academic|major|principal|faculty) advis[oe]r",
+        r"advis[oe]r",
+        r"direct(?:eur|rice) de (?:la )?th[eè]se",
+        r"director(?:a)? de (?:la )?tesis",
+        r"orientador(?:a)?",
+        r"relat(?:ore|rice)",
+        r"promotor",
+        r"doktor(?:vater|mutter)",
+        r"指導教員", r"指導教官", r"指导教师", r"导师",
+    ]),
+    ("supervisor", [
+        r"(?:thesis|dissertation|research|principal|main|primary) supervisor",
+        r"supervisor",
+        r"(?:erst)?betreuer(?:in)?",
+    ]),
+]
 
-ADVISOR_PATTERNS = [
-    re.compile(r"advisor[:\\s]+(.+)", re.IGNORECASE),
-    re.compile(r"supervisor[:\\s]+(.+)", re.IGNORECASE),
-    re.compile(r"thesis advisor[:\\s]+(.+)", re.IGNORECASE),
-    re.compile(r"dissertation advisor[:\\s]+(.+)", re.IGNORECASE),
-    re.compile(r"committee chair[:\\s]+(.+)", re.IGNORECASE),
+# Prose phrases followed directly by the name ("Advised by Prof. Jane Doe").
+PROSE_ROLES = [
+    ("advisor", [
+        r"advised by", r"under the (?:direction|guidance) of", r"sous la direction de",
+        r"dirigid[ao] por", r"orientad[ao] por",
+    ]),
+    ("supervisor", [
+        r"supervised by", r"under the supervision of", r"betreut von",
+        r"unter (?:der )?betreuung von",
+    ]),
 ]
 
+# Name shape used after prose phrases, where the name is followed by more prose.
+_NAME_WORD = r"[A-ZÀ-ÖØ-Þ][\w'.\-]*"
+_NAME_SHAPE = (
+    r"(?:(?:Dr|Prof|Professor)\.?[ \t]+)?" + _NAME_WORD
+    + r"(?:[ \t]+(?:" + _NAME_WORD + r"|van|von|der|de|da|di|del|la|le)){0,5}"
+)
+
+
+def _alternation(groups):
+    alts = [alt for _, patterns in groups for alt in patterns]
+    # Longest first so the regex engine prefers the most specific label.
+    alts.sort(key=len, reverse=True)
+    return "|".join(alts)
+
+
+# One combined pattern: every label and prose form is found in a single scan.
+ADVISOR_MATCHER = re.compile(
+    r"(?:(?P<lead>^[ \t]*)?(?<![\w-])(?P<label>(?i:" + _alternation(LABEL_ROLES) + r"))"
+    r"(?P<sep>[ \t]*[:：][ \t]*(?:\r?\n[ \t]*)?|[ \t]*\r?\n[ \t]*|[ \t\u3000]+)"
+    r"(?P<name>[^\r\n]+)"
+    r"|(?<![\w-])(?P<prose>(?i:" + _alternation(PROSE_ROLES) + r"))[ \t\r\n]+"
+    r"(?P<pname>" + _NAME_SHAPE + r"))",
+    re.MULTILINE,
+)
+
+_ROLE_OF = [
+    (re.compile(alt, re.IGNORECASE), role)
+    for role, patterns in LABEL_ROLES + PROSE_ROLES
+    for alt in patterns
+]
+# A label without a colon is only trusted when a name follows it: capitalised
+# words, or a CJK name ("指導教員 山田太郎"). Wrapped prose such as
+# "my\nadvisor for his patience" or "Chair of Department of Biology" fails this.
+_CJK_RUN = r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+"
+_NAME_START = re.compile(_NAME_SHAPE + r"|" + _CJK_RUN + r"(?:[ \t\u3000]" + _CJK_RUN + r")*")
+# First words of the lines that follow a label on signature pages ("Thesis
+# Supervisor\nAccepted by ..."), which are capitalised but not names.
+_NOT_NAMES = frozenset(
+    "accepted approved certified signature signed date department professor associate assistant "
+    "committee member members chair chairperson thesis dissertation examiner reader dean faculty "
+    "school university graduate program".split())
+_FIRST_WORD = re.compile(r"(?:(?:Dr|Prof|Professor)\.?[ \t]+(?=\S))?([^\s,.]+)")
+# Degrees and honorifics after a name ("Jane Doe, Ph.D.", "山田 太郎 教授"); case-sensitive so
+# surnames such as "Ma" survive.
+_DEGREE_SUFFIX = re.compile(
+    r"(?:(?:,[ \t]*|[ \t]+)(?:Ph\.?[ \t]?D|D\.?Phil|Ed\.?D|D\.?Sc|M\.?D|M\.?Sc|M\.?B\.?A|M\.?P\.?H"
+    r"|M\.?S|M\.?A|J\.?D|P\.?E)\.?(?![\w])|[ \t\u3000]*(?:准教授|教授|先生))+$")
+_NAME_END = re.compile(r"\s{2,}|\t")
+_NAME_JOIN = re.compile(r"\s+(?:and|und|et)\s+|\s*[&;]\s*")
+MAX_NAME_LEN = 100
+BENCH_SAMPLE = Path(__file__).resolve().parent / "advisor_frontmatter_sample.jsonl"
+
+RoleSpan = namedtuple("RoleSpan", "role label name start end")
+
+
+@functools.lru_cache(maxsize=512)
+def role_for_label(label):
+    label = " ".join(label.split())
+    for pat, role in _ROLE_OF:
+        if pat.fullmatch(label):
+            return role
+    return "advisor"
+
+
+def find_role_spans(text):
+    """Return RoleSpan(role, label, name, start, end) for every labelled name in text."""
+    spans = []
+    for m in ADVISOR_MATCHER.finditer(text):
+        if m.group("prose") is not None:
+            label, group, shaped = m.group("prose"), "pname", False
+        else:
+            # Without a colon the label has to open its line, otherwise plain
+            # prose like "my advisor for his patience" would match. A name on
+            # the line after the label has to look like one either way.
+            sep = m.group("sep")
+            colon = ":" in sep or "：" in sep
+            if not colon and m.group("lead") is None:
+                continue
+            shaped = not colon or "\n" in sep
+            label, group = m.group("label"), "name"
+        raw = m.group(group)
+        base = m.start(group)
+        raw = _NAME_END.split(raw, 1)[0]
+        role = role_for_label(label)
+        pos = 0
+        for part in _NAME_JOIN.split(raw):
+            offset = raw.find(part, pos)
+            pos = offset + len(part)
+            name = part.strip(" :;,.")
+            if shaped:
+                shape = _NAME_START.match(name)
+                name = shape.group(0).rstrip(" .") if shape else ""
+                first = _FIRST_WORD.match(name)
+                if first and first.group(1).lower() in _NOT_NAMES:
+                    continue
+            name = _DEGREE_SUFFIX.sub("", name).rstrip(" ,")
+            if not name or len(name) > MAX_NAME_LEN or not any(ch.isalpha() for ch in name):
+                continue
+            start = base + offset + (len(part) - len(part.lstrip(" :;,.")))
+            spans.append(RoleSpan(role, label, name, start, start + len(name)))
+    return spans
+
 
 def read_inputs(path):
     if path.suffix.lower() == ".jsonl":
@@ -42,15 +191,86 @@ def read_inputs(path):
 
 
 def extract_advisors_from_text(text):
-    advisors = set()
-    for pat in ADVISOR_PATTERNS:
-        for m in pat.finditer(text):
-            val = m.group(1).strip()
-            # trim trailing punctuation/lines
-            val = re.split(r"[\\r\\n]|\\s{2,}", val)[0].strip(" :;,.")
-            if val:
-                advisors.add(val)
-    return list(advisors)
+    seen = set()
+    advisors = []
+    for span in find_role_spans(text):
+        if span.name not in seen:
+            seen.add(span.name)
+            advisors.append(span.name)
+    return advisors
+
+
+def iter_bench_texts(path):
+    """(text, expected advisor names or None) for every document in a bench corpus."""
+    if path.is_dir():
+        for p in sorted(path.rglob("*.txt")):
+            yield p.read_text(encoding="utf-8", errors="ignore"), None
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                doc = json.loads(line)
+                yield doc.get("text") or "", doc.get("advisors")
+
+
+# Fixed cases checked before every --bench run: (text, expected advisor names).
+BENCH_CASES = [
+    ("Advisor: Jane Doe", ["Jane Doe"]),
+    ("Thesis Supervisor\nProf. Maria van der Berg", ["Prof. Maria van der Berg"]),
+    ("Committee Chair Robert Smith and Ana Lima", ["Robert Smith", "Ana Lima"]),
+    ("指導教員 山田太郎", ["山田太郎"]),
+    ("Advised by Dr. Alan Turing in 1938.", ["Dr. Alan Turing"]),
+    ("Advisor:\nJane Doe", ["Jane Doe"]),
+    ("Supervisor:\n  Jane Doe, PhD\n  Associate Professor", ["Jane Doe"]),
+    ("Department Chair: Bob Harris", []),
+    # Wrapped prose and headings that only look like labels.
+    ("I thank my\nadvisor for his patience and guidance.", []),
+    ("Chair of Department of Biology", []),
+    ("I am grateful to my advisor for her support.", []),
+    ("Supervisor\nof the laboratory, who kindly helped", []),
+]
+
+
+def check_bench_cases():
+    failures = 0
+    for text, expected in BENCH_CASES:
+        got = extract_advisors_from_text(text)
+        if got != expected:
+            failures += 1
+            print(f"[bench] case mismatch: {text!r} -> {got}, expected {expected}")
+    print(f"[bench] cases={len(BENCH_CASES)} mismatches={failures}")
+    return failures
+
+
+def run_bench(path, repeat=3):
+    check_bench_cases()
+    docs = list(iter_bench_texts(path))
+    if not docs:
+        raise SystemExit(f"No texts found in {path}")
+    texts = [text for text, _ in docs]
+    labelled = [(text, set(expected)) for text, expected in docs if expected is not None]
+    if labelled:
+        found = [set(extract_advisors_from_text(text)) for text, _ in labelled]
+        hits = sum(len(got & want) for got, (_, want) in zip(found, labelled))
+        n_found = sum(len(got) for got in found)
+        n_want = sum(len(want) for _, want in labelled)
+        exact = sum(got == want for got, (_, want) in zip(found, labelled))
+        print(f"[bench] labelled={len(labelled)} exact={exact} "
+              f"precision={hits / max(1, n_found):.2f} recall={hits / max(1, n_want):.2f}")
+    size_mb = sum(len(t.encode("utf-8")) for t in texts) / 1e6
+    roles = {}
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in texts:
+            for span in find_role_spans(text):
+                roles[span.role] = roles.get(span.role, 0) + 1
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    roles = {k: v // repeat for k, v in sorted(roles.items())}
+    print(f"[bench] docs={len(texts)} size={size_mb:.1f}MB best={best:.3f}s "
+          f"docs/s={len(texts) / best:.0f} MB/s={size_mb / best:.1f} spans={roles}")
 
 
 def fetch_pdf(url, timeout=30):
@@ -60,14 +280,36 @@ def fetch_pdf(url, timeout=30):
     return data
 
 
+def pdf_front_text(data, max_pages=2):
+    """Text of the first max_pages pages of a PDF given as bytes."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=True) as tmp:
+        tmp.write(data)
+        tmp.flush()
+        with pdfplumber.open(tmp.name) as pdf:
+            text = ""
+            for i in range(min(max_pages, len(pdf.pages))):
+                text += (pdf.pages[i].extract_text() or "") + "\n"
+    return text
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--input", required=True)
-    ap.add_argument("--output", required=True)
+    ap.add_argument("--input")
+    ap.add_argument("--output")
     ap.add_argument("--max-pages", type=int, default=2)
     ap.add_argument("--max-records", type=int, default=None)
+    ap.add_argument("--bench", nargs="?", const=str(BENCH_SAMPLE), default=None,
+                    help="Time the matcher on a text corpus and exit (default: the bundled front-matter sample)")
     args = ap.parse_args()
 
+    if args.bench:
+        run_bench(Path(args.bench))
+        return
+    if not args.input or not args.output:
+        ap.error("--input and --output are required")
+    if pdfplumber is None:
+        raise SystemExit("pdfplumber is required to read PDFs (pip install pdfplumber)")
+
     in_path = Path(args.input)
     out_path = Path(args.output)
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -86,21 +328,19 @@ def main():
                 data = fetch_pdf(pdf_url)
             except Exception:
                 continue
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=True) as tmp:
-                tmp.write(data)
-                tmp.flush()
-                try:
-                    with pdfplumber.open(tmp.name) as pdf:
-                        text = ""
-                        for i in range(min(args.max_pages, len(pdf.pages))):
-                            text += (pdf.pages[i].extract_text() or "") + "\n"
-                except Exception:
+            try:
+                text = pdf_front_text(data, args.max_pages)
+            except Exception:
+                continue
+            seen = set()
+            for span in find_role_spans(text):
+                if span.name in seen:
                     continue
-            advisors = extract_advisors_from_text(text)
-            for adv in advisors:
+                seen.add(span.name)
                 out.write(json.dumps({
-                    "advisor": adv,
+                    "advisor": span.name,
                     "student": author,
+                    "role": span.role,
                     "title": title,
                     "pdf_url": pdf_url,
                     "source": "oa_pdf"
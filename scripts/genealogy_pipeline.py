@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Streaming genealogy pipeline: OAI records -> (metadata edges | thesis PDFs) -> merged dataset.
+
+Runs the harvest, PDF extraction and merge stages in one process, joined by
+bounded queues instead of intermediate files. Records with advisor metadata
+feed edges straight into the merge store; records without it but with an OA
+PDF are queued for PDF extraction while the harvest keeps running. A full
+queue blocks the stage feeding it, so memory stays bounded. If any stage dies,
+the others stop waiting on the queues and nothing is written.
+
+Usage:
+    python3 scripts/genealogy_pipeline.py --config scripts/genealogy_sources.json \
+        --out-names output/merged.names.json.gz --out-edges output/merged.edges.bin.gz \
+        [--datasets name=names.gz,edges.gz ...]
+"""
+import argparse
+import concurrent.futures as futures
+import json
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+from collect_oai_pdf_urls import find_pdf_urls, normalize_pdf_url
+from extract_advisors_from_pdfs import fetch_pdf, find_role_spans, pdf_front_text, pdfplumber
+from harvest_genealogy_oai import (
+    iter_records,
+    localname,
+    norm_space,
+    parse_record,
+    resolve_set_specs,
+    select_prefixes,
+)
+from merge_genealogy_datasets import MergeStore
+from oai_breaker import add_breaker_args, install_from_args
+
+
+DONE = object()
+POLL_S = 1.0
+
+
+class Aborted(Exception):
+    """Another stage died; this one stops instead of blocking on a queue."""
+
+
+def record_pdf_candidates(rec):
+    """(title, author, pdf_urls) from any metadata format's identifier/url elements."""
+    meta = rec.find("{http://www.openarchives.org/OAI/2.0/}metadata")
+    if meta is None:
+        return "", "", []
+    title = author = ""
+    idents = []
+    for el in meta.iter():
+        lname = localname(el.tag)
+        text = norm_space(el.text)
+        if not text:
+            continue
+        if lname == "title" and not title:
+            title = text
+        elif lname in ("creator", "author") and not author:
+            author = text
+        elif lname in ("identifier", "url"):
+            idents.append(text)
+    return title, author, find_pdf_urls(idents, [])
+
+
+class Pipeline:
+    def __init__(self, args):
+        self.args = args
+        self.pdf_q = queue.Queue(maxsize=args.queue_size)
+        self.edge_q = queue.Queue(maxsize=args.queue_size)
+        self.store = MergeStore()
+        self.seen_pdfs = set()
+        self.lock = threading.Lock()
+        self.stats = {
+            "records": 0, "meta_edges": 0, "pdfs_queued": 0, "pdfs_done": 0,
+            "pdf_edges": 0, "pdf_failed": 0, "merged_edges": 0, "sources_failed": 0,
+        }
+        self.stage_time = {}
+        self.failed = threading.Event()
+        self.stage_error = None
+        self.prov = open(args.provenance, "w", encoding="utf-8") if args.provenance else None
+
+    def put(self, q, item):
+        while True:
+            if self.failed.is_set():
+                raise Aborted()
+            try:
+                q.put(item, timeout=POLL_S)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, q):
+        while True:
+            if self.failed.is_set():
+                raise Aborted()
+            try:
+                return q.get(timeout=POLL_S)
+            except queue.Empty:
+                continue
+
+    def stage(self, name, body, *args):
+        """Run a stage body in its thread; any failure stops every other stage."""
+        try:
+            body(*args)
+        except Aborted:
+            return
+        except BaseException as e:
+            with self.lock:
+                if self.stage_error is None:
+                    self.stage_error = (name, e)
+            self.failed.set()
+            raise
+
+    def bump(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    # Stage 1: walk every source and route each record.
+    def harvest_source(self, src):
+        args = self.args
+        key = src.get("key") or src.get("label") or "source"
+        base = src["base"]
+        try:
+            set_specs = resolve_set_specs(base, src, args.set_regex, sleep_s=args.sleep, timeout=args.timeout)
+            if set_specs == []:
+                print(f"[pipeline] {key} no set match for regex; skipping source", flush=True)
+                return
+            for rec, prefix in iter_records(
+                base,
+                select_prefixes(src),
+                set_specs=set_specs,
+                from_date=args.from_date,
+                until_date=args.until_date,
+                sleep_s=args.sleep,
+                max_records=args.max_records,
+                timeout=args.timeout,
+            ):
+                self.bump("records")
+                parsed, _ = parse_record(rec, prefix)
+                if parsed:
+                    for student in parsed["creators"]:
+                        for advisor in parsed["advisors"]:
+                            self.put(self.edge_q, (advisor, student, key, "metadata"))
+                            self.bump("meta_edges")
+                    continue
+                if args.no_pdf:
+                    continue
+                title, author, pdfs = record_pdf_candidates(rec)
+                if not author:
+                    continue
+                for pdf_url in pdfs:
+                    norm = normalize_pdf_url(pdf_url)
+                    with self.lock:
+                        if norm in self.seen_pdfs:
+                            continue
+                        self.seen_pdfs.add(norm)
+                    self.put(self.pdf_q, {"pdf_url": pdf_url, "author": author, "title": title, "source": key})
+                    self.bump("pdfs_queued")
+                    break
+        except Aborted:
+            raise
+        except Exception as e:
+            self.bump("sources_failed")
+            print(f"[pipeline] source failed: {key} - {e}", file=sys.stderr, flush=True)
+
+    def run_harvest(self, sources):
+        t0 = time.monotonic()
+        with futures.ThreadPoolExecutor(max_workers=max(1, self.args.harvest_workers)) as ex:
+            list(ex.map(self.harvest_source, sources))
+        self.stage_time["harvest"] = time.monotonic() - t0
+        for _ in range(self.args.pdf_workers):
+            self.put(self.pdf_q, DONE)
+
+    # Stage 2: download thesis PDFs and match role labels in the front matter.
+    def run_pdf(self):
+        while True:
+            row = self.get(self.pdf_q)
+            if row is DONE:
+                return
+            try:
+                text = pdf_front_text(fetch_pdf(row["pdf_url"]), self.args.max_pages)
+            except Exception:
+                self.bump("pdf_failed")
+                continue
+            names = []
+            for span in find_role_spans(text):
+                if span.name not in names:
+                    names.append(span.name)
+            for advisor in names:
+                self.put(self.edge_q, (advisor, row["author"], row["source"], "oa_pdf"))
+                self.bump("pdf_edges")
+            self.bump("pdfs_done")
+
+    # Stage 3: single consumer that owns the merge store.
+    def run_merge(self):
+        t0 = time.monotonic()
+        while True:
+            item = self.get(self.edge_q)
+            if item is DONE:
+                break
+            advisor, student, source, kind = item
+            if self.store.add_edge(advisor, student):
+                self.bump("merged_edges")
+            if self.prov:
+                self.prov.write(json.dumps({
+                    "advisor": advisor, "student": student, "source": source, "via": kind,
+                }, ensure_ascii=False) + "\n")
+        self.stage_time["merge"] = time.monotonic() - t0
+
+    def report(self, final=False):
+        with self.lock:
+            stats = " ".join(f"{k}={v}" for k, v in self.stats.items())
+        print(f"[pipeline] {stats} pdf_q={self.pdf_q.qsize()} edge_q={self.edge_q.qsize()}"
+              f"{' done' if final else ''}", flush=True)
+
+    def run(self, sources):
+        for spec in self.args.datasets or []:
+            print(f"[pipeline] seeded {self.store.add_spec(spec)}")
+
+        t0 = time.monotonic()
+        merger = threading.Thread(target=self.stage, args=("merge", self.run_merge), name="merge")
+        merger.start()
+        pdf_threads = [threading.Thread(target=self.stage, args=("pdf", self.run_pdf), name=f"pdf-{i}")
+                       for i in range(self.args.pdf_workers)]
+        for t in pdf_threads:
+            t.start()
+        harvester = threading.Thread(target=self.stage, args=("harvest", self.run_harvest, sources), name="harvest")
+        harvester.start()
+
+        # Wait on whichever producer is still running, reporting every report_every seconds.
+        producers = [harvester] + pdf_threads
+        while True:
+            alive = [t for t in producers if t.is_alive()]
+            if not alive:
+                break
+            alive[0].join(timeout=self.args.report_every)
+            if any(t.is_alive() for t in producers) and not self.failed.is_set():
+                self.report()
+        self.stage_time["pdf"] = time.monotonic() - t0
+        if not self.failed.is_set():
+            try:
+                self.put(self.edge_q, DONE)
+            except Aborted:
+                pass
+        merger.join()
+        if self.prov:
+            self.prov.close()
+        if self.failed.is_set():
+            self.report(final=True)
+            name, error = self.stage_error
+            raise SystemExit(f"[pipeline] {name} stage failed: {error!r}; nothing written")
+
+        self.store.write(Path(self.args.out_names), Path(self.args.out_edges))
+        self.report(final=True)
+        timings = " ".join(f"{k}={v:.1f}s" for k, v in self.stage_time.items())
+        print(f"[pipeline] names={len(self.store.names)} edges={len(self.store.edges)} "
+              f"wall={time.monotonic() - t0:.1f}s {timings}", flush=True)
+
+
+def main():
+    try:
+        sys.stdout.reconfigure(line_buffering=True)
+    except Exception:
+        pass
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="scripts/genealogy_sources.json")
+    ap.add_argument("--out-names", required=True)
+    ap.add_argument("--out-edges", required=True)
+    ap.add_argument("--datasets", nargs="*", default=None, help="Existing datasets to merge into (name=names.gz,edges.gz or name=edges.jsonl[.gz])")
+    ap.add_argument("--provenance", default=None, help="Optional JSONL of every edge as it is merged")
+    ap.add_argument("--max-records", type=int, default=500)
+    ap.add_argument("--from-date", default=None)
+    ap.add_argument("--until-date", default=None)
+    ap.add_argument("--set-regex", default=None)
+    ap.add_argument("--sleep", type=float, default=1.0)
+    ap.add_argument("--timeout", type=int, default=20)
+    ap.add_argument("--max-pages", type=int, default=2)
+    ap.add_argument("--harvest-workers", type=int, default=4)
+    ap.add_argument("--pdf-workers", type=int, default=8)
+    ap.add_argument("--queue-size", type=int, default=1000, help="Bound on each inter-stage queue")
+    ap.add_argument("--no-pdf", action="store_true", help="Only use advisor metadata, skip PDF extraction")
+    ap.add_argument("--report-every", type=float, default=30.0)
+    add_breaker_args(ap)
+    args = ap.parse_args()
+    install_from_args(args)
+
+    if not args.no_pdf and pdfplumber is None:
+        raise SystemExit("pdfplumber is required for PDF extraction (or pass --no-pdf)")
+    if args.no_pdf:
+        args.pdf_workers = 0
+
+    cfg = json.loads(Path(args.config).read_text())
+    sources = [s for s in cfg.get("sources", []) if s.get("enabled") is not False]
+    Pipeline(args).run(sources)
+
+
+if __name__ == "__main__":
+    main()
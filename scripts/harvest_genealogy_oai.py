@@ -2,11 +2,25 @@
 """
 Harvest mentor/mentee edges from OAI-PMH sources (direct inference only).
 Only creates edges when advisor/supervisor roles are explicitly present in metadata.
+
+Large repositories can be split into from/until date windows (--window-records or a
+source's "windowRecords"), starting at Identify's earliestDatestamp, and walked
+concurrently; sets matched by setRegex are walked concurrently too, and their
+ListSets results are cached (--sets-cache). --host-concurrency caps parallel
+walks against one host, and all walks on a host share its request budget of one
+request per --sleep seconds. --max-records caps each source as a whole, so
+windows only pay off when it is off (0) or larger than the window size.
+
+--plan writes a dry-run plan from the first page of every source/set
+(completeListSize, cursor, latency): estimated records, pages and duration under
+the current --sleep/--workers. --execute-plan harvests that plan's jobs.
 """
 import argparse
 import concurrent.futures as futures
+import datetime as dt
 import gzip
 import json
+import math
 import re
 import struct
 import sys
@@ -17,6 +31,8 @@ import urllib.request
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+from oai_breaker import HostOpen, add_breaker_args, guard, install_from_args
+
 
 ROLE_OK = {"advisor", "supervisor", "thesis advisor", "thesis_advisor", "dissertation advisor"}
 
@@ -48,7 +64,7 @@ def fetch_xml(url, timeout=60, retries=2):
                 url,
                 headers={"User-Agent": "ScholarUtilityBelt/1.0 (OAI-PMH harvester)"},
             )
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
+            with guard(url), urllib.request.urlopen(req, timeout=timeout) as resp:
                 data = resp.read()
             try:
                 text = data.decode("utf-8", errors="replace")
@@ -56,6 +72,8 @@ def fetch_xml(url, timeout=60, retries=2):
                 text = data.decode("latin-1", errors="replace")
             text = sanitize_xml(text)
             return ET.fromstring(text)
+        except HostOpen:
+            raise
         except Exception as e:
             last_err = e
             if attempt >= retries:
@@ -98,7 +116,13 @@ def list_sets(base, sleep_s=0.5, limit=None, timeout=60):
     return sets
 
 
-def iter_records(base, metadata_prefixes, set_specs=None, from_date=None, until_date=None, sleep_s=1.0, max_records=None, timeout=60):
+def iter_records(base, metadata_prefixes, set_specs=None, from_date=None, until_date=None, sleep_s=1.0, max_records=None, timeout=60,
+                 pace=None):
+    """Yield (record, prefix) from the first prefix that has records.
+
+    pace, when given, is called before every request in place of sleeping
+    sleep_s between pages (see HostPacer).
+    """
     total = 0
     set_specs = set_specs or [None]
     for prefix in metadata_prefixes:
@@ -119,6 +143,8 @@ def iter_records(base, metadata_prefixes, set_specs=None, from_date=None, until_
                     if until_date:
                         params["until"] = until_date
                 url = build_url(base, params)
+                if pace is not None:
+                    pace()
                 root = fetch_xml(url, timeout=timeout)
                 err = root.find(".//{http://www.openarchives.org/OAI/2.0/}error")
                 if err is not None:
@@ -139,13 +165,77 @@ def iter_records(base, metadata_prefixes, set_specs=None, from_date=None, until_
                 token = norm_space(token_el.text) if token_el is not None else ""
                 if not token:
                     break
-                time.sleep(sleep_s)
+                if pace is None:
+                    time.sleep(sleep_s)
             if max_records and total >= max_records:
                 return
         if got_any_prefix:
             return
 
 
+def select_prefixes(src):
+    prefixes = src.get("metadataPrefixes") or [src.get("metadataPrefix", "oai_dc")]
+    # If richer formats exist, skip oai_dc/qdc to reduce noise.
+    rich_prefixes = [p for p in prefixes if p in ("oai_etdms", "mods", "uketd_dc")]
+    if rich_prefixes:
+        prefixes = [p for p in prefixes if p in rich_prefixes or p not in ("oai_dc", "qdc")]
+    return list(dict.fromkeys(prefixes))
+
+
+class ListSetsCache:
+    """JSON file of ListSets results keyed by base URL, reused until they are ttl_s old."""
+
+    def __init__(self, path, ttl_s):
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.lock = threading.Lock()
+        self.dirty = False
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, base):
+        with self.lock:
+            entry = self.entries.get(base.strip())
+        if not entry or time.time() - entry.get("fetchedAt", 0) >= self.ttl_s:
+            return None
+        return entry["sets"]
+
+    def put(self, base, sets):
+        with self.lock:
+            self.entries[base.strip()] = {"fetchedAt": int(time.time()), "sets": sets}
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            data = json.dumps(self.entries, ensure_ascii=False)
+            self.dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def resolve_set_specs(base, src, set_regex=None, sleep_s=0.5, timeout=60, cache=None):
+    """Set specs to harvest: None for the whole repository, [] when setRegex matches nothing."""
+    set_spec = src.get("set")
+    if set_spec:
+        return [set_spec]
+    regex = src.get("setRegex") or set_regex
+    if not regex:
+        return None
+    all_sets = cache.get(base) if cache else None
+    if all_sets is None:
+        all_sets = list_sets(base, sleep_s=sleep_s, limit=2000, timeout=timeout)
+        if cache:
+            cache.put(base, all_sets)
+    pat = re.compile(regex, re.IGNORECASE)
+    return [s["spec"] for s in all_sets if pat.search(s["spec"]) or pat.search(s["name"] or "")]
+
+
 def extract_from_datacite(meta_el):
     creators = []
     advisors = []
@@ -257,6 +347,209 @@ def parse_record(rec, prefix):
     }, has_advisor
 
 
+def sample_page(base, prefix, set_spec=None, from_date=None, until_date=None, timeout=60):
+    """Fetch the first ListRecords page and summarize it without walking the list."""
+    params = {"verb": "ListRecords", "metadataPrefix": prefix}
+    if set_spec:
+        params["set"] = set_spec
+    if from_date:
+        params["from"] = from_date
+    if until_date:
+        params["until"] = until_date
+    t0 = time.monotonic()
+    root = fetch_xml(build_url(base, params), timeout=timeout)
+    out = {"prefix": prefix, "set": set_spec, "records": 0, "advisorRecords": 0, "edges": 0,
+           "completeListSize": None, "cursor": None, "hasMore": False, "error": None,
+           "latencyS": round(time.monotonic() - t0, 3)}
+    err = root.find(".//{http://www.openarchives.org/OAI/2.0/}error")
+    if err is not None:
+        code = err.attrib.get("code", "")
+        if code == "noRecordsMatch":
+            out["completeListSize"] = 0
+            return out
+        out["error"] = code or "error"
+        return out
+    recs = root.findall(".//{http://www.openarchives.org/OAI/2.0/}record")
+    out["records"] = len(recs)
+    for rec in recs:
+        parsed, has_advisor = parse_record(rec, prefix)
+        if has_advisor:
+            out["advisorRecords"] += 1
+        if parsed:
+            out["edges"] += len(parsed["creators"]) * len(parsed["advisors"])
+    token_el = root.find(".//{http://www.openarchives.org/OAI/2.0/}resumptionToken")
+    token = norm_space(token_el.text) if token_el is not None else ""
+    size = token_el.attrib.get("completeListSize") if token_el is not None else None
+    cursor = token_el.attrib.get("cursor") if token_el is not None else None
+    out["hasMore"] = bool(token)
+    if cursor and cursor.isdigit():
+        out["cursor"] = int(cursor)
+    if size and size.isdigit():
+        out["completeListSize"] = int(size)
+    elif not token:
+        out["completeListSize"] = len(recs)
+    return out
+
+
+def estimate_cost(samples, sleep_s, max_records=None, max_no_advisor=None):
+    """Records, pages and seconds to walk the sampled sets, plus how many sets had no completeListSize.
+
+    Page size is taken from the first pages; an unsized list counts as its first
+    page only, so its estimate is a lower bound. Pages cost the sampled latency
+    plus the harvester's sleep between pages.
+    """
+    page_size = max([x["records"] for x in samples] + [1])
+    records = 0
+    unsized = 0
+    for x in samples:
+        if x["completeListSize"] is not None:
+            records += x["completeListSize"]
+        else:
+            records += x["records"]
+            unsized += 1
+    if max_records:
+        records = min(records, max_records)
+    sampled = sum(x["records"] for x in samples)
+    if max_no_advisor and sampled >= max_no_advisor and not any(x["advisorRecords"] for x in samples):
+        records = min(records, max_no_advisor)
+    pages = sum(1 for x in samples if x["records"]) if records else 0
+    pages = max(pages, math.ceil(records / page_size))
+    latencies = [x["latencyS"] for x in samples if x.get("latencyS") is not None]
+    per_page = (sum(latencies) / len(latencies) if latencies else 1.0) + sleep_s
+    return {"records": records, "pages": pages, "seconds": round(pages * per_page, 1), "unsizedSets": unsized}
+
+
+def plan_makespan(costs, workers, host_concurrency, sleep_s=0.0):
+    """Wall-clock estimate: longest-first over the workers, but never faster than the busiest host allows.
+
+    A host serves at most host_concurrency walks and, with HostPacer, one
+    request per sleep_s seconds.
+    """
+    lanes = [0.0] * max(1, workers)
+    for seconds in sorted((c["seconds"] for c in costs), reverse=True):
+        i = lanes.index(min(lanes))
+        lanes[i] += seconds
+    per_host = {}
+    for c in costs:
+        seconds, pages = per_host.get(c["host"], (0.0, 0))
+        per_host[c["host"]] = (seconds + c["seconds"], pages + c["pages"])
+    busiest = max((max(seconds / max(1, host_concurrency), pages * sleep_s) for seconds, pages in per_host.values()),
+                  default=0.0)
+    return max(max(lanes), busiest)
+
+
+def earliest_datestamp(base, timeout=60):
+    """Identify's earliestDatestamp as a date, or None when missing or unparseable."""
+    root = fetch_xml(build_url(base, {"verb": "Identify"}), timeout=timeout)
+    stamp = norm_space(root.findtext(".//{http://www.openarchives.org/OAI/2.0/}earliestDatestamp"))
+    try:
+        return dt.date.fromisoformat(stamp[:10])
+    except ValueError:
+        return None
+
+
+class WindowProbeError(Exception):
+    """A first-page probe got an OAI error other than noRecordsMatch (e.g. cannotDisseminateFormat)."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def partition_windows(base, prefix, set_spec, start, end, window_records, timeout=60, workers=4, pace=None):
+    """Split [start, end] into day-granular from/until windows of at most ~window_records records.
+
+    Each level of the split is probed concurrently with one first-page request per
+    window; windows reporting a larger completeListSize are halved until they fit
+    or cover a single day. Without completeListSize, windows are halved down to a
+    year. Windows with no records are dropped; any other OAI error raises
+    WindowProbeError, since it says nothing about the window's size. pace, when
+    given, is called before every probe.
+    """
+    def probe(window):
+        if pace is not None:
+            pace()
+        return sample_page(base, prefix, set_spec, window[0].isoformat(), window[1].isoformat(), timeout)
+
+    done = []
+    pending = [(start, end)]
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        while pending:
+            probes = ex.map(probe, pending)
+            split = []
+            for (lo, hi), probe in zip(pending, probes):
+                if probe["error"]:
+                    raise WindowProbeError(probe["error"])
+                size = probe["completeListSize"]
+                if size == 0:
+                    continue
+                too_big = size > window_records if size is not None else (hi - lo).days > 366
+                if not too_big or lo >= hi:
+                    done.append((lo, hi))
+                    continue
+                mid = lo + (hi - lo) // 2
+                split += [(lo, mid), (mid + dt.timedelta(days=1), hi)]
+            pending = split
+    return sorted(done)
+
+
+class HostSlots:
+    """Caps concurrent ListRecords walks per host, shared by every source on that host."""
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.lock = threading.Lock()
+        self.slots = {}
+
+    def __call__(self, base):
+        host = urllib.parse.urlsplit(base).netloc.lower()
+        with self.lock:
+            return self.slots.setdefault(host, threading.BoundedSemaphore(self.limit))
+
+
+class HostPacer:
+    """Spaces requests to one host at least interval seconds apart, across every walk on it."""
+
+    def __init__(self, interval):
+        self.interval = max(0.0, interval)
+        self.lock = threading.Lock()
+        self.next_at = {}
+
+    def __call__(self, base):
+        host = urllib.parse.urlsplit(base).netloc.lower()
+        # Reserve the host's next slot, then sleep outside the lock.
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at.get(host, now))
+            self.next_at[host] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def sample_source(src, set_specs, from_date=None, until_date=None, timeout=60):
+    """Sample the first page of each set, using the first prefix that returns records (as iter_records does)."""
+    base = src["base"]
+    samples = []
+    for prefix in select_prefixes(src):
+        samples = [sample_page(base, prefix, s, from_date, until_date, timeout) for s in (set_specs or [None])]
+        if any(x["records"] for x in samples):
+            break
+    return samples
+
+
+def yield_estimate(samples, max_records=None):
+    """Expected edges per page request and in total, from first-page samples."""
+    records = sum(x["records"] for x in samples)
+    edges = sum(x["edges"] for x in samples)
+    pages = sum(1 for x in samples if x["records"])
+    per_request = edges / pages if pages else 0.0
+    size = sum(x["completeListSize"] if x["completeListSize"] is not None else x["records"] for x in samples)
+    if max_records:
+        size = min(size, max_records)
+    expected = edges / records * size if records else 0.0
+    return per_request, expected
+
+
 def main():
     try:
         sys.stdout.reconfigure(line_buffering=True)
@@ -265,17 +558,43 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="scripts/genealogy_sources.json")
     ap.add_argument("--out", default="output/oai_genealogy")
-    ap.add_argument("--max-records", type=int, default=500)
+    ap.add_argument("--max-records", type=int, default=500, help="Records per source (0 = no cap)")
     ap.add_argument("--from-date", default=None)
     ap.add_argument("--until-date", default=None)
     ap.add_argument("--set-regex", default=None)
-    ap.add_argument("--sleep", type=float, default=1.0)
+    ap.add_argument("--sleep", type=float, default=1.0, help="Minimum seconds between requests to one host")
     ap.add_argument("--timeout", type=int, default=20)
     ap.add_argument("--max-no-advisor", type=int, default=200)
     ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--registry", default=None, help="Read sources from an oai_registry.py database instead of --config")
+    ap.add_argument("--schedule", action="store_true",
+                    help="Sample every source/set first, then harvest in order of expected edges per request")
+    ap.add_argument("--sample-workers", type=int, default=16)
+    ap.add_argument("--min-sample", type=int, default=20,
+                    help="With --schedule, drop a set whose sample has at least this many records and no advisor")
+    ap.add_argument("--window-records", type=int, default=0,
+                    help="Split each source into from/until windows of about this many records and walk them "
+                         "concurrently (0 = off; a source's \"windowRecords\" overrides)")
+    ap.add_argument("--host-concurrency", type=int, default=4,
+                    help="Maximum concurrent ListRecords walks per host")
+    ap.add_argument("--plan", default=None,
+                    help="Dry run: sample the first page of every source/prefix/set, estimate cost and write a plan here")
+    ap.add_argument("--execute-plan", default=None, help="Harvest the jobs of a plan written by --plan, in its order")
+    ap.add_argument("--sets-cache", default="output/oai_listsets_cache.json",
+                    help="ListSets results per base URL, reused for --sets-ttl-days")
+    ap.add_argument("--sets-ttl-days", type=float, default=7.0)
+    ap.add_argument("--refresh-sets", action="store_true", help="Ignore cached ListSets results")
+    add_breaker_args(ap)
     args = ap.parse_args()
+    install_from_args(args)
 
-    cfg = json.loads(Path(args.config).read_text())
+    registry = None
+    if args.registry:
+        from oai_registry import SourceRegistry
+        registry = SourceRegistry(args.registry)
+        cfg = {"sources": registry.harvest_sources()}
+    else:
+        cfg = json.loads(Path(args.config).read_text())
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
     log_path = out_dir / "oai_genealogy.harvest.log"
@@ -312,46 +631,90 @@ def main():
         edges.append((aid, sid))
         return True
 
-    def harvest_source(src):
+    host_slots = HostSlots(args.host_concurrency)
+    host_pacer = HostPacer(args.sleep)
+    sets_cache = ListSetsCache(args.sets_cache, 0 if args.refresh_sets else args.sets_ttl_days * 86400)
+
+    def plan_windows(src, prefixes, set_specs):
+        """Date windows for a source, or None to walk it as one list."""
+        window_records = src.get("windowRecords", args.window_records)
+        if not window_records:
+            return None
+        if args.max_records and args.max_records <= window_records:
+            # The source cap is reached inside a single window; splitting would only add probes.
+            log(f"[oai] {src.get('key')} --max-records {args.max_records} fits one window; not partitioning")
+            return None
+        base = src["base"]
+        try:
+            start = dt.date.fromisoformat(args.from_date[:10]) if args.from_date else earliest_datestamp(base, args.timeout)
+        except Exception as e:
+            log(f"[oai] {src.get('key')} Identify failed ({e}); not partitioning")
+            return None
+        if start is None:
+            log(f"[oai] {src.get('key')} no earliestDatestamp; not partitioning")
+            return None
+        end = dt.date.fromisoformat(args.until_date[:10]) if args.until_date else dt.datetime.now(dt.timezone.utc).date()
+        # Windows are cut for the first prefix that has records, which is the one iter_records would use.
+        # A prefix the server cannot disseminate is skipped; other probe errors leave the source unpartitioned.
+        usable = False
+        for prefix in prefixes:
+            windows = []
+            try:
+                for set_spec in set_specs or [None]:
+                    for lo, hi in partition_windows(base, prefix, set_spec, start, end, window_records,
+                                                    args.timeout, args.host_concurrency, lambda: host_pacer(base)):
+                        windows.append((prefix, set_spec, lo.isoformat(), hi.isoformat()))
+            except WindowProbeError as e:
+                if e.code == "cannotDisseminateFormat":
+                    log(f"[oai] {src.get('key')} prefix {prefix} not available; trying next")
+                    continue
+                log(f"[oai] {src.get('key')} window probe failed ({e.code}); not partitioning")
+                return None
+            except Exception as e:
+                log(f"[oai] {src.get('key')} window probe failed ({e}); not partitioning")
+                return None
+            usable = True
+            if windows:
+                log(f"[oai] {src.get('key')} windows={len(windows)} prefix={prefix} from={start} until={end}")
+                return windows
+        # No prefix could be probed: let iter_records try them and report what the server says.
+        return [] if usable else None
+
+    def resolve_sets(src):
+        try:
+            set_specs = resolve_set_specs(src["base"], src, args.set_regex, sleep_s=args.sleep, timeout=args.timeout,
+                                          cache=sets_cache)
+        except Exception:
+            log(f"[oai] {src.get('key')} set listing failed; skipping source")
+            return []
+        if set_specs == []:
+            log(f"[oai] {src.get('key')} no set match for regex; skipping source")
+        return set_specs
+
+    def harvest_source(src, set_specs=False):
+        """Harvest one source; set_specs=False resolves sets here, otherwise they come from the scheduler."""
         nonlocal provenance_count
         if src.get("enabled") is False:
             return
         base = src["base"]
-        prefixes = src.get("metadataPrefixes") or [src.get("metadataPrefix", "oai_dc")]
-        # If richer formats exist, skip oai_dc/qdc to reduce noise.
-        rich_prefixes = [p for p in prefixes if p in ("oai_etdms", "mods", "uketd_dc")]
-        if rich_prefixes:
-            prefixes = [p for p in prefixes if p in rich_prefixes or p not in ("oai_dc", "qdc")]
-        prefixes = list(dict.fromkeys(prefixes))
-        set_spec = src.get("set")
-        set_specs = None
-        if set_spec:
-            set_specs = [set_spec]
-        else:
-            regex = src.get("setRegex") or args.set_regex
-            if regex:
-                try:
-                    all_sets = list_sets(base, sleep_s=args.sleep, limit=2000, timeout=args.timeout)
-                    pat = re.compile(regex, re.IGNORECASE)
-                    set_specs = [s["spec"] for s in all_sets if pat.search(s["spec"]) or pat.search(s["name"] or "")]
-                    if not set_specs:
-                        log(f"[oai] {src.get('key')} no set match for regex; skipping source")
-                        return
-                except Exception:
-                    log(f"[oai] {src.get('key')} set listing failed; skipping source")
-                    return
+        prefixes = select_prefixes(src)
+        if set_specs is False:
+            set_specs = resolve_sets(src)
+        if set_specs == []:
+            return
         log(f"[oai] {src.get('label','source')} {base} ({','.join(prefixes)})")
+        started = time.monotonic()
+        source_count = 0
+        record_count = 0
+        advisor_hit_count = 0
         try:
-            source_count = 0
-            record_count = 0
-            advisor_hit_count = 0
             used_prefixes = set()
             early_stop = False
             pending_edges = []
             pending_prov = []
 
             def flush_edges():
-                nonlocal pending_edges, source_count
+                nonlocal source_count
                 if not pending_edges:
                     return
                 with data_lock:
@@ -359,13 +722,13 @@ def main():
                         if add_edge_unsafe(advisor, student):
                             source_count += 1
                             if source_count == 1:
-                                log(f"[oai] {src.get('key')} first edge (prefix={used_prefix})")
+                                log(f"[oai] {src.get('key')} first edge (prefix={','.join(sorted(used_prefixes))})")
                             if source_count % 100 == 0:
                                 log(f"[oai] {src.get('key')} edges={source_count}")
-                pending_edges = []
+                pending_edges.clear()
 
             def flush_prov():
-                nonlocal pending_prov, provenance_count
+                nonlocal provenance_count
                 if not pending_prov:
                     return
                 with prov_lock:
@@ -374,63 +737,211 @@ def main():
                     provenance_count += len(pending_prov)
                     if provenance_count % 100 == 0:
                         prov_file.flush()
-                pending_prov = []
-
-            for rec, used_prefix in iter_records(
-                base,
-                prefixes,
-                set_specs=set_specs,
-                from_date=args.from_date,
-                until_date=args.until_date,
-                sleep_s=args.sleep,
-                max_records=args.max_records,
-                timeout=args.timeout,
-            ):
-                record_count += 1
-                used_prefixes.add(used_prefix)
+                pending_prov.clear()
+
+            stop = threading.Event()
+            src_lock = threading.Lock()
+
+            def consume(rec, used_prefix, progress):
+                """Process one record; returns False once the source should stop."""
+                nonlocal record_count, advisor_hit_count, early_stop
                 parsed, has_advisor = parse_record(rec, used_prefix)
-                if has_advisor:
-                    advisor_hit_count += 1
-                if not parsed:
+                with src_lock:
+                    if stop.is_set():
+                        return False
+                    record_count += 1
+                    progress["records"] += 1
+                    used_prefixes.add(used_prefix)
+                    if has_advisor:
+                        advisor_hit_count += 1
+                        progress["advisors"] += 1
+                    if parsed:
+                        for student in parsed["creators"]:
+                            for advisor in parsed["advisors"]:
+                                pending_edges.append((advisor, student))
+                                pending_prov.append({
+                                    "source": src.get("key"),
+                                    "identifier": parsed["identifier"],
+                                    "advisor": advisor,
+                                    "student": student,
+                                    "metadataPrefix": used_prefix,
+                                })
+                        if len(pending_edges) >= 200:
+                            flush_edges()
+                        if len(pending_prov) >= 200:
+                            flush_prov()
                     if args.max_no_advisor and record_count >= args.max_no_advisor and advisor_hit_count == 0:
                         log(f"[oai] {src.get('key')} no advisor fields in first {record_count} records; skipping rest")
                         early_stop = True
-                        break
-                    continue
-                for student in parsed["creators"]:
-                    for advisor in parsed["advisors"]:
-                        pending_edges.append((advisor, student))
-                        pending_prov.append({
-                            "source": src.get("key"),
-                            "identifier": parsed["identifier"],
-                            "advisor": advisor,
-                            "student": student,
-                            "metadataPrefix": used_prefix,
-                        })
-                if len(pending_edges) >= 200:
-                    flush_edges()
-                if len(pending_prov) >= 200:
-                    flush_prov()
-                if args.max_no_advisor and record_count >= args.max_no_advisor and advisor_hit_count == 0:
-                    log(f"[oai] {src.get('key')} no advisor fields in first {record_count} records; skipping rest")
-                    early_stop = True
-                    break
+                        stop.set()
+                    elif args.max_records and record_count >= args.max_records:
+                        stop.set()
+                    return not stop.is_set()
+
+            def walk(walk_prefixes, walk_sets, from_date, until_date, label=None):
+                progress = {"records": 0, "advisors": 0}
+                with host_slots(base):
+                    for rec, used_prefix in iter_records(
+                        base,
+                        walk_prefixes,
+                        set_specs=walk_sets,
+                        from_date=from_date,
+                        until_date=until_date,
+                        # consume() applies --max-records to the source as a whole.
+                        max_records=None,
+                        timeout=args.timeout,
+                        pace=lambda: host_pacer(base),
+                    ):
+                        if not consume(rec, used_prefix, progress):
+                            break
+                if label:
+                    log(f"[oai] {src.get('key')} {label} records={progress['records']} advisors={progress['advisors']}")
+
+            # Windows and sets are independent lists, so they are walked concurrently
+            # within the host's slots.
+            windows = plan_windows(src, prefixes, set_specs)
+            if windows is None and set_specs and len(set_specs) > 1:
+                units = [(prefixes, [s], args.from_date, args.until_date, f"set={s}") for s in set_specs]
+            elif windows is None:
+                units = [(prefixes, set_specs, args.from_date, args.until_date, None)]
+            else:
+                units = [([p], [s] if s else None, lo, hi, f"{'set=' + s + ' ' if s else ''}window={lo}..{hi}")
+                         for p, s, lo, hi in windows]
+            if len(units) == 1:
+                walk(*units[0])
+            elif units:
+                with futures.ThreadPoolExecutor(max_workers=args.host_concurrency) as ex:
+                    for job in futures.as_completed([ex.submit(walk, *unit) for unit in units]):
+                        job.result()
             flush_edges()
             flush_prov()
             prefix_list = ",".join(sorted(used_prefixes)) if used_prefixes else ",".join(prefixes)
             log(f"[oai] {src.get('key')} done edges={source_count} records={record_count} advisors={advisor_hit_count} prefixes={prefix_list}{' early_stop' if early_stop else ''}")
+            if registry:
+                registry.record_harvest(src.get("key"), record_count, advisor_hit_count, source_count,
+                                        time.monotonic() - started)
         except Exception as e:
             err_msg = f"[oai] source failed: {src.get('key')} - {e}"
             print(err_msg, file=sys.stderr, flush=True)
             log(err_msg)
+            if registry:
+                registry.record_harvest(src.get("key"), record_count, advisor_hit_count, source_count,
+                                        time.monotonic() - started, error=str(e))
+
+    def schedule(sources):
+        """Phase one: sample every source/set concurrently and rank by expected edges per request."""
+        def probe(src):
+            set_specs = resolve_sets(src)
+            if set_specs == []:
+                return src, [], None
+            try:
+                samples = sample_source(src, set_specs, args.from_date, args.until_date, args.timeout)
+            except Exception as e:
+                log(f"[plan] {src.get('key')} sample failed: {e}; skipping source")
+                return src, [], None
+            return src, set_specs, samples
+
+        ranked = []
+        with futures.ThreadPoolExecutor(max_workers=max(1, args.sample_workers)) as ex:
+            for src, set_specs, samples in ex.map(probe, sources):
+                if not samples:
+                    continue
+                if set_specs:
+                    kept = [x for x in samples if x["advisorRecords"] or x["records"] < args.min_sample]
+                    set_specs = [x["set"] for x in kept]
+                    samples = kept
+                    if not set_specs:
+                        log(f"[plan] {src.get('key')} no advisor fields in any sampled set; skipping source")
+                        continue
+                elif sum(x["records"] for x in samples) >= args.min_sample and not any(x["advisorRecords"] for x in samples):
+                    log(f"[plan] {src.get('key')} no advisor fields in sample; skipping source")
+                    continue
+                per_request, expected = yield_estimate(samples, args.max_records)
+                ranked.append((per_request, expected, src, set_specs))
+        ranked.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        for per_request, expected, src, set_specs in ranked:
+            sets = f" sets={len(set_specs)}" if set_specs else ""
+            log(f"[plan] {src.get('key')} edges/request={per_request:.1f} expected_edges={expected:.0f}{sets}")
+        return [(src, set_specs) for _, _, src, set_specs in ranked]
+
+    def write_plan(sources, path):
+        """Sample every source concurrently and write its cost estimate as an executable plan."""
+        def probe(src):
+            set_specs = resolve_sets(src)
+            if set_specs == []:
+                return None
+            try:
+                samples = sample_source(src, set_specs, args.from_date, args.until_date, args.timeout)
+            except Exception as e:
+                log(f"[plan] {src.get('key')} sample failed: {e}; skipping source")
+                return None
+            if not any(x["records"] for x in samples):
+                log(f"[plan] {src.get('key')} no records; skipping source")
+                return None
+            prefix = next(x["prefix"] for x in samples if x["records"])
+            cost = estimate_cost(samples, args.sleep, args.max_records, args.max_no_advisor)
+            # The sampled prefix is pinned so the harvest skips the fallback probes.
+            job = {"source": dict(src, metadataPrefixes=[prefix]), "sets": set_specs,
+                   "host": urllib.parse.urlsplit(src["base"]).netloc.lower()}
+            job.update(cost)
+            job["samples"] = samples
+            return job
+
+        with futures.ThreadPoolExecutor(max_workers=max(1, args.sample_workers)) as ex:
+            jobs = [j for j in ex.map(probe, sources) if j]
+        # Longest first, so --execute-plan keeps the workers evenly loaded.
+        jobs.sort(key=lambda j: j["seconds"], reverse=True)
+        totals = {
+            "sources": len(jobs),
+            "records": sum(j["records"] for j in jobs),
+            "pages": sum(j["pages"] for j in jobs),
+            "seconds": round(sum(j["seconds"] for j in jobs), 1),
+            "wallSeconds": round(plan_makespan(jobs, args.workers, args.host_concurrency, args.sleep), 1),
+            "unsizedSets": sum(j["unsizedSets"] for j in jobs),
+        }
+        for j in jobs:
+            sets = f" sets={len(j['sets'])}" if j["sets"] else ""
+            log(f"[plan] {j['source'].get('key')} records={j['records']} pages={j['pages']} "
+                f"est={j['seconds'] / 60:.1f}min{sets}{' (lower bound)' if j['unsizedSets'] else ''}")
+        log(f"[plan] sources={totals['sources']} records={totals['records']} pages={totals['pages']} "
+            f"wall={totals['wallSeconds'] / 3600:.2f}h with workers={args.workers} sleep={args.sleep}s")
+        plan = {
+            "generatedAt": int(time.time()),
+            "settings": {"workers": args.workers, "sleep": args.sleep, "hostConcurrency": args.host_concurrency,
+                         "maxRecords": args.max_records, "fromDate": args.from_date, "untilDate": args.until_date},
+            "totals": totals,
+            "jobs": jobs,
+        }
+        Path(path).write_text(json.dumps(plan, indent=1, ensure_ascii=False))
+        log(f"[plan] out={path}")
 
     sources = [s for s in cfg.get("sources", []) if s.get("enabled") is not False]
+    if args.plan:
+        write_plan(sources, args.plan)
+        sets_cache.save()
+        log_file.close()
+        if registry:
+            registry.close()
+        return
+    if args.execute_plan:
+        plan = json.loads(Path(args.execute_plan).read_text())
+        jobs = [(job["source"], job["sets"]) for job in plan["jobs"]]
+        log(f"[plan] executing {len(jobs)} jobs from {args.execute_plan} "
+            f"(estimated {plan['totals']['wallSeconds'] / 3600:.2f}h)")
+    elif args.schedule:
+        jobs = schedule(sources)
+        log(f"[plan] sources={len(sources)} scheduled={len(jobs)}")
+    else:
+        jobs = [(src, False) for src in sources]
     if args.workers <= 1:
-        for src in sources:
-            harvest_source(src)
+        for src, set_specs in jobs:
+            harvest_source(src, set_specs)
     else:
+        # Workers take jobs in list order, so the best-yielding sources start first.
         with futures.ThreadPoolExecutor(max_workers=args.workers) as ex:
-            list(ex.map(harvest_source, sources))
+            list(ex.map(lambda job: harvest_source(*job), jobs))
+
+    sets_cache.save()
 
     # write names
     names_json = {"n": canonical}
@@ -451,6 +962,8 @@ def main():
     log(f"[oai] names={len(canonical)} edges={len(edges)} provenance={provenance_count}")
     log(f"[oai] out={out_dir}")
     log_file.close()
+    if registry:
+        registry.close()
 
 
 if __name__ == "__main__":
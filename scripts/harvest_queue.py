@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Parallel OAI harvest: a SQLite work queue of (source, prefixes, set, date window)
+tasks shared by worker processes and threads.
+
+Workers lease one task at a time and renew the lease with a heartbeat while
+they harvest. A worker that dies stops renewing, so its task is handed to
+another worker once the lease expires; one that has used up its attempts is
+marked failed instead. Workers with nothing to claim keep waiting while other
+tasks are leased, so a task left behind by a dead worker is still picked up
+at the end of the queue. Each finished task writes a shard in the harvester's
+names/edges format; reduce merges the shards.
+
+init --window-records cuts each source/set into from/until windows of about
+that many records (see harvest_genealogy_oai.partition_windows), so a large
+repository becomes many tasks that workers can share.
+
+SQLite relies on file locks, which are unreliable on network filesystems such
+as NFS or SMB, so keep the queue file on a local disk and run every worker on
+that machine (use --threads, or several processes). Only the shard directory
+needs to be readable by whoever runs reduce.
+
+Usage:
+    python3 scripts/harvest_queue.py --queue output/harvest_queue.sqlite init --config scripts/genealogy_sources.json \
+        --window-records 20000
+    python3 scripts/harvest_queue.py --queue output/harvest_queue.sqlite work --shards output/shards --threads 4
+    python3 scripts/harvest_queue.py --queue output/harvest_queue.sqlite status
+    python3 scripts/harvest_queue.py --queue output/harvest_queue.sqlite reduce --shards output/shards \
+        --out-names output/oai_genealogy.names.json.gz --out-edges output/oai_genealogy.edges.bin.gz
+"""
+import argparse
+import datetime as dt
+import gzip
+import json
+import os
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+from harvest_genealogy_oai import (
+    WindowProbeError,
+    earliest_datestamp,
+    iter_records,
+    normalize_name,
+    parse_record,
+    partition_windows,
+    resolve_set_specs,
+    select_prefixes,
+)
+from merge_genealogy_datasets import MergeStore
+from oai_breaker import add_breaker_args, install_from_args
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    source TEXT,
+    base TEXT,
+    prefixes TEXT,
+    set_spec TEXT,
+    from_date TEXT,
+    until_date TEXT,
+    status TEXT DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER DEFAULT 0,
+    shard TEXT,
+    records INTEGER,
+    edges INTEGER,
+    error TEXT,
+    updated REAL,
+    UNIQUE (source, set_spec, from_date, until_date)
+);
+"""
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class WorkQueue:
+    """One connection per thread; claims run in BEGIN IMMEDIATE so two workers never get the same task."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+        self.conn().executescript(SCHEMA)
+
+    def conn(self):
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            self.local.db = db
+        return db
+
+    def add(self, source, base, prefixes, set_spec=None, from_date=None, until_date=None):
+        cur = self.conn().execute(
+            "INSERT OR IGNORE INTO tasks (source, base, prefixes, set_spec, from_date, until_date, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            # "" rather than NULL so the UNIQUE constraint also catches re-enqueued whole-range tasks.
+            (source, base, json.dumps(prefixes), set_spec or "", from_date or "", until_date or "", time.time()),
+        )
+        return cur.rowcount
+
+    def claim(self, worker, lease_s, max_attempts):
+        db = self.conn()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # An expired lease on a task with no attempts left would otherwise stay 'leased' forever.
+            db.execute(
+                "UPDATE tasks SET status = 'failed', error = COALESCE(error, 'lease expired'), lease_until = NULL, "
+                "updated = ? WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, max_attempts),
+            )
+            row = db.execute(
+                "SELECT * FROM tasks WHERE (status = 'pending' OR (status = 'leased' AND lease_until < ?)) "
+                "AND attempts < ? ORDER BY attempts, id LIMIT 1",
+                (now, max_attempts),
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                    "updated = ? WHERE id = ?",
+                    (worker, now + lease_s, now, row["id"]),
+                )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return dict(row) if row is not None else None
+
+    def heartbeat(self, task_id, worker, lease_s):
+        cur = self.conn().execute(
+            "UPDATE tasks SET lease_until = ?, updated = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease_s, time.time(), task_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def finish(self, task_id, worker, shard, records, edges):
+        cur = self.conn().execute(
+            "UPDATE tasks SET status = 'done', shard = ?, records = ?, edges = ?, error = NULL, updated = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (shard, records, edges, time.time(), task_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, task_id, worker, error, max_attempts):
+        self.conn().execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_until = NULL, updated = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (max_attempts, error, time.time(), task_id, worker),
+        )
+
+    def next_expiry(self):
+        """Earliest lease_until among leased tasks, or None when nothing is leased."""
+        row = self.conn().execute("SELECT MIN(lease_until) AS t FROM tasks WHERE status = 'leased'").fetchone()
+        return row["t"]
+
+    def counts(self):
+        rows = self.conn().execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def done_tasks(self):
+        return [dict(r) for r in self.conn().execute("SELECT * FROM tasks WHERE status = 'done' ORDER BY id")]
+
+
+def write_shard(path_prefix, names, edges):
+    """Write <prefix>.names.json.gz / .edges.bin.gz atomically (tmp + rename)."""
+    names_path = Path(str(path_prefix) + ".names.json.gz")
+    edges_path = Path(str(path_prefix) + ".edges.bin.gz")
+    tmp_names = names_path.with_name(names_path.name + ".tmp")
+    tmp_edges = edges_path.with_name(edges_path.name + ".tmp")
+    with gzip.open(tmp_names, "wt", encoding="utf-8") as f:
+        json.dump({"n": names}, f, ensure_ascii=False)
+    with gzip.open(tmp_edges, "wb") as f:
+        for a, b in edges:
+            f.write(struct.pack("<II", a, b))
+    tmp_names.replace(names_path)
+    tmp_edges.replace(edges_path)
+    return names_path, edges_path
+
+
+def harvest_task(task, args, still_leased):
+    """Harvest one task into (names, edges, records); still_leased() is polled between records."""
+    names = []
+    key_to_id = {}
+    edges = []
+    edge_set = set()
+
+    def get_id(name):
+        key = normalize_name(name)
+        if key not in key_to_id:
+            key_to_id[key] = len(names)
+            names.append(name)
+        return key_to_id[key]
+
+    records = 0
+    advisor_hits = 0
+    for rec, prefix in iter_records(
+        task["base"],
+        json.loads(task["prefixes"]),
+        set_specs=[task["set_spec"]] if task["set_spec"] else None,
+        from_date=task["from_date"] or None,
+        until_date=task["until_date"] or None,
+        sleep_s=args.sleep,
+        max_records=args.max_records,
+        timeout=args.timeout,
+    ):
+        if not still_leased():
+            raise LeaseLost(f"lease lost on task {task['id']}")
+        records += 1
+        parsed, has_advisor = parse_record(rec, prefix)
+        if has_advisor:
+            advisor_hits += 1
+        if parsed:
+            for student in parsed["creators"]:
+                for advisor in parsed["advisors"]:
+                    aid, sid = get_id(advisor), get_id(student)
+                    if aid != sid and (aid, sid) not in edge_set:
+                        edge_set.add((aid, sid))
+                        edges.append((aid, sid))
+        if args.max_no_advisor and records >= args.max_no_advisor and advisor_hits == 0:
+            break
+    return names, edges, records
+
+
+def task_windows(key, src, set_specs, args):
+    """(prefixes, set_spec, from_date, until_date) tasks for one source.
+
+    Without --window-records (or the source's "windowRecords") each set is one
+    task over the whole date range. Otherwise windows are cut for the first
+    prefix that has records, as the harvester does; a prefix the server cannot
+    disseminate is skipped, and any other failure falls back to one task per set.
+    """
+    prefixes = select_prefixes(src)
+    whole = [(prefixes, set_spec, args.from_date, args.until_date) for set_spec in set_specs or [None]]
+    window_records = src.get("windowRecords", args.window_records)
+    if not window_records:
+        return whole
+    base = src["base"]
+    try:
+        start = dt.date.fromisoformat(args.from_date[:10]) if args.from_date else earliest_datestamp(base, args.timeout)
+    except Exception as e:
+        print(f"[queue] {key} Identify failed ({e}); not partitioning", file=sys.stderr)
+        return whole
+    if start is None:
+        print(f"[queue] {key} no earliestDatestamp; not partitioning")
+        return whole
+    end = dt.date.fromisoformat(args.until_date[:10]) if args.until_date else dt.datetime.now(dt.timezone.utc).date()
+    usable = False
+    for prefix in prefixes:
+        tasks = []
+        try:
+            for set_spec in set_specs or [None]:
+                for lo, hi in partition_windows(base, prefix, set_spec, start, end, window_records,
+                                                args.timeout, args.host_concurrency):
+                    tasks.append(([prefix], set_spec, lo.isoformat(), hi.isoformat()))
+        except WindowProbeError as e:
+            if e.code == "cannotDisseminateFormat":
+                print(f"[queue] {key} prefix {prefix} not available; trying next")
+                continue
+            print(f"[queue] {key} window probe failed ({e.code}); not partitioning", file=sys.stderr)
+            return whole
+        except Exception as e:
+            print(f"[queue] {key} window probe failed ({e}); not partitioning", file=sys.stderr)
+            return whole
+        usable = True
+        if tasks:
+            print(f"[queue] {key} windows={len(tasks)} prefix={prefix} from={start} until={end}")
+            return tasks
+    return [] if usable else whole
+
+
+def cmd_init(queue, args):
+    cfg = json.loads(Path(args.config).read_text())
+    added = 0
+    for src in cfg.get("sources", []):
+        if src.get("enabled") is False or not src.get("base"):
+            continue
+        key = src.get("key") or src["base"]
+        try:
+            set_specs = resolve_set_specs(src["base"], src, args.set_regex, timeout=args.timeout)
+        except Exception as e:
+            print(f"[queue] {key} set listing failed: {e}", file=sys.stderr)
+            continue
+        if set_specs == []:
+            print(f"[queue] {key} no set match for regex; skipping source")
+            continue
+        for prefixes, set_spec, from_date, until_date in task_windows(key, src, set_specs, args):
+            added += queue.add(key, src["base"], prefixes, set_spec, from_date, until_date)
+    print(f"[queue] added={added} " + " ".join(f"{k}={v}" for k, v in queue.counts().items()))
+
+
+def cmd_work(queue, args):
+    shards = Path(args.shards)
+    shards.mkdir(parents=True, exist_ok=True)
+    host = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    def run(worker):
+        done = 0
+        while True:
+            task = queue.claim(worker, args.lease, args.max_attempts)
+            if task is None:
+                # Leased tasks may come back if their worker has died; wait for the earliest lease to lapse.
+                expiry = queue.next_expiry()
+                if expiry is None:
+                    return done
+                time.sleep(min(args.lease, max(1.0, expiry - time.time() + 1.0)))
+                continue
+            lost = threading.Event()
+            stop = threading.Event()
+
+            def beat():
+                while not stop.wait(args.lease / 3):
+                    if not queue.heartbeat(task["id"], worker, args.lease):
+                        lost.set()
+                        return
+
+            hb = threading.Thread(target=beat, daemon=True)
+            hb.start()
+            label = f"{task['source']}{'/' + task['set_spec'] if task['set_spec'] else ''}"
+            try:
+                names, edges, records = harvest_task(task, args, lambda: not lost.is_set())
+                prefix = shards / f"task{task['id']:06d}.{worker}"
+                write_shard(prefix, names, edges)
+                stop.set()
+                if queue.finish(task["id"], worker, str(prefix), records, len(edges)):
+                    done += 1
+                    print(f"[queue] {worker} done {label} records={records} edges={len(edges)}", flush=True)
+                else:
+                    print(f"[queue] {worker} lost lease on {label}; result discarded", flush=True)
+            except Exception as e:
+                stop.set()
+                queue.fail(task["id"], worker, str(e), args.max_attempts)
+                print(f"[queue] {worker} failed {label}: {e}", file=sys.stderr, flush=True)
+            finally:
+                stop.set()
+                hb.join()
+
+    threads = []
+    results = {}
+    for i in range(max(1, args.threads)):
+        worker = f"{host}-{i}"
+        t = threading.Thread(target=lambda w=worker: results.__setitem__(w, run(w)), name=worker)
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    print(f"[queue] worker {host} tasks={sum(results.values())} " + " ".join(f"{k}={v}" for k, v in queue.counts().items()))
+
+
+def cmd_reduce(queue, args):
+    store = MergeStore()
+    for task in queue.done_tasks():
+        # Shard paths are recorded as the worker saw them; --shards finds them where this machine mounts them.
+        shard = Path(args.shards) / Path(task["shard"]).name if args.shards else Path(task["shard"])
+        store.add_dataset(Path(str(shard) + ".names.json.gz"), Path(str(shard) + ".edges.bin.gz"))
+    store.write(Path(args.out_names), Path(args.out_edges))
+    counts = queue.counts()
+    print(f"[queue] reduced tasks={counts.get('done', 0)} names={len(store.names)} edges={len(store.edges)}")
+    if counts.get("pending") or counts.get("leased") or counts.get("failed"):
+        print("[queue] warning: not all tasks are done: " + " ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+def main():
+    try:
+        sys.stdout.reconfigure(line_buffering=True)
+    except Exception:
+        pass
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queue", default="output/harvest_queue.sqlite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_init = sub.add_parser("init", help="Enqueue one task per source/set/date window")
+    p_init.add_argument("--config", default="scripts/genealogy_sources.json")
+    p_init.add_argument("--from-date", default=None)
+    p_init.add_argument("--until-date", default=None)
+    p_init.add_argument("--set-regex", default=None)
+    p_init.add_argument("--timeout", type=int, default=20)
+    p_init.add_argument("--window-records", type=int, default=0,
+                        help="Split each source/set into date windows of about this many records "
+                             "(0 = off; a source's \"windowRecords\" overrides)")
+    p_init.add_argument("--host-concurrency", type=int, default=4, help="Concurrent window probes per source")
+
+    p_work = sub.add_parser("work", help="Claim and harvest tasks until the queue is empty")
+    p_work.add_argument("--shards", default="output/harvest_shards")
+    p_work.add_argument("--worker-id", default=None)
+    p_work.add_argument("--threads", type=int, default=1)
+    p_work.add_argument("--lease", type=float, default=300.0, help="Lease seconds; renewed every lease/3")
+    p_work.add_argument("--max-attempts", type=int, default=3)
+    p_work.add_argument("--max-records", type=int, default=None)
+    p_work.add_argument("--max-no-advisor", type=int, default=200)
+    p_work.add_argument("--sleep", type=float, default=1.0)
+    p_work.add_argument("--timeout", type=int, default=20)
+    add_breaker_args(p_work)
+
+    p_reduce = sub.add_parser("reduce", help="Merge finished shards into one dataset")
+    p_reduce.add_argument("--shards", default=None,
+                          help="Directory holding the shards, if not the path each worker recorded")
+    p_reduce.add_argument("--out-names", required=True)
+    p_reduce.add_argument("--out-edges", required=True)
+
+    sub.add_parser("status")
+    args = ap.parse_args()
+
+    Path(args.queue).parent.mkdir(parents=True, exist_ok=True)
+    queue = WorkQueue(args.queue)
+    if args.cmd == "init":
+        cmd_init(queue, args)
+    elif args.cmd == "work":
+        install_from_args(args)
+        cmd_work(queue, args)
+    elif args.cmd == "reduce":
+        cmd_reduce(queue, args)
+    else:
+        print("[queue] " + " ".join(f"{k}={v}" for k, v in queue.counts().items()))
+
+
+if __name__ == "__main__":
+    main()
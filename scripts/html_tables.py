@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML table extraction for the list builders and scrapers.
+
+The page is fed to the stdlib HTMLParser in chunks and table rows are yielded as
+they close, as lists of cell texts (text pieces whitespace-stripped and joined
+with a space, like BeautifulSoup's get_text(" ", strip=True)). No document tree
+is built, so a multi-MB ranking page costs one pass and a few rows of memory.
+Omitted </td>, </tr> end tags are closed the way browsers do; text inside
+<script>/<style> is ignored; rows of nested tables are reported for the inner
+table only.
+
+- rows(html, table=N)        every row (Row: cells, th flags, tr attributes, table index)
+- records(html, columns)     the named columns of each row below a table's header row
+- elements(html, tag, cls)   (attributes, text) of every <tag class="cls"> element
+
+Usage:
+    python3 scripts/html_tables.py page.html [--table 0]        # print a table's rows
+    python3 scripts/html_tables.py --bench [page.html ...]      # compare with BeautifulSoup
+                                                                # (default: scripts/html_fixtures/*.html)
+    python3 scripts/html_tables.py --bench --cached             # ... on the HTML pages in output/http_cache
+
+scripts/html_fixtures holds small ABS, CORE portal, UTD24 and Scholar Metrics
+pages with the markup those builders parse (well-formed, so BeautifulSoup's
+html.parser and this module should agree row for row).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Iterator
+
+FIXTURES = Path(__file__).resolve().parent / "html_fixtures"
+CHUNK_CHARS = 1 << 16
+SKIP_TEXT = {"script", "style", "template"}
+
+
+class Row:
+    __slots__ = ("cells", "th", "attrs", "table")
+
+    def __init__(self, cells: list[str], th: list[bool], attrs: dict, table: int) -> None:
+        self.cells = cells
+        self.th = th
+        self.attrs = attrs
+        self.table = table
+
+    @property
+    def is_header(self) -> bool:
+        return any(self.th)
+
+    @property
+    def td(self) -> list[str]:
+        """Texts of the <td> cells only."""
+        return [c for c, h in zip(self.cells, self.th) if not h]
+
+    @property
+    def text(self) -> str:
+        return " ".join(c for c in self.cells if c)
+
+    def __repr__(self) -> str:
+        return f"Row(table={self.table}, cells={self.cells!r})"
+
+
+class _Table:
+    __slots__ = ("index", "row", "row_th", "row_attrs", "cell")
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.row: list[str] | None = None
+        self.row_th: list[bool] = []
+        self.row_attrs: dict = {}
+        self.cell: list[str] | None = None
+
+
+class TableParser(HTMLParser):
+    """Collects finished rows in .done; callers drain it between feed() calls."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.done: list[Row] = []
+        self.stack: list[_Table] = []
+        self.tables_seen = 0
+        self.skip = 0
+        # Raw text of the current text node; feed() boundaries can split one node over several calls.
+        self.pending: list[str] = []
+
+    def _flush(self) -> None:
+        if self.pending:
+            text = "".join(self.pending).strip()
+            self.pending = []
+            cell = self.stack[-1].cell if self.stack else None
+            if text and cell is not None:
+                cell.append(text)
+
+    def _close_cell(self, t: _Table) -> None:
+        self._flush()
+        if t.cell is not None and t.row is not None:
+            t.row.append(" ".join(t.cell))
+        t.cell = None
+
+    def _close_row(self, t: _Table) -> None:
+        self._close_cell(t)
+        if t.row is not None:
+            self.done.append(Row(t.row, t.row_th, t.row_attrs, t.index))
+        t.row = None
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self._flush()
+        if tag in SKIP_TEXT:
+            self.skip += 1
+        elif tag == "table":
+            self.stack.append(_Table(self.tables_seen))
+            self.tables_seen += 1
+        elif not self.stack:
+            return
+        elif tag == "tr":
+            t = self.stack[-1]
+            self._close_row(t)
+            t.row, t.row_th, t.row_attrs = [], [], dict(attrs)
+        elif tag in ("td", "th"):
+            t = self.stack[-1]
+            self._close_cell(t)
+            if t.row is None:
+                t.row, t.row_th, t.row_attrs = [], [], {}
+            t.cell = []
+            t.row_th.append(tag == "th")
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in SKIP_TEXT:
+            self.skip = max(0, self.skip - 1)
+        elif not self.stack:
+            return
+        elif tag == "table":
+            self._close_row(self.stack.pop())
+        elif tag == "tr":
+            self._close_row(self.stack[-1])
+        elif tag in ("td", "th"):
+            self._close_cell(self.stack[-1])
+
+    def handle_data(self, data: str) -> None:
+        if not self.skip and self.stack and self.stack[-1].cell is not None:
+            self.pending.append(data)
+
+    def close(self) -> None:
+        super().close()
+        while self.stack:
+            self._close_row(self.stack.pop())
+
+
+def _drain(source: str | bytes, parser) -> Iterator[list]:
+    """Feed source in chunks, yielding what the parser finished after each one."""
+    if isinstance(source, bytes):
+        source = source.decode("utf-8", errors="replace")
+    for i in range(0, len(source), CHUNK_CHARS):
+        parser.feed(source[i:i + CHUNK_CHARS])
+        if parser.done:
+            done, parser.done = parser.done, []
+            yield done
+    parser.close()
+    if parser.done:
+        yield parser.done
+
+
+def rows(source: str | bytes, *, table: int | None = None) -> Iterator[Row]:
+    """Every table row in document order, or only those of the N-th table (0-based, document order)."""
+    for done in _drain(source, TableParser()):
+        for row in done:
+            if table is None or row.table == table:
+                yield row
+
+
+def _matches(spec: str | Callable[[str], bool], header: str) -> bool:
+    if callable(spec):
+        return spec(header)
+    return " ".join(header.split()).casefold() == " ".join(spec.split()).casefold()
+
+
+def records(source: str | bytes, columns: list[str | Callable[[str], bool]], *, table: int = 0) -> Iterator[tuple]:
+    """The named columns of each row below the table's first row.
+
+    A column is a header text (matched case- and whitespace-insensitively) or a
+    predicate over the header text. Raises LookupError when the header row
+    lacks one of them. Short rows are padded with "".
+    """
+    it = rows(source, table=table)
+    header = next(it, None)
+    if header is None:
+        raise LookupError(f"no table {table} in page")
+    idx = []
+    for spec in columns:
+        hit = [i for i, h in enumerate(header.cells) if _matches(spec, h)]
+        if not hit:
+            raise LookupError(f"no column {getattr(spec, '__name__', spec)!r} in header {header.cells}")
+        idx.append(hit[0])
+    for row in it:
+        yield tuple(row.cells[i] if i < len(row.cells) else "" for i in idx)
+
+
+class _ElementParser(HTMLParser):
+    def __init__(self, tag: str, cls: str | None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.cls = cls
+        self.done: list[tuple[dict, str]] = []
+        self.depth = 0  # open `tag` elements inside the current match, including it
+        self.attrs: dict = {}
+        self.text: list[str] = []
+        self.pending: list[str] = []
+        self.skip = 0
+
+    def _flush(self) -> None:
+        if self.pending:
+            text = "".join(self.pending).strip()
+            self.pending = []
+            if text:
+                self.text.append(text)
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self._flush()
+        if tag in SKIP_TEXT:
+            self.skip += 1
+        if tag != self.tag:
+            return
+        if self.depth:
+            self.depth += 1
+            return
+        a = dict(attrs)
+        if self.cls is None or self.cls in (a.get("class") or "").split():
+            self.depth, self.attrs, self.text = 1, a, []
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in SKIP_TEXT:
+            self.skip = max(0, self.skip - 1)
+        if tag != self.tag or not self.depth:
+            return
+        self.depth -= 1
+        if not self.depth:
+            self.done.append((self.attrs, " ".join(self.text)))
+
+    def handle_data(self, data: str) -> None:
+        if self.depth and not self.skip:
+            self.pending.append(data)
+
+
+def elements(source: str | bytes, tag: str, cls: str | None = None) -> Iterator[tuple[dict, str]]:
+    """(attributes, text) of each <tag> element (with class `cls`, if given), outermost matches only."""
+    for done in _drain(source, _ElementParser(tag, cls)):
+        yield from done
+
+
+def _peak_mb(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def _best_of(fn, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def cached_html_pages() -> list[Path]:
+    """Bodies of HTML pages in the HTTP cache, as saved by the builders."""
+    import http_cache
+
+    try:
+        index = json.loads((http_cache.DEFAULT_CACHE_DIR / "index.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    paths = []
+    for url, entry in sorted(index.items()):
+        path = http_cache.DEFAULT_CACHE_DIR / "bodies" / entry["sha256"]
+        if path.exists() and path.read_bytes()[:2048].lstrip()[:1] == b"<":
+            paths.append(path)
+    return paths
+
+
+def bench(paths: list[Path], repeat: int = 3) -> int:
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        BeautifulSoup = None
+        print("bs4 not installed; timing the streaming extractor only")
+    if not paths:
+        print("No pages: pass HTML files, or run a builder once to fill output/http_cache for --cached")
+        return 1
+    mismatches = 0
+    for path in paths:
+        html = path.read_text(encoding="utf-8", errors="replace")
+
+        def stream():
+            return [r.cells for r in rows(html)]
+
+        def soup():
+            tree = BeautifulSoup(html, "html.parser")
+            return [[c.get_text(" ", strip=True) for c in tr.find_all(["td", "th"], recursive=False)]
+                    for tr in tree.find_all("tr")]
+
+        print(f"{path} ({len(html) / 1e6:.1f} MB)")
+        results = {}
+        for name, fn in (("stream", stream), ("bs4", soup)):
+            if name == "bs4" and BeautifulSoup is None:
+                continue
+            # Timed runs and the (slower) traced run for peak memory are kept apart.
+            best, results[name] = _best_of(fn, repeat)
+            print(f"  {name:6s} best={best:.3f}s peak={_peak_mb(fn):.1f}MB rows={len(results[name])}")
+        if len(results) == 2:
+            same = results["stream"] == results["bs4"]
+            mismatches += not same
+            print(f"  rows identical: {same}")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Print HTML table rows, or benchmark the extractor")
+    ap.add_argument("pages", nargs="*", type=Path)
+    ap.add_argument("--table", type=int, default=None)
+    ap.add_argument("--bench", action="store_true", help="Time against BeautifulSoup on the given or fixture pages")
+    ap.add_argument("--cached", action="store_true", help="With --bench, use the HTML pages in output/http_cache")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    if args.bench:
+        pages = args.pages or (cached_html_pages() if args.cached else sorted(FIXTURES.glob("*.html")))
+        return bench(pages, args.repeat)
+    if not args.pages:
+        ap.error("pass an HTML file (or --bench)")
+    for path in args.pages:
+        for row in rows(path.read_text(encoding="utf-8", errors="replace"), table=args.table):
+            print(json.dumps({"table": row.table, "cells": row.cells}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
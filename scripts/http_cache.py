@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP cache with conditional GETs for the list builders.
+
+Each URL's ETag, Last-Modified and the SHA-256 of its body are kept in
+<cache-dir>/index.json; bodies are stored once per hash under <cache-dir>/bodies.
+Cached URLs are re-requested with If-None-Match / If-Modified-Since, so an
+unchanged upstream costs one 304 round trip. --offline replays cached bodies
+without touching the network (CacheMiss for anything never fetched), which lets
+parsers be rerun and benchmarked offline.
+
+Scripts call install_from_args() once and fetch through fetch(); without an
+installed cache fetch() is a plain download.
+
+Usage:
+    python3 scripts/http_cache.py [--cache-dir output/http_cache]   # list cached URLs
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "output" / "http_cache"
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode for a URL that has no cached body."""
+
+
+def full_url(url: str, params: dict | None = None) -> str:
+    if not params:
+        return url
+    return url + ("&" if "?" in url else "?") + urllib.parse.urlencode(params)
+
+
+def download(url: str, *, headers: dict | None = None, timeout: float = 60, verify_tls: bool = True,
+             session=None) -> tuple[int, bytes | None, str | None, str | None]:
+    """(status, body, etag, last_modified); status 304 has no body.
+
+    A requests-style session (or the requests module) is used when given; the
+    stdlib path handles verify_tls=False with an unverified SSL context.
+    """
+    headers = dict(headers or {})
+    if session is not None and verify_tls:
+        r = session.get(url, headers=headers, timeout=timeout)
+        if r.status_code == 304:
+            return 304, None, r.headers.get("ETag"), r.headers.get("Last-Modified")
+        r.raise_for_status()
+        return r.status_code, r.content, r.headers.get("ETag"), r.headers.get("Last-Modified")
+    ctx = None
+    if not verify_tls:
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    headers.setdefault("User-Agent", "Mozilla/5.0")
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, context=ctx, timeout=timeout) as resp:
+            return resp.status, resp.read(), resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, None, e.headers.get("ETag"), e.headers.get("Last-Modified")
+        raise
+
+
+class HttpCache:
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR, offline: bool = False) -> None:
+        self.dir = Path(cache_dir)
+        self.bodies = self.dir / "bodies"
+        self.bodies.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.dir / "index.json"
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.stats = {"downloaded": 0, "changed": 0, "unchanged": 0, "replayed": 0}
+        try:
+            self.index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.index = {}
+
+    def _body(self, entry: dict | None) -> bytes | None:
+        if not entry:
+            return None
+        try:
+            return (self.bodies / entry["sha256"]).read_bytes()
+        except OSError:
+            return None
+
+    def _bump(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] += 1
+
+    def get(self, url: str, *, params: dict | None = None, headers: dict | None = None, timeout: float = 60,
+            verify_tls: bool = True, session=None) -> bytes:
+        url = full_url(url, params)
+        with self.lock:
+            entry = self.index.get(url)
+        body = self._body(entry)
+        if self.offline:
+            if body is None:
+                raise CacheMiss(f"not in HTTP cache (offline): {url}")
+            self._bump("replayed")
+            return body
+
+        h = dict(headers or {})
+        if body is not None:
+            if entry.get("etag"):
+                h["If-None-Match"] = entry["etag"]
+            if entry.get("lastModified"):
+                h["If-Modified-Since"] = entry["lastModified"]
+        status, new_body, etag, last_modified = download(url, headers=h, timeout=timeout, verify_tls=verify_tls,
+                                                         session=session)
+        if status == 304 and body is not None:
+            self._bump("unchanged")
+            self._store(url, entry["sha256"], etag or entry.get("etag"), last_modified or entry.get("lastModified"),
+                        changed=False)
+            return body
+        if status == 304:
+            # Nothing cached to reuse (the caller sent its own validators, or the server answers 304
+            # unconditionally): ask again for the full body.
+            h = {k: v for k, v in h.items() if k.lower() not in ("if-none-match", "if-modified-since")}
+            status, new_body, etag, last_modified = download(url, headers=h, timeout=timeout,
+                                                             verify_tls=verify_tls, session=session)
+            if status == 304:
+                raise OSError(f"HTTP 304 without a cached body: {url}")
+
+        digest = hashlib.sha256(new_body).hexdigest()
+        path = self.bodies / digest
+        if not path.exists():
+            tmp = path.with_name(f"{digest}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(new_body)
+            tmp.replace(path)
+        changed = entry is None or entry.get("sha256") != digest
+        if entry is None:
+            self._bump("downloaded")
+        else:
+            # A server that ignores conditional headers still counts as unchanged when the hash matches.
+            self._bump("changed" if changed else "unchanged")
+        self._store(url, digest, etag, last_modified, changed)
+        return new_body
+
+    def _store(self, url: str, digest: str, etag: str | None, last_modified: str | None, changed: bool) -> None:
+        now = int(time.time())
+        with self.lock:
+            entry = self.index.get(url, {})
+            entry.update({"sha256": digest, "etag": etag, "lastModified": last_modified, "checkedAt": now})
+            if changed or "changedAt" not in entry:
+                entry["changedAt"] = now
+            self.index[url] = entry
+            data = json.dumps(self.index, indent=1, sort_keys=True)
+            tmp = self.index_path.with_name(f"index.{threading.get_ident()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            tmp.replace(self.index_path)
+
+    def digest(self, url: str, params: dict | None = None) -> str | None:
+        """SHA-256 of the cached body, e.g. to tell whether an input changed."""
+        with self.lock:
+            entry = self.index.get(full_url(url, params))
+        return entry["sha256"] if entry else None
+
+    def summary(self) -> str:
+        with self.lock:
+            return " ".join(f"{k}={v}" for k, v in self.stats.items())
+
+
+_active: HttpCache | None = None
+
+
+def install(cache_dir: Path | str = DEFAULT_CACHE_DIR, offline: bool = False) -> HttpCache:
+    global _active
+    _active = HttpCache(cache_dir, offline)
+    return _active
+
+
+def active() -> HttpCache | None:
+    return _active
+
+
+def add_cache_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                    help="HTTP cache for conditional re-downloads (default: output/http_cache)")
+    ap.add_argument("--no-cache", action="store_true", help="Always download in full and leave the cache untouched")
+    ap.add_argument("--offline", action="store_true", help="Replay cached responses only; never touch the network")
+
+
+def install_from_args(args: argparse.Namespace) -> HttpCache | None:
+    if args.no_cache:
+        if args.offline:
+            raise SystemExit("--offline needs the cache; drop --no-cache")
+        return None
+    return install(args.cache_dir, args.offline)
+
+
+def fetch(url: str, *, params: dict | None = None, headers: dict | None = None, timeout: float = 60,
+          verify_tls: bool = True, session=None) -> bytes:
+    """GET a URL through the installed cache, or directly when none is installed."""
+    if _active is not None:
+        return _active.get(url, params=params, headers=headers, timeout=timeout, verify_tls=verify_tls,
+                           session=session)
+    status, body, _, _ = download(full_url(url, params), headers=headers, timeout=timeout, verify_tls=verify_tls,
+                                  session=session)
+    return body
+
+
+def fetch_text(url: str, **kwargs) -> str:
+    return fetch(url, **kwargs).decode("utf-8", errors="replace")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="List the URLs in an HTTP cache")
+    ap.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    args = ap.parse_args()
+    cache = HttpCache(args.cache_dir)
+    for url, entry in sorted(cache.index.items()):
+        checked = time.strftime("%Y-%m-%d", time.gmtime(entry.get("checkedAt", 0)))
+        changed = time.strftime("%Y-%m-%d", time.gmtime(entry.get("changedAt", 0)))
+        print(f"{entry['sha256'][:12]} checked={checked} changed={changed} {url}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
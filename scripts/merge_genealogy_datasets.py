@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """
 Merge multiple genealogy datasets into a single deduplicated dataset.
+Inputs (--datasets, merged in the order given):
+  - label=names.json.gz,edges.bin.gz  binary datasets from the harvester/merger
+  - label=edges.jsonl[.gz]            {"advisor","student",...} rows from
+    extract_advisors_from_pdfs.py / collect_committee_lists.py, streamed
 Outputs:
   - merged names json.gz with {"n": [names...]}
   - merged edges bin.gz (uint32 advisor, uint32 student)
@@ -87,6 +91,26 @@ def load_names(path: Path):
     return obj["n"]
 
 
+def iter_jsonl_edges(path: Path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield None
+                continue
+            advisor = str(row.get("advisor") or "").strip()
+            student = str(row.get("student") or "").strip()
+            if not advisor or not student:
+                yield None
+                continue
+            yield advisor, student, str(row.get("source") or "")
+
+
 def iter_edges(path: Path):
     with gzip.open(path, "rb") as f:
         data = f.read()
@@ -95,40 +119,43 @@ def iter_edges(path: Path):
         yield a, b
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--datasets", nargs="+", required=True, help="name=names.gz,edges.gz")
-    ap.add_argument("--out-names", required=True)
-    ap.add_argument("--out-edges", required=True)
-    args = ap.parse_args()
+class MergeStore:
+    """Deduplicated name table and edge set shared by every input."""
 
-    merged_names = []
-    name_index = {}
-    edge_set = set()
+    def __init__(self):
+        self.names = []
+        self.name_index = {}
+        self.edges = set()
 
-    def get_or_add(name):
+    def add_name(self, name):
         key = normalize_name(name)
         if not key:
             return None
-        if key in name_index:
-            return name_index[key]
-        idx = len(merged_names)
-        name_index[key] = idx
-        merged_names.append(name)
+        if key in self.name_index:
+            return self.name_index[key]
+        idx = len(self.names)
+        self.name_index[key] = idx
+        self.names.append(name)
         return idx
 
-    for spec in args.datasets:
-        if "=" not in spec:
-            raise SystemExit(f"Invalid dataset spec: {spec}")
-        label, paths = spec.split("=", 1)
-        names_path, edges_path = paths.split(",", 1)
-        names_path = Path(names_path)
-        edges_path = Path(edges_path)
+    def add_edge_ids(self, na, nb):
+        if na is None or nb is None or na == nb:
+            return False
+        key = (na << 32) | nb
+        if key in self.edges:
+            return False
+        self.edges.add(key)
+        return True
+
+    def add_edge(self, advisor, student):
+        return self.add_edge_ids(self.add_name(advisor), self.add_name(student))
+
+    def add_dataset(self, names_path: Path, edges_path: Path):
         names = load_names(names_path)
         # build mapping old->new
         mapping = {}
         for i, name in enumerate(names):
-            idx = get_or_add(name)
+            idx = self.add_name(name)
             if idx is None:
                 continue
             mapping[i] = idx
@@ -136,28 +163,75 @@ def main():
         for a, b in iter_edges(edges_path):
             if a not in mapping or b not in mapping:
                 continue
-            na = mapping[a]
-            nb = mapping[b]
-            if na == nb:
+            self.add_edge_ids(mapping[a], mapping[b])
+        return len(names), len(mapping)
+
+    def add_jsonl(self, path: Path):
+        stats = {"rows": 0, "added": 0, "dupes": 0, "skipped": 0}
+        by_source = {}
+        for item in iter_jsonl_edges(path):
+            stats["rows"] += 1
+            if item is None:
+                stats["skipped"] += 1
                 continue
-            key = (na << 32) | nb
-            edge_set.add(key)
-        print(f"[merge] {label} names={len(names)} mapped={len(mapping)} edges={len(edge_set)}")
-
-    # write names
-    out_names = Path(args.out_names)
-    out_names.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(out_names, "wt", encoding="utf-8") as f:
-        json.dump({"n": merged_names}, f, ensure_ascii=False)
-    # write edges
-    out_edges = Path(args.out_edges)
-    out_edges.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(out_edges, "wb") as f:
-        for key in edge_set:
-            a = (key >> 32) & 0xFFFFFFFF
-            b = key & 0xFFFFFFFF
-            f.write(struct.pack("<II", a, b))
-    print(f"[merge] merged names={len(merged_names)} edges={len(edge_set)}")
+            advisor, student, source = item
+            if self.add_edge(advisor, student):
+                stats["added"] += 1
+                by_source[source] = by_source.get(source, 0) + 1
+            else:
+                stats["dupes"] += 1
+        stats["by_source"] = by_source
+        return stats
+
+    def add_spec(self, spec):
+        """Merge one --datasets spec and return a one-line summary."""
+        label, names_path, edges_path = parse_dataset_spec(spec)
+        if names_path is None:
+            stats = self.add_jsonl(edges_path)
+            by_source = ",".join(f"{k or '-'}:{v}" for k, v in sorted(stats["by_source"].items()))
+            return (f"{label} jsonl rows={stats['rows']} added={stats['added']} dupes={stats['dupes']} "
+                    f"skipped={stats['skipped']} sources={by_source or '-'} edges={len(self.edges)}")
+        n_names, n_mapped = self.add_dataset(names_path, edges_path)
+        return f"{label} names={n_names} mapped={n_mapped} edges={len(self.edges)}"
+
+    def write(self, out_names: Path, out_edges: Path):
+        out_names.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(out_names, "wt", encoding="utf-8") as f:
+            json.dump({"n": self.names}, f, ensure_ascii=False)
+        out_edges.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(out_edges, "wb") as f:
+            for key in self.edges:
+                a = (key >> 32) & 0xFFFFFFFF
+                b = key & 0xFFFFFFFF
+                f.write(struct.pack("<II", a, b))
+
+
+def parse_dataset_spec(spec):
+    """label=names.gz,edges.gz -> (label, names, edges); label=edges.jsonl[.gz] -> (label, None, edges)."""
+    if "=" not in spec:
+        raise SystemExit(f"Invalid dataset spec: {spec}")
+    label, paths = spec.split("=", 1)
+    if "," not in paths:
+        if not re.search(r"\.jsonl(\.gz)?$", paths, re.I):
+            raise SystemExit(f"Invalid dataset spec: {spec}")
+        return label, None, Path(paths)
+    names_path, edges_path = paths.split(",", 1)
+    return label, Path(names_path), Path(edges_path)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--datasets", nargs="+", required=True, help="name=names.gz,edges.gz or name=edges.jsonl[.gz]")
+    ap.add_argument("--out-names", required=True)
+    ap.add_argument("--out-edges", required=True)
+    args = ap.parse_args()
+
+    store = MergeStore()
+    for spec in args.datasets:
+        print(f"[merge] {store.add_spec(spec)}")
+
+    store.write(Path(args.out_names), Path(args.out_edges))
+    print(f"[merge] merged names={len(store.names)} edges={len(store.edges)}")
 
 
 if __name__ == "__main__":
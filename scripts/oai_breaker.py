@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Per-host circuit breaker shared by the OAI scripts.
+
+After --breaker-threshold consecutive connect/read failures against a host the
+breaker opens and every request to that host fails immediately with HostOpen.
+Once the cool-down has passed one request is let through as a probe: success
+closes the breaker, failure re-opens it with the cool-down doubled (capped at
+MAX_COOLDOWN_S). Any HTTP response, including an HTTP error status, counts as
+the host being reachable.
+
+State is kept in a JSON file so hosts found dead in one run stay open in the
+next. Scripts call install_from_args() once; fetch helpers wrap their request
+in guard(url), which does nothing when no breaker is installed.
+
+Usage:
+    python3 scripts/oai_breaker.py [--breaker-state output/oai_host_breaker.json]   # list open hosts
+    python3 scripts/oai_breaker.py --reset example.org
+"""
+import argparse
+import atexit
+import contextlib
+import http.client
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+from pathlib import Path
+
+
+DEFAULT_STATE = "output/oai_host_breaker.json"
+MAX_COOLDOWN_S = 7 * 24 * 3600
+
+
+class HostOpen(ConnectionError):
+    """Raised instead of contacting a host whose breaker is open."""
+
+
+def is_connection_failure(exc):
+    if isinstance(exc, urllib.error.HTTPError):
+        return False
+    return isinstance(exc, (urllib.error.URLError, socket.timeout, TimeoutError, ConnectionError,
+                            http.client.HTTPException))
+
+
+def host_of(url):
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+
+class HostBreaker:
+    def __init__(self, path=DEFAULT_STATE, threshold=5, cooldown_s=1800):
+        self.path = Path(path)
+        self.threshold = max(1, threshold)
+        self.cooldown_s = cooldown_s
+        self.lock = threading.Lock()
+        self.probing = set()
+        try:
+            self.hosts = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.hosts = {}
+
+    def before(self, url):
+        host = host_of(url)
+        with self.lock:
+            entry = self.hosts.get(host)
+            if not entry or not entry.get("openUntil"):
+                return
+            if time.time() < entry["openUntil"] or host in self.probing:
+                raise HostOpen(f"circuit open for {host} ({entry.get('lastError')})")
+            # Cool-down over: this request is the probe, everyone else keeps failing fast.
+            self.probing.add(host)
+
+    def success(self, url):
+        host = host_of(url)
+        with self.lock:
+            self.probing.discard(host)
+            entry = self.hosts.pop(host, None)
+        if entry and entry.get("openUntil"):
+            print(f"[breaker] {host} closed", flush=True)
+            self.save()
+
+    def failure(self, url, exc):
+        if not is_connection_failure(exc):
+            self.success(url)
+            return
+        host = host_of(url)
+        opened = False
+        with self.lock:
+            entry = self.hosts.setdefault(host, {"failures": 0, "trips": 0, "openUntil": None})
+            entry["failures"] += 1
+            entry["lastError"] = str(exc)[:200]
+            was_probe = host in self.probing
+            self.probing.discard(host)
+            if was_probe or (not entry["openUntil"] and entry["failures"] >= self.threshold):
+                entry["trips"] += 1
+                cooldown = min(self.cooldown_s * 2 ** (entry["trips"] - 1), MAX_COOLDOWN_S)
+                entry["openUntil"] = time.time() + cooldown
+                opened = True
+        if opened:
+            print(f"[breaker] {host} open for {cooldown / 60:.0f}min after {entry['failures']} failures: "
+                  f"{entry['lastError']}", flush=True)
+            self.save()
+
+    def open_hosts(self):
+        with self.lock:
+            return {h: dict(e) for h, e in self.hosts.items() if e.get("openUntil")}
+
+    def reset(self, host):
+        with self.lock:
+            self.hosts.pop(host.lower(), None)
+        self.save()
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.hosts, indent=1, sort_keys=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + f".{threading.get_ident()}.tmp")
+        tmp.write_text(data, encoding="utf-8")
+        tmp.replace(self.path)
+
+
+_active = None
+
+
+def install(path=DEFAULT_STATE, threshold=5, cooldown_s=1800):
+    global _active
+    _active = HostBreaker(path, threshold, cooldown_s)
+    atexit.register(_active.save)
+    return _active
+
+
+def add_breaker_args(ap):
+    ap.add_argument("--breaker-state", default=DEFAULT_STATE,
+                    help="Per-host circuit breaker state shared across runs ('' disables the breaker)")
+    ap.add_argument("--breaker-threshold", type=int, default=5,
+                    help="Consecutive connect/read failures before a host is skipped")
+    ap.add_argument("--breaker-cooldown", type=float, default=30.0,
+                    help="Minutes before an open host is probed again (doubles on each re-open)")
+
+
+def install_from_args(args):
+    if not args.breaker_state:
+        return None
+    return install(args.breaker_state, args.breaker_threshold, args.breaker_cooldown * 60)
+
+
+@contextlib.contextmanager
+def guard(url):
+    breaker = _active
+    if breaker is None:
+        yield
+        return
+    breaker.before(url)
+    try:
+        yield
+    except Exception as e:
+        breaker.failure(url, e)
+        raise
+    breaker.success(url)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--breaker-state", default=DEFAULT_STATE)
+    ap.add_argument("--reset", nargs="*", default=None, help="Close the breaker for these hosts")
+    args = ap.parse_args()
+
+    breaker = HostBreaker(args.breaker_state)
+    for host in args.reset or []:
+        breaker.reset(host)
+        print(f"[breaker] {host} reset")
+    now = time.time()
+    for host, entry in sorted(breaker.open_hosts().items()):
+        left = max(0, entry["openUntil"] - now)
+        print(f"[breaker] {host} trips={entry['trips']} failures={entry['failures']} "
+              f"probe_in={left / 60:.0f}min error={entry.get('lastError')}")
+
+
+if __name__ == "__main__":
+    main()
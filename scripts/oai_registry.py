@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Unified OAI-PMH source registry (SQLite).
+
+Ingests every source list (build_roar_sources.py, discover_oai_sources_ird.py,
+validate_oai_sources.py output, hand-maintained genealogy_sources*.json),
+deduplicates them and tracks per-source health so each repository is
+harvested once. Each source row holds its latest validation and harvest
+results; every validation and harvest is also appended to probe_history.
+
+Sources are matched on the normalized base URL (scheme, "www." and trailing
+slash ignored) or the OAI repositoryIdentifier reported by Identify. Two
+matching sources are the same harvest unit when they have the same harvest
+scope (set / setRegex) or either one harvests the whole repository; only
+different sets of one repository are harvested separately. The first one
+ingested is kept; later ones point to it through duplicate_of (re-checked
+after validation results move a source to its working endpoint). Ingest
+hand-maintained configs first so their keys and set filters win.
+
+Usage:
+    python3 scripts/oai_registry.py ingest scripts/genealogy_sources*.json output/ird_oai_sources.json
+    python3 scripts/oai_registry.py import-validation output/oai_validation_cache.json
+    python3 scripts/oai_registry.py export --out output/registry_sources.json
+    python3 scripts/oai_registry.py stats
+    python3 scripts/oai_registry.py history SOURCE_KEY
+    python3 scripts/harvest_genealogy_oai.py --registry output/oai_registry.sqlite
+"""
+import argparse
+import json
+import sqlite3
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+from validate_oai_sources import normalize_base
+
+
+DEFAULT_REGISTRY = "output/oai_registry.sqlite"
+# Source fields stored in their own columns; anything else is kept in "extra".
+KNOWN_FIELDS = {"key", "label", "base", "originalBase", "metadataPrefixes", "metadataPrefix", "set", "setRegex", "enabled"}
+
+
+def registry_base_key(base):
+    base = normalize_base(base)
+    if not base:
+        return ""
+    parts = urllib.parse.urlsplit(base)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host + parts.path.rstrip("/")
+
+
+def harvest_scope(src):
+    if src.get("set"):
+        return "set:" + src["set"]
+    if src.get("setRegex"):
+        return "re:" + src["setRegex"]
+    return ""
+
+
+class SourceRegistry:
+    def __init__(self, path=DEFAULT_REGISTRY):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS sources (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE,
+                label TEXT,
+                base TEXT,
+                base_key TEXT,
+                original_base TEXT,
+                scope TEXT,
+                repo_id TEXT,
+                prefixes TEXT,
+                set_spec TEXT,
+                set_regex TEXT,
+                enabled INTEGER DEFAULT 1,
+                origins TEXT,
+                extra TEXT,
+                duplicate_of INTEGER,
+                validation_status TEXT,
+                validation_error TEXT,
+                validated_at REAL,
+                latency_ms INTEGER,
+                repository_name TEXT,
+                last_harvest_at REAL,
+                harvest_seconds REAL,
+                harvest_records INTEGER,
+                harvest_advisors INTEGER,
+                harvest_edges INTEGER,
+                harvest_error TEXT,
+                UNIQUE (base_key, scope)
+            );
+            CREATE INDEX IF NOT EXISTS sources_repo_id ON sources (repo_id, scope);
+            CREATE TABLE IF NOT EXISTS probe_history (
+                source_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                at REAL NOT NULL,
+                status TEXT,
+                error TEXT,
+                latency_ms INTEGER,
+                records INTEGER,
+                edges INTEGER,
+                seconds REAL
+            );
+            CREATE INDEX IF NOT EXISTS probe_history_source ON probe_history (source_id, at);
+        """)
+        # Registries created before original_base existed.
+        columns = {r["name"] for r in self.db.execute("PRAGMA table_info(sources)")}
+        if "original_base" not in columns:
+            self.db.execute("ALTER TABLE sources ADD COLUMN original_base TEXT")
+        self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+    def _find(self, base_keys, scope):
+        for bk in base_keys:
+            row = self.db.execute("SELECT * FROM sources WHERE base_key = ? AND scope = ?", (bk, scope)).fetchone()
+            if row:
+                return row
+        return None
+
+    def ingest(self, src, origin):
+        """Add or merge one source dict; returns "added", "merged" or "skipped"."""
+        base = (src.get("base") or "").strip()
+        if not base:
+            return "skipped"
+        scope = harvest_scope(src)
+        base_keys = [registry_base_key(base)]
+        if src.get("originalBase"):
+            base_keys.append(registry_base_key(src["originalBase"]))
+        prefixes = src.get("metadataPrefixes") or [src.get("metadataPrefix", "oai_dc")]
+        extra = {k: v for k, v in src.items() if k not in KNOWN_FIELDS}
+        with self.lock:
+            row = self._find(base_keys, scope)
+            if row is None:
+                key = src.get("key") or base_keys[0]
+                if self.db.execute("SELECT 1 FROM sources WHERE key = ?", (key,)).fetchone():
+                    key = f"{key}__{base_keys[0]}"
+                self.db.execute(
+                    "INSERT INTO sources (key, label, base, base_key, original_base, scope, prefixes, set_spec, "
+                    "set_regex, enabled, origins, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, src.get("label") or key, base, base_keys[0], src.get("originalBase"), scope,
+                     json.dumps(prefixes),
+                     src.get("set"), src.get("setRegex"), int(src.get("enabled") is not False),
+                     json.dumps([origin]), json.dumps(extra) if extra else None),
+                )
+                self.db.commit()
+                return "added"
+            merged_prefixes = list(dict.fromkeys(json.loads(row["prefixes"] or "[]") + prefixes))
+            origins = list(dict.fromkeys(json.loads(row["origins"] or "[]") + [origin]))
+            # A validated config carries the endpoint that actually answered.
+            new_base = base if src.get("originalBase") else row["base"]
+            self.db.execute(
+                "UPDATE sources SET prefixes = ?, origins = ?, base = ?, "
+                "original_base = COALESCE(original_base, ?) WHERE id = ?",
+                (json.dumps(merged_prefixes), json.dumps(origins), new_base, src.get("originalBase"), row["id"]),
+            )
+            self.db.commit()
+            return "merged"
+
+    def import_validation(self, cache):
+        """Copy validate_oai_sources.py cache entries onto matching sources."""
+        n = 0
+        with self.lock:
+            # The cache is keyed by the base the validator was given: the
+            # originalBase of a row ingested from validator output, otherwise
+            # the row's own base. A row is found under either.
+            rows = self.db.execute("SELECT id, base_key, original_base FROM sources ORDER BY id").fetchall()
+            by_key = {}
+            for r in rows:
+                by_key.setdefault(r["base_key"], []).append(r["id"])
+                if r["original_base"]:
+                    by_key.setdefault(registry_base_key(r["original_base"]), []).append(r["id"])
+            for norm, probe in cache.items():
+                sids = list(dict.fromkeys(by_key.get(registry_base_key(norm), [])))
+                if not sids:
+                    continue
+                if probe.get("error"):
+                    status = "transient" if probe.get("transient") else "failed"
+                else:
+                    status = "ok" if probe.get("identifiersOk") else "failed"
+                for sid in sids:
+                    self.db.execute(
+                        "UPDATE sources SET validation_status = ?, validation_error = ?, validated_at = ?, "
+                        "latency_ms = ?, repository_name = ?, repo_id = COALESCE(NULLIF(?, ''), repo_id), "
+                        "base = COALESCE(?, base) WHERE id = ?",
+                        (status, probe.get("error"), probe.get("checkedAt"), probe.get("latencyMs"),
+                         probe.get("repositoryName"), probe.get("repositoryIdentifier") or "",
+                         probe.get("candidate"), sid),
+                    )
+                    self._append_history(sid, "validation", probe.get("checkedAt") or time.time(), status,
+                                         error=probe.get("error"), latency_ms=probe.get("latencyMs"))
+                n += 1
+            self.db.commit()
+        self.dedupe()
+        return n
+
+    def _append_history(self, source_id, kind, at, status, error=None, latency_ms=None,
+                        records=None, edges=None, seconds=None):
+        """Caller holds the lock and commits. Re-importing the same probe (same time) adds nothing."""
+        if self.db.execute("SELECT 1 FROM probe_history WHERE source_id = ? AND kind = ? AND at = ?",
+                           (source_id, kind, at)).fetchone():
+            return
+        self.db.execute(
+            "INSERT INTO probe_history (source_id, kind, at, status, error, latency_ms, records, edges, seconds) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (source_id, kind, at, status, error, latency_ms, records, edges, seconds),
+        )
+
+    def dedupe(self):
+        """Point later sources at the first one sharing a current base URL or repositoryIdentifier.
+
+        Matching is on the repository first; scope only keeps apart sources
+        that harvest different sets of it. A whole-repository source overlaps
+        every set of the same repository.
+        """
+        with self.lock:
+            self.db.execute("UPDATE sources SET duplicate_of = NULL")
+            rows = self.db.execute("SELECT id, base, repo_id, scope FROM sources ORDER BY id").fetchall()
+            kept = {}  # repository key -> [(id, scope)] of kept sources
+            dupes = 0
+            for r in rows:
+                keys = [("base", registry_base_key(r["base"]))]
+                if r["repo_id"]:
+                    keys.append(("repo", r["repo_id"]))
+                owner = None
+                for k in keys:
+                    for sid, scope in kept.get(k, []):
+                        if scope == r["scope"] or not scope or not r["scope"]:
+                            owner = sid if owner is None else min(owner, sid)
+                if owner is not None:
+                    self.db.execute("UPDATE sources SET duplicate_of = ? WHERE id = ?", (owner, r["id"]))
+                    dupes += 1
+                    continue
+                for k in keys:
+                    kept.setdefault(k, []).append((r["id"], r["scope"]))
+            self.db.commit()
+        return dupes
+
+    def harvest_sources(self, include_failed=False):
+        """Deduplicated, enabled sources as harvester config dicts."""
+        sql = "SELECT * FROM sources WHERE enabled = 1 AND duplicate_of IS NULL"
+        if not include_failed:
+            sql += " AND (validation_status IS NULL OR validation_status != 'failed')"
+        with self.lock:
+            rows = self.db.execute(sql + " ORDER BY id").fetchall()
+        out = []
+        for r in rows:
+            src = json.loads(r["extra"]) if r["extra"] else {}
+            src.update({"key": r["key"], "label": r["label"], "base": r["base"],
+                        "metadataPrefixes": json.loads(r["prefixes"] or "[]")})
+            if r["set_spec"]:
+                src["set"] = r["set_spec"]
+            if r["set_regex"]:
+                src["setRegex"] = r["set_regex"]
+            out.append(src)
+        return out
+
+    def record_harvest(self, key, records, advisors, edges, seconds, error=None):
+        with self.lock:
+            self.db.execute(
+                "UPDATE sources SET last_harvest_at = ?, harvest_seconds = ?, harvest_records = ?, "
+                "harvest_advisors = ?, harvest_edges = ?, harvest_error = ? WHERE key = ?",
+                (time.time(), seconds, records, advisors, edges, error, key),
+            )
+            row = self.db.execute("SELECT id FROM sources WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._append_history(row["id"], "harvest", time.time(), "failed" if error else "ok",
+                                     error=error, records=records, edges=edges, seconds=seconds)
+            self.db.commit()
+
+    def history(self, key, limit=20):
+        """Most recent validation and harvest results of a source, newest first."""
+        with self.lock:
+            return [dict(r) for r in self.db.execute(
+                "SELECT h.kind, h.at, h.status, h.error, h.latency_ms, h.records, h.edges, h.seconds "
+                "FROM probe_history h JOIN sources s ON s.id = h.source_id WHERE s.key = ? "
+                "ORDER BY h.at DESC LIMIT ?", (key, limit)).fetchall()]
+
+    def stats(self):
+        with self.lock:
+            row = self.db.execute("""
+                SELECT COUNT(*) AS total,
+                       SUM(duplicate_of IS NOT NULL) AS duplicates,
+                       SUM(enabled = 0) AS disabled,
+                       SUM(validation_status = 'ok') AS ok,
+                       SUM(validation_status = 'failed') AS failed,
+                       SUM(validation_status = 'transient') AS transient,
+                       SUM(last_harvest_at IS NOT NULL) AS harvested,
+                       SUM(COALESCE(harvest_edges, 0)) AS edges
+                FROM sources
+            """).fetchone()
+        return {k: row[k] or 0 for k in row.keys()}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--registry", default=DEFAULT_REGISTRY)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_ingest = sub.add_parser("ingest", help="Add source config JSON files")
+    p_ingest.add_argument("configs", nargs="+")
+    p_val = sub.add_parser("import-validation", help="Import a validate_oai_sources.py --cache file")
+    p_val.add_argument("cache")
+    p_export = sub.add_parser("export", help="Write the deduplicated sources as a harvester config")
+    p_export.add_argument("--out", required=True)
+    p_export.add_argument("--include-failed", action="store_true")
+    sub.add_parser("stats")
+    p_hist = sub.add_parser("history", help="Show a source's validation and harvest history")
+    p_hist.add_argument("key")
+    p_hist.add_argument("--limit", type=int, default=20)
+    args = ap.parse_args()
+
+    reg = SourceRegistry(args.registry)
+    try:
+        if args.cmd == "ingest":
+            for path in args.configs:
+                counts = {"added": 0, "merged": 0, "skipped": 0}
+                for src in json.loads(Path(path).read_text()).get("sources", []):
+                    counts[reg.ingest(src, Path(path).name)] += 1
+                print(f"[registry] {path} " + " ".join(f"{k}={v}" for k, v in counts.items()))
+            reg.dedupe()
+        elif args.cmd == "import-validation":
+            n = reg.import_validation(json.loads(Path(args.cache).read_text()))
+            print(f"[registry] validation entries applied={n}")
+        elif args.cmd == "export":
+            sources = reg.harvest_sources(include_failed=args.include_failed)
+            Path(args.out).write_text(json.dumps({"sources": sources}, indent=2))
+            print(f"[registry] sources={len(sources)} out={args.out}")
+        elif args.cmd == "history":
+            for h in reg.history(args.key, args.limit):
+                when = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(h.pop("at")))
+                print(f"[registry] {when} " + " ".join(f"{k}={v}" for k, v in h.items() if v is not None))
+        print("[registry] " + " ".join(f"{k}={v}" for k, v in reg.stats().items()))
+    finally:
+        reg.close()
+
+
+if __name__ == "__main__":
+    main()
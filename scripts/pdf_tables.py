@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Parallel page extraction for the PDF-based list builders.
+
+extract() spreads the pages of any number of PDFs over a process pool and
+returns one result per page, in page order, for each PDF:
+
+- "words":  the page's words grouped into lines (what build_vhb2024_from_pdf
+            walks), optionally cropped just below the last detected table so
+            footers are skipped;
+- "tables": page.extract_tables() (what the FNEGE/JQL parser reads).
+
+Per-page results are cached under <cache-dir>/<pdf sha256>/<mode>.json keyed by
+page number, so rerunning a builder only re-extracts PDFs whose bytes changed.
+Bump EXTRACTOR_VERSION when the extraction code changes to invalidate the cache.
+
+Scripts call install_from_args() once; without it extract() uses every CPU
+and the default cache directory.
+
+Usage:
+    python3 scripts/pdf_tables.py file.pdf [...] [--mode words|tables]   # extract and print a summary
+"""
+from __future__ import annotations
+
+import argparse
+import concurrent.futures as futures
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pdfplumber
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "output" / "pdf_page_cache"
+EXTRACTOR_VERSION = 2
+MODES = ("words", "tables")
+
+
+def group_lines(words: list[dict], y_tol: float = 2) -> list[list[dict]]:
+    """Group pdfplumber words into lines by their top coordinate, left to right."""
+    words_sorted = sorted(words, key=lambda w: (w["top"], w["x0"]))
+    lines: list[list[dict]] = []
+    line_top = None
+    for w in words_sorted:
+        if not lines or abs(w["top"] - line_top) > y_tol:
+            lines.append([w])
+            line_top = w["top"]
+        else:
+            lines[-1].append(w)
+    return lines
+
+
+def crop_to_tables(page, pad: float = 36):
+    """The page from its top to `pad` points below the last detected table.
+
+    Footers and the margin under the tables are skipped. Nothing above the
+    tables is cut: area and column headings that the parsers key on can sit
+    any distance above the table they introduce, and a fixed top padding lost
+    them on the VHB area PDFs. Pages without a detected table are returned whole.
+    """
+    boxes = [t.bbox for t in page.find_tables()]
+    if not boxes:
+        return page
+    bottom = min(page.height, max(b[3] for b in boxes) + pad)
+    return page.crop((0, 0, page.width, bottom))
+
+
+def page_words(page, crop: bool) -> list[list[dict]]:
+    if crop:
+        page = crop_to_tables(page)
+    words = page.extract_words(x_tolerance=1, y_tolerance=2, keep_blank_chars=False)
+    return [[{"text": w["text"], "x0": round(w["x0"], 2), "top": round(w["top"], 2)} for w in line]
+            for line in group_lines(words, y_tol=2)]
+
+
+def page_tables(page, crop: bool) -> list[list[list[str | None]]]:
+    return page.extract_tables() or []
+
+
+EXTRACTORS = {"words": page_words, "tables": page_tables}
+
+
+def _extract_pages(path: str, pages: list[int], mode: str, crop: bool) -> list[tuple[int, object]]:
+    """Worker: open the PDF once and extract a run of pages."""
+    extractor = EXTRACTORS[mode]
+    with pdfplumber.open(path) as pdf:
+        return [(n, extractor(pdf.pages[n], crop)) for n in pages]
+
+
+class PageCache:
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR) -> None:
+        self.dir = Path(cache_dir)
+        self.lock = threading.Lock()
+
+    def _path(self, digest: str, key: str) -> Path:
+        return self.dir / digest / f"{key}.json"
+
+    def get(self, digest: str, key: str) -> dict[int, object]:
+        try:
+            data = json.loads(self._path(digest, key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != EXTRACTOR_VERSION:
+            return {}
+        return {int(n): result for n, result in data.get("pages", {}).items()}
+
+    def put(self, digest: str, key: str, pages: dict[int, object]) -> None:
+        path = self._path(digest, key)
+        with self.lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{key}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": EXTRACTOR_VERSION, "pages": pages}), encoding="utf-8")
+            tmp.replace(path)
+
+
+_workers: int | None = None
+_cache: PageCache | None = PageCache()
+
+
+def install(workers: int | None = None, cache_dir: Path | str | None = DEFAULT_CACHE_DIR) -> None:
+    global _workers, _cache
+    _workers = workers
+    _cache = PageCache(cache_dir) if cache_dir else None
+
+
+def add_pdf_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--pdf-workers", type=int, default=None, help="Processes for PDF page extraction (default: all CPUs)")
+    ap.add_argument("--pdf-cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                    help="Per-page extraction cache keyed by PDF hash (default: output/pdf_page_cache)")
+    ap.add_argument("--no-pdf-cache", action="store_true", help="Re-extract every page")
+
+
+def install_from_args(args: argparse.Namespace) -> None:
+    install(args.pdf_workers, None if args.no_pdf_cache else args.pdf_cache_dir)
+
+
+def extract(pdfs: list[bytes], mode: str = "words", *, crop: bool = False, workers: int | None = None,
+            chunk_pages: int = 8) -> list[list]:
+    """Per-page results for each PDF, in input order and page order.
+
+    Pages are submitted in runs of `chunk_pages` so each worker opens a PDF once
+    per run rather than once per page.
+    """
+    if mode not in EXTRACTORS:
+        raise ValueError(f"unknown mode {mode!r}; expected one of {', '.join(MODES)}")
+    workers = workers or _workers or os.cpu_count() or 1
+    key = f"{mode}-crop" if crop else mode
+    t0 = time.monotonic()
+
+    digests = [hashlib.sha256(data).hexdigest() for data in pdfs]
+    pages: dict[str, dict[int, object]] = {}
+    for digest in set(digests):
+        pages[digest] = _cache.get(digest, key) if _cache else {}
+
+    with tempfile.TemporaryDirectory(prefix="pdf_tables_") as tmp:
+        jobs = []
+        seen = set()
+        for data, digest in zip(pdfs, digests):
+            if digest in seen:
+                continue
+            seen.add(digest)
+            if pages[digest]:
+                # Cache files are only written once every page of a PDF is in.
+                continue
+            path = Path(tmp) / f"{digest}.pdf"
+            path.write_bytes(data)
+            with pdfplumber.open(path) as pdf:
+                count = len(pdf.pages)
+            for i in range(0, count, chunk_pages):
+                jobs.append((digest, str(path), list(range(i, min(i + chunk_pages, count))), count))
+
+        extracted = sum(len(j[2]) for j in jobs)
+        if jobs:
+            counts = {j[0]: j[3] for j in jobs}
+            with futures.ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+                running = {ex.submit(_extract_pages, path, run, mode, crop): digest for digest, path, run, _ in jobs}
+                for fut in futures.as_completed(running):
+                    digest = running[fut]
+                    pages[digest].update(fut.result())
+                    if _cache and len(pages[digest]) == counts[digest]:
+                        _cache.put(digest, key, pages[digest])
+
+    total = sum(len(p) for p in pages.values())
+    print(f"[pdf] mode={key} pdfs={len(set(digests))} pages={total} extracted={extracted} "
+          f"cached={total - extracted} workers={workers} elapsed={time.monotonic() - t0:.1f}s", flush=True)
+    return [[pages[d][n] for n in sorted(pages[d])] for d in digests]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Extract PDF pages through the shared engine")
+    ap.add_argument("pdfs", nargs="+", type=Path)
+    ap.add_argument("--mode", choices=MODES, default="words")
+    ap.add_argument("--crop", action="store_true", help="Crop word extraction to detected table regions")
+    add_pdf_args(ap)
+    args = ap.parse_args()
+    install_from_args(args)
+    results = extract([p.read_bytes() for p in args.pdfs], args.mode, crop=args.crop)
+    for path, per_page in zip(args.pdfs, results):
+        items = sum(len(r) for r in per_page)
+        print(f"{path}: pages={len(per_page)} {'lines' if args.mode == 'words' else 'tables'}={items}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Word-boundary prefix index behind findBestMatch() in src/common/quality.js, and
+a check that it returns exactly what the old linear scan did.
+
+findBestMatch(v, map) returns the value of the first key, in map order, that
+- equals v or starts with v + " ", or
+- is a start of v followed by " " in v, and is multi-word or at least
+  MIN_KEY_LENGTH_FOR_PREFIX_MATCH characters long.
+Scanning every key on each miss costs one comparison per key (tens of thousands
+for the SCImago, Norwegian and ERA lists). The index keeps each key's insertion
+rank and, for every word-boundary prefix of every key, the first key extending
+it, so a lookup is one probe per word of v; the earliest-ranked candidate wins.
+PrefixIndex mirrors the quality.js tables line for line.
+
+--check loads the bundled src/data lists the way compileQualityIndex() keys them,
+derives queries from their keys (the keys, their word prefixes and extensions,
+keys of other lists) and compares PrefixIndex with the linear scan; --node runs
+the same comparison on quality.js's own findBestMatch under node.
+
+Usage:
+    python3 scripts/prefix_index.py --check [--node] [--queries 1500]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from venue_names import normalize_venue_name
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = ROOT / "src" / "data"
+QUALITY_JS = ROOT / "src" / "common" / "quality.js"
+MIN_KEY_LENGTH_FOR_PREFIX_MATCH = 12
+
+
+def _spaces(s: str) -> Iterable[int]:
+    i = s.find(" ")
+    while i != -1:
+        yield i
+        i = s.find(" ", i + 1)
+
+
+def find_best_match_linear(v: str, items: list[tuple[str, Any]]) -> Any:
+    """The original findBestMatch loop."""
+    for key, value in items:
+        if key.startswith(v + " ") or key == v:
+            return value
+        if v.startswith(key + " ") or v == key:
+            if len(key) >= MIN_KEY_LENGTH_FOR_PREFIX_MATCH or " " in key:
+                return value
+    return None
+
+
+class PrefixIndex:
+    def __init__(self, items: list[tuple[str, Any]]) -> None:
+        self.values: dict[str, Any] = {}
+        self.rank: dict[str, int] = {}
+        self.extensions: dict[str, str] = {}
+        for key, value in items:
+            self.values[key] = value
+            if key in self.rank:
+                continue  # Map.set on an existing key keeps its position
+            self.rank[key] = len(self.rank)
+            for i in _spaces(key):
+                self.extensions.setdefault(key[:i], key)
+
+    def find(self, v: str) -> Any:
+        candidates = []
+        if v in self.rank:
+            candidates.append(v)
+        if v in self.extensions:
+            candidates.append(self.extensions[v])
+        for i in _spaces(v):
+            key = v[:i]
+            if key in self.rank and (len(key) >= MIN_KEY_LENGTH_FOR_PREFIX_MATCH or " " in key):
+                candidates.append(key)
+        if not candidates:
+            return None
+        return self.values[min(candidates, key=self.rank.__getitem__)]
+
+
+def _ranked_csv(path: Path, header: bool = True) -> list[tuple[str, str]]:
+    """"Name|Synonym,Rank" lines keyed like addSynonymsToMap()."""
+    items = []
+    with path.open(newline="", encoding="utf-8") as f:
+        rows = csv.reader(f)
+        if header:
+            next(rows, None)
+        for row in rows:
+            if len(row) < 2:
+                continue
+            for syn in ",".join(row[:-1]).split("|"):
+                n = normalize_venue_name(syn)
+                if n:
+                    items.append((n, row[-1].strip()))
+    return items
+
+
+def _keyed(pairs: Iterable[tuple[str, Any]]) -> list[tuple[str, Any]]:
+    return [(n, v) for n, v in ((normalize_venue_name(k), v) for k, v in pairs) if n]
+
+
+def _scimago_quartiles(path: Path) -> list[tuple[str, str]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    latest = max(data["years"])
+    return _keyed((k, f"Q{q}") for k, q in zip(data["keys"], data["years"][latest].get("quartile", ""))
+                  if q != "0")
+
+
+def bundled_lists() -> dict[str, list[tuple[str, Any]]]:
+    """The bundled lists that quality.js looks up with findBestMatch (and ERA, matched the same way)."""
+    loaders = {
+        "abdc": lambda: _ranked_csv(DATA / "abdc2022.csv"),
+        "vhb": lambda: _ranked_csv(DATA / "vhb2024.csv", header=False),
+        "fnege": lambda: _ranked_csv(DATA / "fnege2025.csv"),
+        "abs": lambda: _ranked_csv(DATA / "abs2024.csv"),
+        "core": lambda: _ranked_csv(DATA / "core_icore2026.csv") + _ranked_csv(DATA / "core_portal_ranks.csv"),
+        "ccf": lambda: _ranked_csv(DATA / "ccf_ranks.csv"),
+        "impact": lambda: _ranked_csv(DATA / "journal_impact_2024.csv"),
+        "quartiles": lambda: _scimago_quartiles(DATA / "scimago_index.json"),
+        "norwegian": lambda: _keyed(json.loads((DATA / "norwegian_compact.json").read_text(encoding="utf-8")).items()),
+        "h5": lambda: _keyed(json.loads((DATA / "venue_h5_index.json").read_text(encoding="utf-8")).items()),
+        "era": lambda: _keyed((line, True) for line in (DATA / "era2023.txt").read_text(encoding="utf-8").splitlines()),
+    }
+    out = {}
+    for name, load in loaders.items():
+        try:
+            # Same collapsing as Map.set: first position, last value.
+            out[name] = list(dict(load()).items())
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[prefix-index] skip {name}: {e}")
+    return out
+
+
+def queries_for(items: list[tuple[str, Any]], others: list[str], n: int, rng: random.Random) -> list[str]:
+    """Venue strings that exercise both match directions, near misses and the length threshold."""
+    keys = [k for k, _ in items]
+    if not keys:
+        return []
+    out = []
+    for key in rng.sample(keys, min(n // 4, len(keys))):
+        words = key.split(" ")
+        out.append(key)
+        out.append(" ".join(words[:rng.randint(1, len(words))]))
+        out.append(key + " " + rng.choice(["journal", "proceedings 12", "workshops", "x"]))
+        out.append(key[:max(1, len(key) - 1)])
+    out.extend(rng.sample(others, min(n // 4, len(others))))
+    return out
+
+
+def check(n_queries: int, node: bool) -> int:
+    rng = random.Random(0)
+    lists = bundled_lists()
+    all_keys = sorted({k for items in lists.values() for k, _ in items})
+    failures = 0
+    cases = {}
+    for name, items in lists.items():
+        queries = queries_for(items, all_keys, n_queries, rng)
+        cases[name] = queries
+        t0 = time.perf_counter()
+        linear = [find_best_match_linear(q, items) for q in queries]
+        t_linear = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        index = PrefixIndex(items)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        indexed = [index.find(q) for q in queries]
+        t_index = time.perf_counter() - t0
+        bad = [(q, a, b) for q, a, b in zip(queries, linear, indexed) if a != b]
+        failures += len(bad)
+        for q, a, b in bad[:5]:
+            print(f"[prefix-index] {name}: {q!r} linear={a!r} indexed={b!r}")
+        hits = sum(v is not None for v in linear)
+        print(f"[prefix-index] {name} keys={len(index.rank)} prefixes={len(index.extensions)} "
+              f"queries={len(queries)} hits={hits} mismatches={len(bad)} "
+              f"linear={t_linear:.2f}s build={t_build:.2f}s indexed={t_index:.3f}s")
+    if node:
+        failures += check_quality_js(lists, cases)
+    print(f"[prefix-index] mismatches={failures}")
+    return 1 if failures else 0
+
+
+def check_quality_js(lists: dict[str, list[tuple[str, Any]]], cases: dict[str, list[str]]) -> int:
+    """Compare quality.js's findBestMatch (and the ERA set lookup) with the linear scan, under node."""
+    script = r"""
+const fs = require("fs");
+const src = fs.readFileSync(process.argv[1], "utf8") + "\nexport { findBestMatch, setHasWordPrefixMatch };";
+const { lists, cases } = JSON.parse(fs.readFileSync(0, "utf8"));
+function linear(v, map) {
+  for (const [key, value] of map.entries()) {
+    if (key.startsWith(v + " ") || key === v) return value;
+    if ((v.startsWith(key + " ") || v === key) && (key.length >= 12 || key.includes(" "))) return value;
+  }
+  return null;
+}
+import("data:text/javascript," + encodeURIComponent(src)).then((m) => {
+  const out = {};
+  for (const [name, items] of Object.entries(lists)) {
+    const map = new Map(items);
+    const set = new Set(map.keys());
+    let bad = 0;
+    for (const q of cases[name]) {
+      if (m.findBestMatch(q, map) !== linear(q, map)) bad++;
+      const any = [...set].some((e) => e.startsWith(q + " ") || e === q || q.startsWith(e + " "));
+      if (m.setHasWordPrefixMatch(q, set) !== any) bad++;
+    }
+    out[name] = bad;
+  }
+  process.stdout.write(JSON.stringify(out));
+});
+"""
+    payload = json.dumps({"lists": lists, "cases": cases})
+    proc = subprocess.run(["node", "-e", script, str(QUALITY_JS)], input=payload,
+                          capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout)
+    for name, bad in result.items():
+        print(f"[prefix-index] quality.js {name} mismatches={bad}")
+    return sum(result.values())
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Check the findBestMatch prefix index against the linear scan")
+    ap.add_argument("--check", action="store_true", help="Compare on the bundled src/data lists")
+    ap.add_argument("--node", action="store_true", help="Also check quality.js itself (needs node)")
+    ap.add_argument("--queries", type=int, default=1500, help="Queries per list (default: 1500)")
+    args = ap.parse_args()
+    if not args.check:
+        ap.error("nothing to do; pass --check")
+    return check(args.queries, args.node)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -35,7 +35,10 @@ from pathlib import Path
 from typing import Optional
 
 import requests
-from bs4 import BeautifulSoup
+
+import html_tables
+import http_cache
+from venue_names import normalize_venue_name
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "src" / "data"
@@ -70,28 +73,6 @@ def die(msg: str) -> None:
     raise SystemExit(2)
 
 
-def normalize_venue_name(name: str) -> str:
-    """Normalize venue name for consistent matching."""
-    return (
-        name.lower()
-        .replace("&", " and ")
-        .replace("/", " ")
-        .replace("-", " ")
-        .replace("'", "")
-        .replace('"', "")
-        .replace(".", "")
-        .replace(",", "")
-        .replace(":", "")
-        .replace(";", "")
-        .replace("(", "")
-        .replace(")", "")
-        .replace("[", "")
-        .replace("]", "")
-        .replace("{", "")
-        .replace("}", "")
-    )
-
-
 def parse_h5_from_text(text: str) -> Optional[dict]:
     """
     Parse H5 index and H5 median from text like "h5-index: 123, h5-median: 456"
@@ -152,39 +133,27 @@ def scrape_category(category: str, category_name: str) -> dict:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-    except requests.RequestException as e:
+        html = http_cache.fetch_text(url, headers=headers, timeout=30, session=requests)
+    except (requests.RequestException, http_cache.CacheMiss) as e:
         print(f"  Error fetching {url}: {e}", file=sys.stderr)
         return {}
 
-    soup = BeautifulSoup(response.text, "html.parser")
     venues = {}
 
-    # Google Scholar Metrics pages have tables with venue information
-    # Try multiple selectors to find the table rows
-    rows = soup.select("tr.gs_md_wa, tr.gs_ml_wa, table.gs_md_wa_table tr, table tr")
-    
-    for row in rows:
+    # Google Scholar Metrics pages list venues as table rows; rows are streamed
+    # out of the page without building a document tree.
+    for row in html_tables.rows(html):
         try:
             # Skip header rows
-            if row.select("th"):
+            if row.is_header:
                 continue
 
-            cells = row.select("td")
+            cells = row.td
             if len(cells) < 2:
                 continue
 
-            # First cell usually contains the venue name
-            name_cell = cells[0]
-            venue_name = name_cell.get_text(strip=True)
-            
-            # Remove any links or extra formatting
-            if not venue_name:
-                # Try finding a link in the cell
-                link = name_cell.select_one("a")
-                if link:
-                    venue_name = link.get_text(strip=True)
+            # First cell usually contains the venue name (link text included)
+            venue_name = cells[0]
 
             if not venue_name or len(venue_name) < 3:
                 continue
@@ -194,8 +163,7 @@ def scrape_category(category: str, category_name: str) -> dict:
             h5_median = None
 
             # Look for numeric values in cells (h5-index and h5-median)
-            for i, cell in enumerate(cells[1:], start=1):
-                cell_text = cell.get_text(strip=True)
+            for cell_text in cells[1:]:
                 # Try to extract numbers
                 numbers = re.findall(r'\d+', cell_text)
                 if numbers:
@@ -209,7 +177,7 @@ def scrape_category(category: str, category_name: str) -> dict:
 
             # If we didn't find in cells, try parsing from row text
             if h5_index is None:
-                row_text = row.get_text()
+                row_text = row.text
                 h5_data = parse_h5_from_text(row_text)
                 if h5_data:
                     h5_index = h5_data.get("h5_index")
@@ -258,8 +226,10 @@ def main() -> int:
         default=REQUEST_DELAY,
         help=f"Delay between requests in seconds (default: {REQUEST_DELAY})",
     )
+    http_cache.add_cache_args(parser)
 
     args = parser.parse_args()
+    cache = http_cache.install_from_args(args)
 
     if not args.category and not args.all_categories:
         parser.print_help()
@@ -278,8 +248,8 @@ def main() -> int:
         venues = scrape_category(category, category_name)
         all_venues.update(venues)
 
-        # Rate limiting
-        if category != categories_to_scrape[-1][0]:
+        # Rate limiting (replayed pages never reach Scholar)
+        if category != categories_to_scrape[-1][0] and not args.offline:
             print(f"  Waiting {args.delay}s before next request...", flush=True)
             time.sleep(args.delay)
 
@@ -296,6 +266,8 @@ def main() -> int:
 
     output_path.write_text(json.dumps(output_data, indent=2, ensure_ascii=False), encoding="utf-8")
     print(f"\nSaved {len(all_venues)} venues to {output_path}")
+    if cache:
+        print(f"HTTP cache: {cache.summary()}")
 
     return 0
 
@@ -29,6 +29,8 @@ from typing import Any, Dict, Iterable, Optional, Tuple
 
 import requests
 
+from venue_names import normalize_venue_name
+
 
 BASE_URL = "https://api.clarivate.com/apis/wos-journals/v1"
 
@@ -37,13 +39,6 @@ def now_iso() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
-def normalize_venue_name(s: str) -> str:
-    s = str(s or "").lower().replace("&", " and ")
-    s = re.sub(r"[^a-z0-9]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-
 def qnorm(x: Any) -> str:
     s = str(x or "").strip().upper()
     m = re.search(r"\bQ([1-4])\b", s)
@@ -5,6 +5,12 @@ Fetch and build venue quality lists for local use in the extension.
 Design constraints:
 - Zero interaction with Google Scholar.
 - Keep data local (written into src/data/*).
+- Downloads go through scripts/http_cache.py: conditional GETs against output/http_cache,
+  and --offline replays cached bodies so parsers can be rerun without the network.
+- Builders run as a small task graph: downloads in threads, XLSX parsing in
+  processes (streamed by scripts/xlsx_stream.py), PDF pages through
+  scripts/pdf_tables.py (its own process pool and per-page cache). A failed
+  builder keeps its previous file and metadata entry.
 
 Notes:
 - The UTD journals page currently fails TLS verification in this environment; we fetch it with
@@ -14,21 +20,24 @@ Notes:
 
 from __future__ import annotations
 
+import argparse
+import concurrent.futures as futures
 import csv
+import functools
 import io
 import json
 import re
-import ssl
 import sys
 import time
-import urllib.request
 from pathlib import Path
 from typing import Iterable
 
-import openpyxl
-import pdfplumber
 import requests
-from bs4 import BeautifulSoup
+
+import html_tables
+import http_cache
+import pdf_tables
+import xlsx_stream
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "src" / "data"
@@ -67,33 +76,22 @@ def uniq_preserve(xs: Iterable[str]) -> list[str]:
     return out
 
 
-def fetch_text(url: str, *, verify_tls: bool = True, timeout_s: int = 40, headers: dict | None = None) -> str:
+def fetch_text(url: str, *, verify_tls: bool = True, timeout_s: int = 40, headers: dict | None = None,
+               params: dict | None = None, session=None) -> str:
     h = dict(headers) if headers else {}
     if "User-Agent" not in h:
         h.setdefault("User-Agent", "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
-    if verify_tls:
-        r = requests.get(url, timeout=timeout_s, headers=h)
-        r.raise_for_status()
-        return r.text
-
-    # Local opt-out for problem TLS chains.
-    ctx = ssl.create_default_context()
-    ctx.check_hostname = False
-    ctx.verify_mode = ssl.CERT_NONE
-    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-    with urllib.request.urlopen(req, context=ctx, timeout=timeout_s) as resp:
-        data = resp.read()
-    return data.decode("utf-8", errors="ignore")
+    # verify_tls=False is a local opt-out for problem TLS chains (stdlib path, unverified context).
+    return http_cache.fetch_text(url, params=params, headers=h, timeout=timeout_s, verify_tls=verify_tls,
+                                 session=session or requests)
 
 
 def fetch_bytes(url: str, *, timeout_s: int = 60) -> bytes:
-    r = requests.get(url, timeout=timeout_s)
-    r.raise_for_status()
-    return r.content
+    return http_cache.fetch(url, timeout=timeout_s, session=requests)
 
 
 def build_ft50() -> list[str]:
-    # Avoid parsing the entire FT HTML with BeautifulSoup; it's large.
+    # Avoid parsing the entire FT HTML; it's large.
     html = fetch_text(FT50_URL, verify_tls=True)
 
     for m in re.finditer(
@@ -130,43 +128,28 @@ def build_ft50() -> list[str]:
 
 def build_utd24() -> list[str]:
     html = fetch_text(UTD24_URL, verify_tls=False)
-    soup = BeautifulSoup(html, "html.parser")
-    divs = soup.select("div.journal_list")
-    journals = [d.get("title") or d.get_text(" ", strip=True) for d in divs]
+    journals = [attrs.get("title") or text for attrs, text in html_tables.elements(html, "div", "journal_list")]
     journals = uniq_preserve(journals)
     if len(journals) != 24:
         die(f"UTD24 parse error: expected 24, got {len(journals)}")
     return journals
 
 
+def fetch_abdc_2022_xlsx() -> bytes:
+    return fetch_bytes(ABDC_2022_URL)
+
+
 def build_abdc_2022_csv() -> str:
-    content = fetch_bytes(ABDC_2022_URL)
-    wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    return parse_abdc_2022_xlsx(fetch_abdc_2022_xlsx())
+
+
+def parse_abdc_2022_xlsx(content: bytes) -> str:
+    try:
+        wb = xlsx_stream.Workbook(content)
+    except xlsx_stream.XlsxError as e:
+        die(f"ABDC parse error: {e}")
     if "2022 JQL" not in wb.sheetnames:
         die(f"ABDC parse error: expected sheet '2022 JQL' in {wb.sheetnames}")
-    ws = wb["2022 JQL"]
-
-    header_row = None
-    col_title = None
-    col_rank = None
-    for r in range(1, 60):
-        vals = [ws.cell(r, c).value for c in range(1, 60)]
-        lower = [str(v).strip().lower() for v in vals if v is not None]
-        if "journal title" in lower and "2022 rating" in lower:
-            header_row = r
-            # Map column indices.
-            for c in range(1, 60):
-                v = ws.cell(r, c).value
-                if not isinstance(v, str):
-                    continue
-                if v.strip().lower() == "journal title":
-                    col_title = c
-                elif v.strip().lower() == "2022 rating":
-                    col_rank = c
-            break
-
-    if not header_row or not col_title or not col_rank:
-        die("ABDC parse error: could not locate 'Journal Title' and '2022 rating' columns")
 
     out = io.StringIO()
     w = csv.writer(out, lineterminator="\n")
@@ -174,32 +157,25 @@ def build_abdc_2022_csv() -> str:
 
     seen = set()
     n = 0
-    min_col = min(col_title, col_rank)
-    max_col = max(col_title, col_rank)
-    t_off = col_title - min_col
-    r_off = col_rank - min_col
-
-    # iter_rows is substantially faster than addressing cells by coordinate in a loop.
-    for row in ws.iter_rows(
-        min_row=header_row + 1,
-        min_col=min_col,
-        max_col=max_col,
-        values_only=True,
-    ):
-        title = row[t_off]
-        rank = row[r_off]
-        if not title or not rank:
-            continue
-        title = " ".join(str(title).split()).strip()
-        rank = " ".join(str(rank).split()).strip()
-        if not title or not rank:
-            continue
-        k = title.casefold()
-        if k in seen:
-            continue
-        seen.add(k)
-        w.writerow([title, rank])
-        n += 1
+    # Rows stream from the sheet XML; only the two named columns are kept.
+    try:
+        for title, rank in wb.records("2022 JQL", ["Journal Title", "2022 rating"]):
+            if not title or not rank:
+                continue
+            title = " ".join(title.split()).strip()
+            rank = " ".join(rank.split()).strip()
+            if not title or not rank:
+                continue
+            k = title.casefold()
+            if k in seen:
+                continue
+            seen.add(k)
+            w.writerow([title, rank])
+            n += 1
+    except xlsx_stream.XlsxError:
+        die("ABDC parse error: could not locate 'Journal Title' and '2022 rating' columns")
+    finally:
+        wb.close()
 
     if n < 500:
         die(f"ABDC parse error: suspiciously low row count: {n}")
@@ -210,132 +186,162 @@ def build_abdc_2022_csv() -> str:
 def build_abs_2024_csv() -> str:
     """Fetch ABS Journal Ranking 2024 from journalranking.org and output Venue,Rank CSV."""
     html = fetch_text(ABS_2024_URL, verify_tls=True)
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.find("table")
-    if not table:
-        die("ABS 2024 parse error: no table found")
-    rows = table.find_all("tr")
-    if len(rows) < 2:
-        die("ABS 2024 parse error: table has no data rows")
+
     # Header: ISSN | FIELD | TITLE | PUBLISHER | AJG2024 | AJG2021 | AJG2018
-    header_cells = [th.get_text(" ", strip=True).upper() for th in rows[0].find_all(["th", "td"])]
-    col_title = None
-    col_ajg = None
-    for i, h in enumerate(header_cells):
-        if "TITLE" in h and "PUBLISHER" not in h:
-            col_title = i
-        if "AJG2024" in h or "AJG 2024" in h:
-            col_ajg = i
-    if col_title is None or col_ajg is None:
-        die("ABS 2024 parse error: could not locate TITLE and AJG2024 columns")
+    def title_column(h: str) -> bool:
+        return "TITLE" in h.upper() and "PUBLISHER" not in h.upper()
+
+    def ajg2024_column(h: str) -> bool:
+        return "AJG2024" in h.upper() or "AJG 2024" in h.upper()
+
     out = io.StringIO()
     w = csv.writer(out, lineterminator="\n")
     w.writerow(["Venue", "Rank"])
     seen = set()
     n = 0
     VALID_ABS = {"1", "2", "3", "4", "4*"}
-    for tr in rows[1:]:
-        cells = [td.get_text(" ", strip=True) for td in tr.find_all(["td", "th"])]
-        if len(cells) <= max(col_title, col_ajg):
-            continue
-        title = " ".join(str(cells[col_title]).split()).strip()
-        rank = " ".join(str(cells[col_ajg]).split()).strip().replace(" ", "")
-        if not title or not rank:
-            continue
-        rank_lower = rank.lower()
-        if rank_lower not in {"1", "2", "3", "4", "4*"}:
-            continue
-        k = title.casefold()
-        if k in seen:
-            continue
-        seen.add(k)
-        w.writerow([title, rank])
-        n += 1
+    # Rows stream out of the first table; no document tree is built for the multi-MB page.
+    try:
+        for title, rank in html_tables.records(html, [title_column, ajg2024_column]):
+            title = " ".join(title.split()).strip()
+            rank = " ".join(rank.split()).strip().replace(" ", "")
+            if not title or not rank:
+                continue
+            rank_lower = rank.lower()
+            if rank_lower not in {"1", "2", "3", "4", "4*"}:
+                continue
+            k = title.casefold()
+            if k in seen:
+                continue
+            seen.add(k)
+            w.writerow([title, rank])
+            n += 1
+    except LookupError as e:
+        die(f"ABS 2024 parse error: {e}")
     if n < 200:
         die(f"ABS 2024 parse error: suspiciously low row count: {n}")
     return out.getvalue()
 
 
+def fetch_jql_72_pdf() -> bytes:
+    return fetch_bytes(JQL_72_URL)
+
+
 def build_fnege_2025_csv_from_jql() -> str:
     """Extract the FNEGE 2025 column from Harzing's JQL 72 title PDF.
 
     Important: this covers the JQL journal set, not the full FNEGE master ranking.
     """
-    content = fetch_bytes(JQL_72_URL)
+    return parse_fnege_2025_from_jql_pdf(fetch_jql_72_pdf())
+
+
+def parse_fnege_2025_from_jql_pdf(content: bytes) -> str:
     out = io.StringIO()
     w = csv.writer(out, lineterminator="\n")
     w.writerow(["Venue", "Rank"])
     seen = set()
     n = 0
 
-    with pdfplumber.open(io.BytesIO(content)) as pdf:
-        for page in pdf.pages:
-            for table in page.extract_tables() or []:
-                if not table or not table[0]:
+    # Pages are extracted in parallel and cached by PDF hash (scripts/pdf_tables.py).
+    for page_tables in pdf_tables.extract([content], "tables")[0]:
+        for table in page_tables:
+            if not table or not table[0]:
+                continue
+            header = [" ".join(str(cell or "").split()) for cell in table[0]]
+            if "Journal" not in header:
+                continue
+            journal_idx = header.index("Journal")
+            fnege_idx = None
+            for idx, h in enumerate(header):
+                if h.upper().startswith("FNEGE"):
+                    fnege_idx = idx
+                    break
+            if fnege_idx is None:
+                continue
+            for row in table[1:]:
+                if not row or len(row) <= max(journal_idx, fnege_idx):
                     continue
-                header = [" ".join(str(cell or "").split()) for cell in table[0]]
-                if "Journal" not in header:
+                journal = " ".join(str(row[journal_idx] or "").split()).strip()
+                rank = " ".join(str(row[fnege_idx] or "").split()).strip().replace(" ", "")
+                if not journal or journal.lower() == "journal" or rank not in {"1*", "1", "2", "3", "4"}:
                     continue
-                journal_idx = header.index("Journal")
-                fnege_idx = None
-                for idx, h in enumerate(header):
-                    if h.upper().startswith("FNEGE"):
-                        fnege_idx = idx
-                        break
-                if fnege_idx is None:
+                k = journal.casefold()
+                if k in seen:
                     continue
-                for row in table[1:]:
-                    if not row or len(row) <= max(journal_idx, fnege_idx):
-                        continue
-                    journal = " ".join(str(row[journal_idx] or "").split()).strip()
-                    rank = " ".join(str(row[fnege_idx] or "").split()).strip().replace(" ", "")
-                    if not journal or journal.lower() == "journal" or rank not in {"1*", "1", "2", "3", "4"}:
-                        continue
-                    k = journal.casefold()
-                    if k in seen:
-                        continue
-                    seen.add(k)
-                    w.writerow([journal, rank])
-                    n += 1
+                seen.add(k)
+                w.writerow([journal, rank])
+                n += 1
 
     if n < 400:
         die(f"FNEGE 2025 parse error: suspiciously low row count: {n}")
     return out.getvalue()
 
 
-def build_core_csv() -> tuple[str, dict]:
-    # CORE portal supports paging with a 'page' param. For ICORE2026 it appears to be 20 pages.
-    # We'll discover the last page by looking at the pagination jumpPage('N') links.
-    params = {"search": "", "by": "all", "source": CORE_SOURCE, "page": "1", "sort": "atitle"}
-    r = requests.get(CORE_PORTAL_BASE, params=params, timeout=40)
-    r.raise_for_status()
+def core_session(pool_size: int = 4) -> requests.Session:
+    """One pooled keep-alive session for CORE portal pages, retrying 429/5xx with backoff."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    return session
+
+
+def parse_core_page(page_html: str) -> list[tuple[str, str, str]]:
+    """(title, acronym, rank) rows of one CORE portal results page."""
+    rows = html_tables.rows(page_html)
+    next(rows, None)  # header
+    data = []
+    for row in rows:
+        tds = row.td
+        if len(tds) < 4:
+            continue
+        title, acronym, source, rank = tds[0], tds[1], tds[2], tds[3]
+        data.append((title, acronym, rank))
+    return data
+
 
-    html = r.text
-    pages = [int(x) for x in re.findall(r"jumpPage\('?(\d+)'?\)", html)]
+def fetch_core_pages(source: str = CORE_SOURCE, *, base: str = CORE_PORTAL_BASE, workers: int = 4,
+                     parse_workers: int = 2) -> tuple[list[list[tuple[str, str, str]]], int]:
+    """Fetch every results page of a CORE portal source (e.g. ICORE2026, CORE2023, ERA2010).
+
+    Page 1 gives the page count. The remaining pages are fetched by at most
+    `workers` threads over one pooled session, and each page is handed to a
+    process pool for parsing as soon as it arrives. Returns per-page rows in page
+    order and the page count.
+    """
+    params = {"search": "", "by": "all", "source": source, "sort": "atitle"}
+    session = core_session(workers)
+
+    def fetch(page: int) -> str:
+        return fetch_text(base, params={**params, "page": str(page)}, session=session)
+
+    first = fetch(1)
+    # The portal pages with jumpPage('N') links; the highest N is the last page.
+    pages = [int(x) for x in re.findall(r"jumpPage\('?(\d+)'?\)", first)]
     last_page = max(pages) if pages else 1
 
-    rows_out: list[tuple[str, str]] = []
+    parsed: dict[int, futures.Future] = {}
+    with session, futures.ThreadPoolExecutor(max_workers=max(1, workers)) as fetch_pool, \
+            futures.ProcessPoolExecutor(max_workers=max(1, parse_workers)) as parse_pool:
+        parsed[1] = parse_pool.submit(parse_core_page, first)
+        pending = {fetch_pool.submit(fetch, page): page for page in range(2, last_page + 1)}
+        for i, fut in enumerate(futures.as_completed(pending), 2):
+            parsed[pending[fut]] = parse_pool.submit(parse_core_page, fut.result())
+            print(f"[core] {source} fetched {i}/{last_page}", flush=True)
+        return [parsed[page].result() for page in range(1, last_page + 1)], last_page
 
-    def parse_page(page_html: str) -> list[tuple[str, str, str]]:
-        soup = BeautifulSoup(page_html, "html.parser")
-        rows = soup.select("table tr")
-        if not rows:
-            return []
-        data = []
-        for tr in rows[1:]:
-            tds = [td.get_text(" ", strip=True) for td in tr.find_all("td")]
-            if len(tds) < 4:
-                continue
-            title, acronym, source, rank = tds[0], tds[1], tds[2], tds[3]
-            data.append((title, acronym, rank))
-        return data
-
-    for page in range(1, last_page + 1):
-        print(f"[core] fetch page {page}/{last_page}", flush=True)
-        params["page"] = str(page)
-        rp = requests.get(CORE_PORTAL_BASE, params=params, timeout=40)
-        rp.raise_for_status()
-        for title, acronym, rank in parse_page(rp.text):
+
+def build_core_csv(source: str = CORE_SOURCE, *, workers: int = 4) -> tuple[str, dict]:
+    page_rows, last_page = fetch_core_pages(source, workers=workers)
+
+    rows_out: list[tuple[str, str]] = []
+    for rows in page_rows:
+        for title, acronym, rank in rows:
             if not title or not rank:
                 continue
             # Keep only meaningful ranks.
@@ -348,9 +354,6 @@ def build_core_csv() -> tuple[str, dict]:
             venue = "|".join(uniq_preserve(syns))
             rows_out.append((venue, rank.strip()))
 
-        # Be polite.
-        time.sleep(0.2)
-
     # Emit in insertion order but unique.
     seen: set[str] = set()
     lines: list[list[str]] = [["Venue", "Rank"]]
@@ -366,65 +369,174 @@ def build_core_csv() -> tuple[str, dict]:
     for row in lines:
         w2.writerow(row)
 
-    meta = {"source": CORE_SOURCE, "pages": last_page, "rows": len(lines) - 1}
+    meta = {"source": source, "pages": last_page, "rows": len(lines) - 1}
     return out2.getvalue(), meta
 
 
-def main() -> int:
+class Task:
+    """One node of the build graph.
+
+    fn receives the results of deps as positional arguments. kind="process" runs it in
+    the process pool, so fn must be a module-level function and its inputs picklable;
+    use it for CPU-bound PDF/XLSX parsing and keep downloads in threads.
+    """
+
+    def __init__(self, name: str, fn, deps: tuple[str, ...] = (), kind: str = "thread") -> None:
+        self.name = name
+        self.fn = fn
+        self.deps = deps
+        self.kind = kind
+
+
+def run_tasks(tasks: list[Task], *, threads: int = 6, processes: int = 2) -> tuple[dict, dict, dict]:
+    """Run a task graph; returns (results, errors, durations) keyed by task name.
+
+    A task starts as soon as its dependencies have finished. A failed task only
+    skips the tasks that depend on it; everything else still runs to completion.
+    """
+    by_name = {t.name: t for t in tasks}
+    results: dict = {}
+    errors: dict = {}
+    durations: dict = {}
+    waiting = list(tasks)
+    running: dict = {}
+    with futures.ThreadPoolExecutor(max_workers=threads) as tpool, \
+            futures.ProcessPoolExecutor(max_workers=processes) as ppool:
+        while waiting or running:
+            for t in list(waiting):
+                failed = [d for d in t.deps if d in errors]
+                if failed:
+                    errors[t.name] = f"skipped: {', '.join(failed)} failed"
+                    waiting.remove(t)
+                    print(f"[tasks] {t.name} {errors[t.name]}", file=sys.stderr, flush=True)
+                elif all(d in results for d in t.deps):
+                    pool = ppool if t.kind == "process" else tpool
+                    fut = pool.submit(t.fn, *[results[d] for d in t.deps])
+                    running[fut] = (t.name, time.monotonic())
+                    waiting.remove(t)
+            if not running:
+                # Nothing in flight and nothing ready: the rest depend on unknown tasks.
+                for t in waiting:
+                    errors[t.name] = f"unresolved dependencies: {', '.join(d for d in t.deps if d not in by_name)}"
+                waiting = []
+                continue
+            done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for fut in done:
+                name, t0 = running.pop(fut)
+                durations[name] = time.monotonic() - t0
+                try:
+                    results[name] = fut.result()
+                except SystemExit as e:
+                    # die() has already printed the reason.
+                    errors[name] = f"exited with status {e.code}"
+                except Exception as e:
+                    errors[name] = str(e) or type(e).__name__
+                if name in errors:
+                    print(f"[tasks] {name} failed after {durations[name]:.1f}s: {errors[name]}", file=sys.stderr, flush=True)
+                    continue
+                print(f"[tasks] {name} done in {durations[name]:.1f}s ({by_name[name].kind})", flush=True)
+    return results, errors, durations
+
+
+def build_tasks(core_workers: int = 4) -> list[Task]:
+    return [
+        Task("ft50", build_ft50),
+        Task("utd24", build_utd24),
+        Task("abdc2022.fetch", fetch_abdc_2022_xlsx),
+        Task("abdc2022", parse_abdc_2022_xlsx, ("abdc2022.fetch",), kind="process"),
+        Task("abs2024", build_abs_2024_csv),
+        Task("jql72.fetch", fetch_jql_72_pdf),
+        # pdf_tables runs its own process pool over the PDF's pages.
+        Task("fnege2025", parse_fnege_2025_from_jql_pdf, ("jql72.fetch",)),
+        Task("core_icore2026", functools.partial(build_core_csv, CORE_SOURCE, workers=core_workers)),
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=6, help="Workers for downloads and light parsing")
+    ap.add_argument("--processes", type=int, default=2, help="Workers for XLSX parsing")
+    ap.add_argument("--core-workers", type=int, default=4, help="Concurrent CORE portal page requests")
+    http_cache.add_cache_args(ap)
+    pdf_tables.add_pdf_args(ap)
+    args = ap.parse_args(argv)
+    cache = http_cache.install_from_args(args)
+    pdf_tables.install_from_args(args)
+
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    meta_path = DATA_DIR / "quality_sources.json"
+    try:
+        previous = json.loads(meta_path.read_text(encoding="utf-8")).get("sources", {})
+    except (OSError, ValueError):
+        previous = {}
 
     meta: dict = {
         "fetchedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "sources": {},
     }
 
-    print("[ft50] fetch+parse", flush=True)
-    ft50 = build_ft50()
-    write_text(DATA_DIR / "ft50.txt", "\n".join(ft50) + "\n")
-    meta["sources"]["ft50"] = {"url": FT50_URL, "count": len(ft50)}
-
-    print("[utd24] fetch+parse", flush=True)
-    utd24 = build_utd24()
-    write_text(DATA_DIR / "utd24.txt", "\n".join(utd24) + "\n")
-    meta["sources"]["utd24"] = {"url": UTD24_URL, "count": len(utd24), "tls_verify": False}
-
-    print("[abdc] fetch+parse", flush=True)
-    abdc_csv = build_abdc_2022_csv()
-    write_text(DATA_DIR / "abdc2022.csv", abdc_csv)
-    meta["sources"]["abdc2022"] = {"url": ABDC_2022_URL, "rows": abdc_csv.count("\n") - 1}
-
-    print("[abs2024] fetch+parse", flush=True)
-    abs_csv = build_abs_2024_csv()
-    write_text(DATA_DIR / "abs2024.csv", abs_csv)
-    meta["sources"]["abs2024"] = {"url": ABS_2024_URL, "rows": abs_csv.count("\n") - 1}
-
-    print("[fnege2025] fetch+parse", flush=True)
-    fnege_csv = build_fnege_2025_csv_from_jql()
-    write_text(DATA_DIR / "fnege2025.csv", fnege_csv)
-    meta["sources"]["jql72"] = {
-        "url": "https://harzing.com/resources/journal-quality-list",
-        "pdf": JQL_72_URL,
-        "edition": "72nd",
-        "updated": "2026-03-27",
-    }
-    meta["sources"]["fnege2025"] = {
-        "url": JQL_72_URL,
-        "rows": fnege_csv.count("\n") - 1,
-        "source": "Harzing Journal Quality List 72nd edition (title PDF, FNEGE 2025 column)",
-        "coverage": "JQL journal set",
-    }
-
-    print("[core] fetch+parse", flush=True)
-    core_csv, core_meta = build_core_csv()
-    write_text(DATA_DIR / "core_icore2026.csv", core_csv)
-    meta["sources"]["core_icore2026"] = {"url": CORE_PORTAL_BASE, **core_meta}
-
-    write_text(DATA_DIR / "quality_sources.json", json.dumps(meta, indent=2, sort_keys=True) + "\n")
+    t0 = time.monotonic()
+    results, errors, durations = run_tasks(build_tasks(args.core_workers), threads=args.threads, processes=args.processes)
+
+    written = []
+
+    def emit(filename: str, text: str, meta_key: str, entry: dict) -> None:
+        write_text(DATA_DIR / filename, text)
+        meta["sources"][meta_key] = entry
+        written.append(filename)
+
+    if "ft50" in results:
+        ft50 = results["ft50"]
+        emit("ft50.txt", "\n".join(ft50) + "\n", "ft50", {"url": FT50_URL, "count": len(ft50)})
+    if "utd24" in results:
+        utd24 = results["utd24"]
+        emit("utd24.txt", "\n".join(utd24) + "\n", "utd24",
+             {"url": UTD24_URL, "count": len(utd24), "tls_verify": False})
+    if "abdc2022" in results:
+        abdc_csv = results["abdc2022"]
+        emit("abdc2022.csv", abdc_csv, "abdc2022",
+             {"url": ABDC_2022_URL, "rows": abdc_csv.count("\n") - 1})
+    if "abs2024" in results:
+        abs_csv = results["abs2024"]
+        emit("abs2024.csv", abs_csv, "abs2024", {"url": ABS_2024_URL, "rows": abs_csv.count("\n") - 1})
+    if "fnege2025" in results:
+        fnege_csv = results["fnege2025"]
+        meta["sources"]["jql72"] = {
+            "url": "https://harzing.com/resources/journal-quality-list",
+            "pdf": JQL_72_URL,
+            "edition": "72nd",
+            "updated": "2026-03-27",
+        }
+        emit("fnege2025.csv", fnege_csv, "fnege2025", {
+            "url": JQL_72_URL,
+            "rows": fnege_csv.count("\n") - 1,
+            "source": "Harzing Journal Quality List 72nd edition (title PDF, FNEGE 2025 column)",
+            "coverage": "JQL journal set",
+        })
+    if "core_icore2026" in results:
+        core_csv, core_meta = results["core_icore2026"]
+        emit("core_icore2026.csv", core_csv, "core_icore2026",
+             {"url": CORE_PORTAL_BASE, **core_meta})
+
+    # Sources whose build failed keep their previous file and metadata entry.
+    for key, entry in previous.items():
+        meta["sources"].setdefault(key, entry)
+    write_text(meta_path, json.dumps(meta, indent=2, sort_keys=True) + "\n")
 
     print("Wrote:")
-    for p in ["ft50.txt", "utd24.txt", "abdc2022.csv", "abs2024.csv", "fnege2025.csv", "core_icore2026.csv", "quality_sources.json"]:
+    for p in written + ["quality_sources.json"]:
         print(" -", (DATA_DIR / p).relative_to(ROOT))
-
+    print("Durations:")
+    for name, secs in sorted(durations.items(), key=lambda kv: -kv[1]):
+        print(f" - {name}: {secs:.1f}s")
+    print(f" - total (wall): {time.monotonic() - t0:.1f}s")
+    if cache:
+        print(f"HTTP cache: {cache.summary()}{' (offline)' if args.offline else ''}")
+    if errors:
+        print("Failed (previous data kept):", file=sys.stderr)
+        for name, err in errors.items():
+            print(f" - {name}: {err}", file=sys.stderr)
+        return 1
     return 0
 
 
@@ -2,17 +2,27 @@
 """
 Validate OAI-PMH base URLs and keep only sources that respond and expose
 ETD-capable metadata formats (oai_etdms / mods / uketd_dc).
+
+Probe results are cached per normalized base URL (--cache). Entries younger
+than --ttl-days are reused; transient failures (timeouts, connection errors,
+HTTP 429/5xx) are always re-probed.
 """
 import argparse
 import concurrent.futures as futures
 import json
 import random
 import re
+import socket
+import threading
+import time
+import urllib.error
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+from oai_breaker import add_breaker_args, guard, install_from_args
+
 
 RICH_PREFIXES = ["oai_etdms", "mods", "uketd_dc"]
 FALLBACK_PREFIXES = ["oai_dc", "qdc"]
@@ -27,7 +37,7 @@ def fetch_xml(url, timeout=15):
         url,
         headers={"User-Agent": "ScholarUtilityBelt/1.0 (OAI validator)"},
     )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
+    with guard(url), urllib.request.urlopen(req, timeout=timeout) as resp:
         data = resp.read()
     return ET.fromstring(data)
 
@@ -42,10 +52,24 @@ def list_metadata_formats(base, timeout=15):
     return formats
 
 
+class NotOaiError(ValueError):
+    """Identify answered with XML that is not a usable Identify response."""
+
+
 def identify(base, timeout=15):
+    """Return (repositoryName, repositoryIdentifier) from an Identify response.
+
+    Raises NotOaiError for an OAI <error> or a response without repositoryName.
+    """
     root = fetch_xml(build_url(base, {"verb": "Identify"}), timeout=timeout)
+    err = root.find(".//{http://www.openarchives.org/OAI/2.0/}error")
+    if err is not None:
+        raise NotOaiError(f"Identify returned {err.attrib.get('code') or 'an error'}")
     repo = root.findtext(".//{http://www.openarchives.org/OAI/2.0/}repositoryName")
-    return repo or ""
+    if not (repo or "").strip():
+        raise NotOaiError("Identify response has no repositoryName")
+    repo_id = root.findtext(".//{http://www.openarchives.org/OAI/2.0/oai-identifier}repositoryIdentifier")
+    return repo or "", (repo_id or "").strip().lower()
 
 
 def list_identifiers(base, prefix, timeout=15):
@@ -101,49 +125,162 @@ def candidate_bases(base):
     return candidates
 
 
-def validate_source(src, timeout=15, require_rich=True):
-    base = src.get("base")
-    if not base:
-        return None, "missing base"
-    last_err = "unknown error"
-    for cand in candidate_bases(base):
-        try:
-            identify(cand, timeout=timeout)
-        except Exception as e:
-            last_err = f"identify failed: {e}"
-            continue
+def is_transient(exc):
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code == 429 or exc.code >= 500
+    if isinstance(exc, (urllib.error.URLError, socket.timeout, TimeoutError, ConnectionError)):
+        return True
+    return False
+
+
+def race_identify(candidates, pool, timeout=15, errors=None):
+    """Probe Identify on every candidate at once; yield (candidate, identify result) as each answers.
+
+    Candidates come in completion order, so the fastest valid repository is
+    tried first and the caller can fall back to the next one. Failures are
+    appended to errors. Once the caller stops iterating, probes still queued
+    are cancelled; those already in flight run to completion and are ignored.
+    """
+    pending = {pool.submit(identify, cand, timeout=timeout): cand for cand in candidates}
+    try:
+        while pending:
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for fut in done:
+                cand = pending.pop(fut)
+                try:
+                    info = fut.result()
+                except Exception as e:
+                    if errors is not None:
+                        errors.append(e)
+                    continue
+                yield cand, info
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+def pick_error(errors):
+    """The (message, exception) to report: a transient one if any candidate had
+    one, so the cache retries the source instead of trusting a mix of failures."""
+    for msg, e in errors:
+        if is_transient(e):
+            return msg, e
+    return errors[-1] if errors else ("unknown error", None)
+
+
+def probe_source(base, timeout=15, pool=None):
+    """Probe a base URL; the result is independent of --allow-fallback so it can be cached.
+
+    Candidates that identify are tried in the order they answered. The first one
+    exposing a rich prefix that lists identifiers wins. If none does, the first
+    with a usable fallback prefix is kept, as the old one-by-one loop would have.
+    """
+    candidates = candidate_bases(base)
+    if pool is None:
+        with futures.ThreadPoolExecutor(max_workers=max(1, len(candidates))) as own_pool:
+            return probe_source(base, timeout=timeout, pool=own_pool)
+    t0 = time.monotonic()
+    identify_errors = []
+    errors = []
+    fallback = None
+    for cand, (repo, repo_id) in race_identify(candidates, pool, timeout=timeout, errors=identify_errors):
+        result = {"candidate": cand, "repositoryName": repo, "repositoryIdentifier": repo_id, "formats": [],
+                  "identifiersOk": False, "error": None, "transient": False}
         try:
-            formats = list_metadata_formats(cand, timeout=timeout)
+            result["formats"] = pool.submit(list_metadata_formats, cand, timeout=timeout).result()
         except Exception as e:
-            last_err = f"ListMetadataFormats failed: {e}"
-            continue
-        formats_lower = [f.lower() for f in formats]
-        rich = [p for p in RICH_PREFIXES if p in formats_lower]
-        fallback = [p for p in FALLBACK_PREFIXES if p in formats_lower]
-        if require_rich and not rich:
-            last_err = "no rich prefixes"
+            errors.append((f"ListMetadataFormats failed: {e}", e))
             continue
-        test_prefix = (rich or fallback)[0] if (rich or fallback) else None
-        if not test_prefix:
-            last_err = "no usable prefixes"
+        formats_lower = [f.lower() for f in result["formats"]]
+        usable = [p for p in RICH_PREFIXES + FALLBACK_PREFIXES if p in formats_lower]
+        if not usable:
+            fallback = fallback or result
             continue
         try:
-            ok = list_identifiers(cand, test_prefix, timeout=timeout)
-            if not ok:
-                last_err = f"ListIdentifiers failed for {test_prefix}"
-                continue
+            result["identifiersOk"] = pool.submit(list_identifiers, cand, usable[0], timeout=timeout).result()
         except Exception as e:
-            last_err = f"ListIdentifiers error: {e}"
+            errors.append((f"ListIdentifiers error: {e}", e))
             continue
-        keep_prefixes = rich + fallback if not require_rich else rich
-        cleaned = dict(src)
-        cleaned["base"] = cand
-        if normalize_base(base) != cand:
-            cleaned["originalBase"] = base
-        cleaned["metadataPrefixes"] = keep_prefixes
-        cleaned.pop("setRegex", None)
-        return cleaned, None
-    return None, last_err
+        if result["identifiersOk"] and usable[0] in RICH_PREFIXES:
+            result["latencyMs"] = int((time.monotonic() - t0) * 1000)
+            return result
+        if fallback is None or (result["identifiersOk"] and not fallback["identifiersOk"]):
+            fallback = result
+    if fallback is not None:
+        fallback["latencyMs"] = int((time.monotonic() - t0) * 1000)
+        return fallback
+    msg, exc = pick_error([(f"identify failed: {e}", e) for e in identify_errors] + errors)
+    return {"candidate": None, "repositoryName": "", "repositoryIdentifier": "", "formats": [],
+            "identifiersOk": False, "error": msg, "transient": bool(exc is not None and is_transient(exc)),
+            "latencyMs": int((time.monotonic() - t0) * 1000)}
+
+
+def source_from_probe(src, probe, require_rich=True):
+    """Turn a probe result into (cleaned source, None) or (None, reason)."""
+    if probe.get("error"):
+        return None, probe["error"]
+    cand = probe["candidate"]
+    formats_lower = [f.lower() for f in probe.get("formats") or []]
+    rich = [p for p in RICH_PREFIXES if p in formats_lower]
+    fallback = [p for p in FALLBACK_PREFIXES if p in formats_lower]
+    if require_rich and not rich:
+        return None, "no rich prefixes"
+    test_prefix = (rich or fallback)[0] if (rich or fallback) else None
+    if not test_prefix:
+        return None, "no usable prefixes"
+    if not probe.get("identifiersOk"):
+        return None, f"ListIdentifiers failed for {test_prefix}"
+    keep_prefixes = rich + fallback if not require_rich else rich
+    base = src.get("base")
+    cleaned = dict(src)
+    cleaned["base"] = cand
+    if normalize_base(base) != cand:
+        cleaned["originalBase"] = base
+    cleaned["metadataPrefixes"] = keep_prefixes
+    cleaned.pop("setRegex", None)
+    return cleaned, None
+
+
+def validate_source(src, timeout=15, require_rich=True, pool=None):
+    """Validate one source. pool is a shared executor that bounds concurrent requests."""
+    base = src.get("base")
+    if not base:
+        return None, "missing base"
+    return source_from_probe(src, probe_source(base, timeout=timeout, pool=pool), require_rich=require_rich)
+
+
+class ValidationCache:
+    """JSON file of probe results keyed by normalize_base(base)."""
+
+    def __init__(self, path, ttl_s):
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.lock = threading.Lock()
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, base):
+        with self.lock:
+            entry = self.entries.get(normalize_base(base))
+        if not entry or entry.get("transient"):
+            return None
+        if time.time() - entry.get("checkedAt", 0) > self.ttl_s:
+            return None
+        return entry
+
+    def put(self, base, probe):
+        with self.lock:
+            self.entries[normalize_base(base)] = dict(probe, checkedAt=int(time.time()))
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.entries, indent=1, sort_keys=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        tmp.replace(self.path)
 
 
 def main():
@@ -151,12 +288,18 @@ def main():
     ap.add_argument("--input", required=True)
     ap.add_argument("--output", required=True)
     ap.add_argument("--timeout", type=int, default=15)
-    ap.add_argument("--workers", type=int, default=12)
+    ap.add_argument("--workers", type=int, default=12, help="Sources validated at once")
+    ap.add_argument("--concurrency", type=int, default=32, help="Global cap on in-flight OAI requests")
     ap.add_argument("--allow-fallback", action="store_true")
     ap.add_argument("--errors-output", default=None)
     ap.add_argument("--max-sources", type=int, default=None)
     ap.add_argument("--shuffle", action="store_true")
+    ap.add_argument("--cache", default="output/oai_validation_cache.json")
+    ap.add_argument("--ttl-days", type=float, default=7.0)
+    ap.add_argument("--refresh", action="store_true", help="Ignore cached results and re-probe everything")
+    add_breaker_args(ap)
     args = ap.parse_args()
+    install_from_args(args)
 
     src = json.loads(Path(args.input).read_text())
     sources = src.get("sources", [])
@@ -167,22 +310,44 @@ def main():
     kept = []
     errors = []
 
+    # Source workers only wait on probes; every request runs in probe_pool,
+    # so its size is the global concurrency budget.
+    probe_pool = futures.ThreadPoolExecutor(max_workers=max(1, args.concurrency))
+
+    cache = ValidationCache(args.cache, args.ttl_days * 86400)
+    probed = 0
+
     def worker(s):
-        cleaned, err = validate_source(s, timeout=args.timeout, require_rich=not args.allow_fallback)
+        nonlocal probed
+        base = s.get("base")
+        if not base:
+            return None, {"base": base, "reason": "missing base"}
+        probe = None if args.refresh else cache.get(base)
+        if probe is None:
+            probe = probe_source(base, timeout=args.timeout, pool=probe_pool)
+            cache.put(base, probe)
+            with cache.lock:
+                probed += 1
+        cleaned, err = source_from_probe(s, probe, require_rich=not args.allow_fallback)
         if cleaned:
             return cleaned, None
-        return None, {"base": s.get("base"), "reason": err}
+        return None, {"base": base, "reason": err}
 
-    with futures.ThreadPoolExecutor(max_workers=args.workers) as ex:
-        for cleaned, err in ex.map(worker, sources):
-            if cleaned:
-                kept.append(cleaned)
-            else:
-                errors.append(err)
+    try:
+        with probe_pool, futures.ThreadPoolExecutor(max_workers=args.workers) as ex:
+            for i, (cleaned, err) in enumerate(ex.map(worker, sources), 1):
+                if cleaned:
+                    kept.append(cleaned)
+                else:
+                    errors.append(err)
+                if i % 200 == 0:
+                    cache.save()
+    finally:
+        cache.save()
 
     out = {"sources": kept}
     Path(args.output).write_text(json.dumps(out, indent=2))
-    print(f"[validate] in={len(sources)} kept={len(kept)} dropped={len(errors)}")
+    print(f"[validate] in={len(sources)} kept={len(kept)} dropped={len(errors)} probed={probed} cached={len(sources) - probed}")
     print(f"[validate] out={args.output}")
     if args.errors_output:
         Path(args.errors_output).write_text(json.dumps(errors, indent=2))
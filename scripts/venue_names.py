@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Venue-name keys for the Python builders, identical to normalizeVenueName() in
+src/common/quality.js (the extension re-normalizes every key it loads, so keys
+written by a builder must already be in that form to merge the way they will at
+runtime).
+
+normalize_venue_name() does the work of quality.js's chain of regex passes in one
+go: ASCII titles are lowercased and stripped with a single str.translate (other
+titles fall back to one precompiled regex), the result is split into words, and
+the leading ("proceedings of the", "the", ordinals, years) and trailing (issue and
+page numbers, abbreviations) fragments are dropped by looking at the first and
+last words. Results are memoized, since the same titles recur across lists and
+aliases.
+
+scripts/venue_names_corpus.json pairs inputs with the keys quality.js produces
+for them; --check compares this module with it, --node also re-runs quality.js
+(needs node) and --update rewrites the expected keys from quality.js.
+
+Usage:
+    python3 scripts/venue_names.py --check [--node]
+    python3 scripts/venue_names.py --update
+    python3 scripts/venue_names.py "Proceedings of the 30th ACM SIGKDD Conference"   # print keys
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import re
+import string
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+QUALITY_JS = ROOT / "src" / "common" / "quality.js"
+CORPUS = Path(__file__).resolve().parent / "venue_names_corpus.json"
+
+# Lowercased ASCII -> letters and digits kept, "&" -> " and ", everything else a word break.
+_ASCII_TABLE = str.maketrans(
+    {chr(c): (" and " if chr(c) == "&" else " ") for c in range(128)
+     if chr(c) not in string.ascii_lowercase + string.digits})
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_ORDINAL = re.compile(r"\d+(?:st|nd|rd|th)")
+_YEAR = re.compile(r"(?:19|20)\d\d")
+# Trailing abbreviations quality.js drops ("ACM Transactions on Information Systems (TOIS)").
+ABBREVIATIONS = frozenset("tois isr isj jmis misq ejis jais jsis dss kais tkdd tocs tods tis".split())
+
+
+def _words(s: str) -> list[str]:
+    t = s.lower()
+    if t.isascii():
+        return t.translate(_ASCII_TABLE).split()
+    return _NON_ALNUM.sub(" ", t.replace("&", " and ")).split()
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def _normalize(s: str) -> str:
+    w = _words(s)
+    # Each leading strip only applies when a word follows it (quality.js matches "...\s+").
+    if len(w) > 3 and w[0] == "proceedings" and w[1] == "of" and w[2] == "the":
+        del w[:3]
+    if len(w) > 2 and w[0] == "proceedings" and w[1] == "of":
+        del w[:2]
+    if len(w) > 1 and w[0] == "the":
+        del w[0]
+    if len(w) > 1 and _ORDINAL.fullmatch(w[0]):
+        del w[0]
+    if len(w) > 1 and _YEAR.fullmatch(w[0]):
+        del w[0]
+    # quality.js's trailing "N - N" pass cannot match here: hyphens are already word breaks.
+    while len(w) > 2 and w[-1].isdigit() and w[-2].isdigit():
+        del w[-2:]
+    if len(w) > 1 and w[-1].isdigit():
+        del w[-1]
+    if len(w) > 1 and w[-1] in ABBREVIATIONS:
+        del w[-1]
+    return " ".join(w)
+
+
+def normalize_venue_name(s) -> str:
+    """The quality.js normalizeVenueName() key of a venue title ("" for empty input)."""
+    return _normalize(s if isinstance(s, str) else str(s or ""))
+
+
+def quality_js_keys(inputs: list[str]) -> list[str]:
+    """Keys from quality.js itself, via node (the module has no imports, so it loads from a data: URL)."""
+    script = (
+        "const fs = require('fs');"
+        "const [src, inputs] = [fs.readFileSync(process.argv[1], 'utf8'), JSON.parse(fs.readFileSync(0, 'utf8'))];"
+        "import('data:text/javascript,' + encodeURIComponent(src)).then((m) =>"
+        "  process.stdout.write(JSON.stringify(inputs.map((s) => m.normalizeVenueName(s)))));"
+    )
+    proc = subprocess.run(["node", "-e", script, str(QUALITY_JS)], input=json.dumps(inputs),
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def load_corpus() -> list[list[str]]:
+    return json.loads(CORPUS.read_text(encoding="utf-8"))["cases"]
+
+
+def check(node: bool) -> int:
+    cases = load_corpus()
+    inputs = [c[0] for c in cases]
+    sources = {"corpus": [c[1] for c in cases]}
+    if node:
+        sources["quality.js"] = quality_js_keys(inputs)
+    failures = 0
+    for name, expected in sources.items():
+        for s, want in zip(inputs, expected):
+            got = normalize_venue_name(s)
+            if got != want:
+                failures += 1
+                print(f"[venue-names] mismatch vs {name}: {s!r} -> {got!r}, expected {want!r}")
+    print(f"[venue-names] cases={len(cases)} checked={'+'.join(sources)} mismatches={failures}")
+    return 1 if failures else 0
+
+
+def update() -> int:
+    cases = load_corpus()
+    inputs = [c[0] for c in cases]
+    # One case per line keeps corpus diffs readable.
+    lines = [json.dumps([s, k], ensure_ascii=False) for s, k in zip(inputs, quality_js_keys(inputs))]
+    CORPUS.write_text(
+        '{\n"about": "normalizeVenueName() inputs and outputs from src/common/quality.js; '
+        'regenerate with python3 scripts/venue_names.py --update",\n'
+        '"cases": [\n' + ",\n".join(lines) + "\n]}\n", encoding="utf-8")
+    print(f"[venue-names] wrote {CORPUS} cases={len(inputs)}")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Normalize venue names the way quality.js does")
+    ap.add_argument("names", nargs="*")
+    ap.add_argument("--check", action="store_true", help="Compare with scripts/venue_names_corpus.json")
+    ap.add_argument("--node", action="store_true", help="With --check, also compare with quality.js run under node")
+    ap.add_argument("--update", action="store_true", help="Rewrite the corpus keys from quality.js (needs node)")
+    args = ap.parse_args()
+    if args.node and not args.check:
+        ap.error("--node only applies with --check")
+    if args.update:
+        return update()
+    if args.check:
+        return check(args.node)
+    for name in args.names or sys.stdin.read().splitlines():
+        print(normalize_venue_name(name))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
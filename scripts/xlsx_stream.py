@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Streaming XLSX reader for the list builders (stdlib only: zipfile + expat).
+
+The sheet XML is fed to expat in chunks and turned straight into row lists by a
+parser target, without building an element tree; rows are yielded as they
+complete, so memory stays flat however long the sheet is and only the
+shared-strings table is held. Sheets are resolved by name through
+xl/workbook.xml and its relationships, and records() picks columns by their
+header text.
+
+Cell values are returned as stored text (shared and inline strings resolved,
+numbers and dates as written in the XML); empty cells are None.
+
+Usage:
+    python3 scripts/xlsx_stream.py book.xlsx [--sheet NAME] [--head 5]   # list sheets, print first rows
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import io
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+from typing import Iterator
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_ROW = f"{{{MAIN_NS}}}row"
+_C = f"{{{MAIN_NS}}}c"
+_V = f"{{{MAIN_NS}}}v"
+_T = f"{{{MAIN_NS}}}t"
+_SI = f"{{{MAIN_NS}}}si"
+_RPH = f"{{{MAIN_NS}}}rPh"
+_DIGITS = "0123456789"
+CHUNK_BYTES = 1 << 16
+
+
+class XlsxError(ValueError):
+    """The workbook lacks a requested sheet or header, or is not a readable XLSX."""
+
+
+@functools.lru_cache(maxsize=1024)
+def column_index(letters: str) -> int:
+    """0-based column index for column letters, e.g. "A" -> 0, "AB" -> 27."""
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx - 1
+
+
+class _SharedStrings:
+    """Parser target collecting <si> items: plain <t>, or the <t> of each rich-text run.
+
+    Phonetic hints (<rPh>) are skipped.
+    """
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self.parts: list[str] = []
+        self.text: list[str] | None = None
+        self.phonetic = False
+
+    def start(self, tag: str, attrs: dict) -> None:
+        if tag == _T and not self.phonetic:
+            self.text = []
+        elif tag == _SI:
+            self.parts = []
+        elif tag == _RPH:
+            self.phonetic = True
+
+    def data(self, text: str) -> None:
+        if self.text is not None:
+            self.text.append(text)
+
+    def end(self, tag: str) -> None:
+        if tag == _T and self.text is not None:
+            self.parts.append("".join(self.text))
+            self.text = None
+        elif tag == _SI:
+            self.strings.append("".join(self.parts))
+        elif tag == _RPH:
+            self.phonetic = False
+
+    def close(self) -> None:
+        pass
+
+
+class _SheetRows:
+    """Parser target turning <row>/<c> events into finished rows; no element tree is built."""
+
+    def __init__(self, shared: list[str]) -> None:
+        self.shared = shared
+        self.done: list[tuple[int, list[str | None]]] = []
+        self.values: list[str | None] | None = None
+        self.row_no = 0
+        self.next_row = 1
+        self.cell_type = None
+        self.value: str | None = None
+        self.text: list[str] | None = None
+        self.phonetic = False
+
+    def start(self, tag: str, attrs: dict) -> None:
+        if tag == _C:
+            self.cell_type = attrs.get("t")
+            self.value = None
+            ref = attrs.get("r")
+            if ref:
+                col = column_index(ref.rstrip(_DIGITS).upper())
+                values = self.values
+                if col > len(values):
+                    values.extend([None] * (col - len(values)))
+        elif tag == _V or (tag == _T and self.values is not None and not self.phonetic):
+            self.text = []
+        elif tag == _ROW:
+            r = attrs.get("r")
+            self.row_no = int(r) if r else self.next_row
+            self.values = []
+        elif tag == _RPH:
+            self.phonetic = True
+
+    def data(self, text: str) -> None:
+        if self.text is not None:
+            self.text.append(text)
+
+    def end(self, tag: str) -> None:
+        if tag == _V:
+            self.value = "".join(self.text) or None
+            self.text = None
+        elif tag == _C:
+            value = self.value
+            if self.cell_type == "s" and value is not None:
+                idx = int(value)
+                value = self.shared[idx] if 0 <= idx < len(self.shared) else ""
+            self.values.append(value)
+        elif tag == _T and self.text is not None:
+            # Inline string (<is><t>, or one rich-text run of it).
+            self.value = (self.value or "") + "".join(self.text)
+            self.text = None
+        elif tag == _ROW:
+            self.done.append((self.row_no, self.values))
+            self.next_row = self.row_no + 1
+            self.values = None
+        elif tag == _RPH:
+            self.phonetic = False
+
+    def close(self) -> None:
+        pass
+
+
+def _feed(zipf: zipfile.ZipFile, name: str, target) -> Iterator[None]:
+    """Feed a part to an expat parser in chunks, yielding after each so callers can drain the target."""
+    parser = ET.XMLParser(target=target)
+    with zipf.open(name) as f:
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield
+    parser.close()
+    yield
+
+
+class Workbook:
+    def __init__(self, source: Path | str | bytes) -> None:
+        try:
+            self.zip = zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source)
+            self.sheets = self._sheet_paths()
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            raise XlsxError(f"not a readable XLSX workbook: {e}") from e
+        self._shared: list[str] | None = None
+
+    def __enter__(self) -> "Workbook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.zip.close()
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return list(self.sheets)
+
+    def _sheet_paths(self) -> dict[str, str]:
+        """Sheet name -> part path, in workbook order."""
+        rels = {}
+        with self.zip.open("xl/_rels/workbook.xml.rels") as f:
+            for rel in ET.parse(f).getroot().iter(f"{{{PKG_REL_NS}}}Relationship"):
+                target = rel.get("Target", "")
+                target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+                rels[rel.get("Id")] = target
+        with self.zip.open("xl/workbook.xml") as f:
+            root = ET.parse(f).getroot()
+        return {s.get("name"): rels.get(s.get(f"{{{REL_NS}}}id"), "")
+                for s in root.iter(f"{{{MAIN_NS}}}sheet")}
+
+    @property
+    def shared_strings(self) -> list[str]:
+        if self._shared is None:
+            target = _SharedStrings()
+            try:
+                for _ in _feed(self.zip, "xl/sharedStrings.xml", target):
+                    pass
+            except KeyError:
+                pass  # workbook without shared strings (inline strings only)
+            self._shared = target.strings
+        return self._shared
+
+    def rows(self, sheet: str | None = None) -> Iterator[list[str | None]]:
+        """Yield each row of a sheet (default: the first) as a list of cell values.
+
+        Rows missing from the XML are yielded as empty lists so that position n
+        in the stream is always spreadsheet row n + 1.
+        """
+        if sheet is None:
+            if not self.sheets:
+                raise XlsxError("workbook has no sheets")
+            sheet = next(iter(self.sheets))
+        if sheet not in self.sheets:
+            raise XlsxError(f"no sheet {sheet!r}; sheets: {self.sheetnames}")
+        target = _SheetRows(self.shared_strings)
+        next_row = 1
+        for _ in _feed(self.zip, self.sheets[sheet], target):
+            done, target.done = target.done, []
+            for row_no, values in done:
+                while next_row < row_no:
+                    yield []
+                    next_row += 1
+                yield values
+                next_row = row_no + 1
+
+    def records(self, sheet: str | None, columns: list[str], *, scan: int = 60) -> Iterator[tuple]:
+        """Yield the named columns of every row below the header row.
+
+        The header row is the first of the top `scan` rows containing all of
+        `columns` (compared case-insensitively, whitespace-trimmed).
+        """
+        wanted = [c.strip().lower() for c in columns]
+        rows = self.rows(sheet)
+        for _, row in zip(range(scan), rows):
+            header = [(v or "").strip().lower() for v in row]
+            if all(w in header for w in wanted):
+                idx = [header.index(w) for w in wanted]
+                break
+        else:
+            raise XlsxError(f"no header row with {columns} in the first {scan} rows of {sheet or 'the first sheet'}")
+        for row in rows:
+            yield tuple(row[i] if i < len(row) else None for i in idx)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="List the sheets of a workbook and print its first rows")
+    ap.add_argument("xlsx", type=Path)
+    ap.add_argument("--sheet", default=None)
+    ap.add_argument("--head", type=int, default=5)
+    args = ap.parse_args()
+    with Workbook(args.xlsx) as wb:
+        print("sheets:", ", ".join(wb.sheetnames))
+        n = 0
+        for n, row in enumerate(wb.rows(args.sheet), 1):
+            if n <= args.head:
+                print(row)
+        print(f"rows: {n}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
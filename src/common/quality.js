@@ -308,23 +308,60 @@ export function compileQualityIndex(settings, extra = {}) {
 // Minimum key length when venue "starts with key" so short abbreviations (e.g. "ais") don't match journals like "AIS Transactions on Replication Research"
 const MIN_KEY_LENGTH_FOR_PREFIX_MATCH = 12;
 
-function findBestMatch(normalizedVenue, map) {
-  // Try prefix matching: check if any key starts with the normalized venue
-  // This handles cases like "mis quarterly" matching "mis quarterly management information systems"
-  for (const [key, value] of map.entries()) {
-    // Check if key starts with normalized venue (with space after)
-    if (key.startsWith(normalizedVenue + " ") || key === normalizedVenue) {
-      return value;
+// Word-boundary prefix tables, built once per map/set (the quality index is compiled once and then only read).
+// rank: key -> insertion position; extensions: "w1 ... wk" -> first key (in insertion order) that starts with it plus a space.
+const prefixTables = new WeakMap();
+
+function prefixTableFor(collection) {
+  let table = prefixTables.get(collection);
+  if (table && table.size === collection.size) return table;
+  const rank = new Map();
+  const extensions = new Map();
+  for (const key of collection.keys()) {
+    rank.set(key, rank.size);
+    for (let i = key.indexOf(" "); i !== -1; i = key.indexOf(" ", i + 1)) {
+      const prefix = key.slice(0, i);
+      if (!extensions.has(prefix)) extensions.set(prefix, key);
     }
-    // Also try reverse: if the normalized venue starts with the key
-    if (normalizedVenue.startsWith(key + " ") || normalizedVenue === key) {
-      // Require key to be multi-word or long enough so "ais" doesn't match "ais transactions on replication research" (journal)
-      if (key.length >= MIN_KEY_LENGTH_FOR_PREFIX_MATCH || key.includes(" "))
-        return value;
+  }
+  table = { size: collection.size, rank, extensions };
+  prefixTables.set(collection, table);
+  return table;
+}
+
+function findBestMatch(normalizedVenue, map) {
+  // Returns the value of the first key (in map order) that either starts with the venue at a word boundary
+  // ("mis quarterly" -> "mis quarterly management information systems") or equals it, or that the venue starts
+  // with at a word boundary. The latter requires the key to be multi-word or long enough so "ais" doesn't match
+  // "ais transactions on replication research" (journal).
+  // Candidates come from the prefix table: one lookup per word of the venue instead of a scan over every key.
+  const { rank, extensions } = prefixTableFor(map);
+  let best = null;
+  let bestRank = Infinity;
+  const consider = (key) => {
+    const r = rank.get(key);
+    if (r < bestRank) {
+      best = key;
+      bestRank = r;
     }
+  };
+  if (rank.has(normalizedVenue)) consider(normalizedVenue);
+  if (extensions.has(normalizedVenue)) consider(extensions.get(normalizedVenue));
+  for (let i = normalizedVenue.indexOf(" "); i !== -1; i = normalizedVenue.indexOf(" ", i + 1)) {
+    const key = normalizedVenue.slice(0, i);
+    if (rank.has(key) && (key.length >= MIN_KEY_LENGTH_FOR_PREFIX_MATCH || key.includes(" "))) consider(key);
+  }
+  return best === null ? null : map.get(best);
+}
+
+// True if some entry equals the venue or extends it / is extended by it at a word boundary (no length limit).
+function setHasWordPrefixMatch(normalizedVenue, set) {
+  const { rank, extensions } = prefixTableFor(set);
+  if (rank.has(normalizedVenue) || extensions.has(normalizedVenue)) return true;
+  for (let i = normalizedVenue.indexOf(" "); i !== -1; i = normalizedVenue.indexOf(" ", i + 1)) {
+    if (rank.has(normalizedVenue.slice(0, i))) return true;
   }
-  
-  return null;
+  return false;
 }
 
 // Pre-print server identifiers; display label used for badge. Checked against raw venue string (case-insensitive).
@@ -502,13 +539,8 @@ export function qualityBadgesForVenue(venue, qIndex) {
 
   if (qIndex.era?.has?.(v)) {
     badges.push({ kind: "era", text: "ERA 2023", metadata: { system: "Excellence in Research for Australia 2023" } });
-  } else if (qIndex.era) {
-    for (const entry of qIndex.era) {
-      if (entry.startsWith(v + " ") || entry === v || v.startsWith(entry + " ") || v === entry) {
-        badges.push({ kind: "era", text: "ERA 2023", metadata: { system: "Excellence in Research for Australia 2023" } });
-        break;
-      }
-    }
+  } else if (qIndex.era && setHasWordPrefixMatch(v, qIndex.era)) {
+    badges.push({ kind: "era", text: "ERA 2023", metadata: { system: "Excellence in Research for Australia 2023" } });
   }
 
   let norLevel = qIndex.norwegian?.get?.(v);
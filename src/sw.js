@@ -172,6 +172,23 @@ const GRAPH_ALERTS_KEY = "authorGraphAlerts";
 const GRAPH_MONITOR_ALARM = "graphMonitorCheck";
 const GRAPH_MONITOR_MINUTES = 24 * 60;
 
+// src/data/scimago_index.json is columnar (scripts/build_scimago_quartiles.py):
+// keys[i] is a normalized title and years[Y].quartile[i] its best quartile digit
+// ("0" = none). Each journal takes its quartile from the most recent year that has one.
+function quartileIndexFromScimagoColumns(data) {
+  const keys = Array.isArray(data?.keys) ? data.keys : [];
+  const years = Object.keys(data?.years || {}).sort().reverse();
+  const index = {};
+  for (const year of years) {
+    const q = String(data.years[year]?.quartile || "");
+    for (let i = 0; i < keys.length && i < q.length; i++) {
+      const d = q.charCodeAt(i) - 48;
+      if (d >= 1 && d <= 4 && !Object.prototype.hasOwnProperty.call(index, keys[i])) index[keys[i]] = "Q" + d;
+    }
+  }
+  return index;
+}
+
 function normalizeOpenAlexId(id) {
   if (!id) return "";
   const raw = String(id).trim();
@@ -408,11 +425,11 @@ chrome.runtime.onInstalled.addListener(async () => {
   const { qualityQuartilesIndex } = await chrome.storage.local.get({ qualityQuartilesIndex: {} });
   if (!qualityQuartilesIndex || Object.keys(qualityQuartilesIndex).length === 0) {
     try {
-      const url = chrome.runtime.getURL("src/data/scimago_2024_quartiles.json");
+      const url = chrome.runtime.getURL("src/data/scimago_index.json");
       const r = await fetch(url);
       if (r.ok) {
         const data = await r.json();
-        const index = data?.index || {};
+        const index = quartileIndexFromScimagoColumns(data);
         const meta = data?.meta || null;
         if (index && typeof index === "object" && Object.keys(index).length > 1000) {
           await chrome.storage.local.set({ qualityQuartilesIndex: index, qualityQuartilesMeta: meta });